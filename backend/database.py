@@ -1,7 +1,7 @@
 import os
 import logging
 from sqlmodel import SQLModel, Session, create_engine
-from sqlalchemy import text
+from sqlalchemy import LargeBinary, text, event, inspect
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -19,6 +19,16 @@ if DATABASE_URL:
     # PostgreSQL doesn't need check_same_thread
     engine = create_engine(DATABASE_URL)
     IS_POSTGRES = True
+
+    @event.listens_for(engine, "connect")
+    def register_vector_adapter(dbapi_connection, connection_record):
+        """Register pgvector's psycopg adapter so vectors are sent as binary parameters"""
+        try:
+            from pgvector.psycopg import register_vector
+            register_vector(dbapi_connection)
+        except Exception as e:
+            # Package missing or extension not created yet (see enable_pgvector_extension)
+            logger.debug(f"pgvector adapter not registered: {e}")
 else:
     # Fallback to SQLite for local development
     DATABASE_PATH = Path(__file__).parent / "aiseo.db"
@@ -38,6 +48,8 @@ def enable_pgvector_extension():
             conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
             conn.commit()
             logger.info("pgvector extension enabled successfully")
+        # Reconnect so pooled connections register the vector adapter
+        engine.dispose()
     except Exception as e:
         logger.warning(f"Could not enable pgvector extension: {e}")
         logger.warning("Vector search features will not be available")
@@ -49,6 +61,217 @@ def create_db_and_tables():
     enable_pgvector_extension()
     # Then create all tables
     SQLModel.metadata.create_all(engine)
+    ensure_cache_key_columns()
+    ensure_background_job_columns()
+    ensure_kanban_rows()
+    # create_all only builds indexes for new tables; add missing ones to existing tables
+    ensure_indexes()
+    ensure_vector_column()
+    ensure_fulltext_index()
+
+
+def ensure_indexes():
+    """Create any model-declared indexes missing from existing tables"""
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(engine, checkfirst=True)
+            except Exception as e:
+                logger.warning(f"Could not create index {index.name}: {e}")
+
+
+def ensure_cache_key_columns():
+    """
+    Add kind/schema_version/data_version and the compressed payload columns
+    to a cachedsuggestion table created before they existed, classifying old
+    rows by their legacy markers (the kanban type in the JSON, the "-v2"
+    model suffix).
+    """
+    try:
+        inspector = inspect(engine)
+        if not inspector.has_table("cachedsuggestion"):
+            return
+        columns = {column["name"] for column in inspector.get_columns("cachedsuggestion")}
+        with engine.connect() as conn:
+            if "schema_version" not in columns:
+                conn.execute(text("ALTER TABLE cachedsuggestion ADD COLUMN schema_version INTEGER NOT NULL DEFAULT 1"))
+            if "data_version" not in columns:
+                conn.execute(text("ALTER TABLE cachedsuggestion ADD COLUMN data_version VARCHAR"))
+            if "payload_encoding" not in columns:
+                conn.execute(text("ALTER TABLE cachedsuggestion ADD COLUMN payload_encoding VARCHAR NOT NULL DEFAULT 'json'"))
+            if "payload" not in columns:
+                blob_type = LargeBinary().compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE cachedsuggestion ADD COLUMN payload {blob_type}"))
+            if "kind" not in columns:
+                conn.execute(text("ALTER TABLE cachedsuggestion ADD COLUMN kind VARCHAR NOT NULL DEFAULT 'suggestions'"))
+                conn.execute(
+                    text("UPDATE cachedsuggestion SET kind = 'recommendations' WHERE suggestions_json LIKE :marker"),
+                    {"marker": '%"type": "kanban_recommendations"%'}
+                )
+                conn.execute(
+                    text("UPDATE cachedsuggestion SET kind = 'suggestions_v2' "
+                         "WHERE kind = 'suggestions' AND model_used LIKE :marker"),
+                    {"marker": "%v2%"}
+                )
+                logger.info("Added cache key columns to cachedsuggestion")
+            conn.commit()
+    except Exception as e:
+        logger.warning(f"Could not add cache key columns: {e}")
+
+
+def ensure_background_job_columns():
+    """Add the singleton flag to a backgroundjob table created before it existed"""
+    try:
+        inspector = inspect(engine)
+        if not inspector.has_table("backgroundjob"):
+            return
+        columns = {column["name"] for column in inspector.get_columns("backgroundjob")}
+        if "singleton" in columns:
+            return
+        with engine.connect() as conn:
+            conn.execute(text("ALTER TABLE backgroundjob ADD COLUMN singleton BOOLEAN NOT NULL DEFAULT FALSE"))
+            # Singleton kinds so far
+            conn.execute(text(
+                "UPDATE backgroundjob SET singleton = TRUE WHERE kind IN ('embedding_sync', 'pregeneration')"
+            ))
+            conn.commit()
+        logger.info("Added singleton column to backgroundjob")
+    except Exception as e:
+        logger.warning(f"Could not add backgroundjob columns: {e}")
+
+
+def ensure_kanban_rows():
+    """
+    Move kanban recommendations out of cache row JSON (recommendations schema
+    version 1) into kanbanrecommendation rows, each with a progress row that
+    keeps any status already set. Only a brand's newest run is kept, as only
+    it was ever served.
+    """
+    import json
+    from sqlmodel import select
+    from models import CachedSuggestion, CACHE_SCHEMA_VERSIONS, KanbanRecommendation, RecommendationProgress
+
+    try:
+        with Session(engine) as session:
+            legacy = session.exec(
+                select(CachedSuggestion)
+                .where(CachedSuggestion.kind == "recommendations")
+                .where(CachedSuggestion.schema_version == 1)
+                .order_by(CachedSuggestion.expires_at.desc())
+            ).all()
+            if not legacy:
+                return
+
+            migrated = set()
+            for cached in legacy:
+                if cached.brand_id in migrated:
+                    session.delete(cached)
+                    continue
+                migrated.add(cached.brand_id)
+
+                cards = json.loads(cached.suggestions_json).get("recommendations", [])
+                for card in cards:
+                    if session.get(KanbanRecommendation, card["id"]) is None:
+                        session.add(KanbanRecommendation(
+                            id=card["id"],
+                            brand_id=cached.brand_id,
+                            rank=card["rank"],
+                            title=card["title"],
+                            description=card["description"],
+                            category=card["category"],
+                            priority=card["priority"],
+                            effort=card["effort"],
+                            steps_json=json.dumps(card.get("steps", [])),
+                            generated_at=cached.generated_at
+                        ))
+                    if session.get(RecommendationProgress, card["id"]) is None:
+                        session.add(RecommendationProgress(
+                            id=card["id"], brand_id=cached.brand_id, status=card.get("status", "todo")
+                        ))
+
+                cached.suggestions_json = json.dumps({
+                    "type": "kanban_recommendations",
+                    "recommendation_ids": [card["id"] for card in cards]
+                })
+                cached.schema_version = CACHE_SCHEMA_VERSIONS["recommendations"]
+                session.add(cached)
+
+            session.commit()
+            logger.info(f"Moved kanban recommendations of {len(migrated)} brands into rows")
+    except Exception as e:
+        logger.warning(f"Could not migrate kanban recommendations: {e}")
+
+
+def ensure_vector_column():
+    """Add the pgvector column to a promptembedding table created before pgvector was installed"""
+    if not IS_POSTGRES:
+        return
+
+    table = SQLModel.metadata.tables.get("promptembedding")
+    if table is None or "embedding" not in table.c:
+        return
+
+    try:
+        with engine.connect() as conn:
+            conn.execute(text(
+                "ALTER TABLE promptembedding ADD COLUMN IF NOT EXISTS embedding vector(3072)"
+            ))
+            conn.commit()
+    except Exception as e:
+        logger.warning(f"Could not add embedding column: {e}")
+
+
+def ensure_fulltext_index():
+    """
+    Create the full-text index over prompt query + response text.
+
+    PostgreSQL: expression GIN index on to_tsvector (matched by RAGService lexical search).
+    SQLite: FTS5 external-content table kept in sync with prompt by triggers.
+    """
+    try:
+        with engine.connect() as conn:
+            if IS_POSTGRES:
+                conn.execute(text("""
+                    CREATE INDEX IF NOT EXISTS ix_prompt_fts ON prompt USING GIN (
+                        to_tsvector('english', coalesce(query, '') || ' ' || coalesce(response_text, ''))
+                    )
+                """))
+            else:
+                exists = conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'prompt_fts'"
+                )).fetchone() is not None
+
+                conn.execute(text("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS prompt_fts
+                    USING fts5(query, response_text, content='prompt', content_rowid='id')
+                """))
+                conn.execute(text("""
+                    CREATE TRIGGER IF NOT EXISTS prompt_fts_ai AFTER INSERT ON prompt BEGIN
+                        INSERT INTO prompt_fts(rowid, query, response_text)
+                        VALUES (new.id, new.query, new.response_text);
+                    END
+                """))
+                conn.execute(text("""
+                    CREATE TRIGGER IF NOT EXISTS prompt_fts_ad AFTER DELETE ON prompt BEGIN
+                        INSERT INTO prompt_fts(prompt_fts, rowid, query, response_text)
+                        VALUES ('delete', old.id, old.query, old.response_text);
+                    END
+                """))
+                conn.execute(text("""
+                    CREATE TRIGGER IF NOT EXISTS prompt_fts_au AFTER UPDATE ON prompt BEGIN
+                        INSERT INTO prompt_fts(prompt_fts, rowid, query, response_text)
+                        VALUES ('delete', old.id, old.query, old.response_text);
+                        INSERT INTO prompt_fts(rowid, query, response_text)
+                        VALUES (new.id, new.query, new.response_text);
+                    END
+                """))
+                if not exists:
+                    # Index rows that existed before the table was created
+                    conn.execute(text("INSERT INTO prompt_fts(prompt_fts) VALUES ('rebuild')"))
+            conn.commit()
+    except Exception as e:
+        logger.warning(f"Could not create full-text index: {e}")
+        logger.warning("Lexical search will not be available")
 
 
 def get_session():
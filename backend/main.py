@@ -1,16 +1,25 @@
 import os
+import asyncio
 from dotenv import load_dotenv
 load_dotenv()  # Load .env file before any other imports
 
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Request, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from contextlib import asynccontextmanager
 from sqlmodel import Session, select, func
 from datetime import datetime, timedelta
 from collections import Counter
 from itertools import groupby
 
 from database import create_db_and_tables, get_session
-from models import Brand, Prompt, PromptBrandMention, Source, PromptSource, PromptEmbedding, CachedSuggestion, RecommendationProgress
+from services.container import ServiceContainer
+from services.job_queue import JobQueue
+from models import (
+    Brand, Prompt, PromptBrandMention, Source, PromptSource, PromptEmbedding,
+    CachedSuggestion, CACHE_SCHEMA_VERSIONS, RecommendationProgress, KanbanRecommendation, BackgroundJob
+)
 from schemas import (
     BrandResponse,
     PromptResponse,
@@ -53,6 +62,7 @@ from schemas import (
     CompetitorGapsSection,
     TechnicalChecklistSection,
     OutreachTargetsSection,
+    GeoStrategyResponse,
     # LLM Output Wrappers
     QuickWinsList,
     ContentOpportunitiesList,
@@ -64,9 +74,28 @@ from schemas import (
     RecommendationLLMOutput,
     RecommendationsResponse,
     RecommendationStatusUpdate,
+    RecommendationStatusBulkUpdate,
 )
 
-app = FastAPI(title="AiSEO API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Worker startup (database, shared AI services, background tasks) and shutdown"""
+    from services.container import get_service_container, close_service_container
+    from services.suggestion_cache import start_background_sweeper
+
+    create_db_and_tables()
+    seed_brands()
+    get_service_container()  # Provider clients and keep-alive pools, once per worker
+    jobs = get_jobs()
+    jobs.start()
+    start_embedding_sync_if_enabled()
+    start_background_sweeper()
+    yield
+    await jobs.stop()  # Running jobs go back to the queue for the next worker
+    await close_service_container()
+
+
+app = FastAPI(title="AiSEO API", version="1.0.0", lifespan=lifespan)
 
 # CORS for frontend - read from environment variable
 cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:5173,http://127.0.0.1:5173").split(",")
@@ -79,10 +108,37 @@ app.add_middleware(
 )
 
 
-@app.on_event("startup")
-def on_startup():
-    create_db_and_tables()
-    seed_brands()
+def get_services() -> ServiceContainer:
+    """Dependency for handlers using the AI services (shared per worker, see services.container)"""
+    from services.container import get_service_container
+    return get_service_container()
+
+
+def get_jobs() -> JobQueue:
+    """Dependency for handlers enqueueing background jobs (see the job queue section)"""
+    from services.job_queue import get_job_queue
+
+    queue = get_job_queue()
+    if not queue.handlers:
+        _register_job_handlers(queue)
+    return queue
+
+
+def start_embedding_sync_if_enabled():
+    """Queue the embedding backfill on startup when EMBEDDING_SYNC_ON_STARTUP is set"""
+    import logging
+
+    if os.getenv("EMBEDDING_SYNC_ON_STARTUP", "false").lower() != "true":
+        return
+
+    try:
+        from services.embedding_sync import vector_storage_available
+
+        # A singleton job: workers starting together share one backfill
+        if get_services().embeddings_available() and vector_storage_available():
+            get_jobs().enqueue("embedding_sync")
+    except ImportError as e:
+        logging.getLogger(__name__).warning(f"Embedding sync not started: {e}")
 
 
 def seed_brands():
@@ -406,32 +462,21 @@ def get_brands_details(session: Session = Depends(get_session)):
     return BrandListResponse(brands=result)
 
 
-@app.post("/api/brands", response_model=BrandDetailResponse)
-def create_brand(brand_data: BrandCreate, session: Session = Depends(get_session)):
-    """Create a new brand and sync mentions from existing prompts"""
-    import re
+def _backfill_brand_mentions(session: Session, brand: Brand) -> int:
+    """
+    Record the brand's mentions (or absence) in every existing prompt response.
 
-    # Check if brand already exists
-    existing = session.get(Brand, brand_data.id)
-    if existing:
-        raise HTTPException(status_code=400, detail=f"Brand with ID '{brand_data.id}' already exists")
+    Returns:
+        Number of prompts scanned
+    """
+    from sqlalchemy import delete
+    from services.context_cache import invalidate_data_version
 
-    # Create the brand
-    variations_str = ",".join(brand_data.variations) if brand_data.variations else brand_data.name
-    new_brand = Brand(
-        id=brand_data.id,
-        name=brand_data.name,
-        type=brand_data.type,
-        color=brand_data.color,
-        variations=variations_str
-    )
-    session.add(new_brand)
-    session.commit()
-    session.refresh(new_brand)
+    # Rerunnable (job retries): replace whatever an earlier attempt wrote
+    session.exec(delete(PromptBrandMention).where(PromptBrandMention.brand_id == brand.id))
 
-    # Sync mentions for all existing prompts
     all_prompts = session.exec(select(Prompt)).all()
-    search_terms = brand_data.variations if brand_data.variations else [brand_data.name]
+    search_terms = brand.variations.split(",") if brand.variations else [brand.name]
 
     for prompt in all_prompts:
         if not prompt.response_text:
@@ -472,7 +517,7 @@ def create_brand(brand_data: BrandCreate, session: Session = Depends(get_session
         # Create mention record
         mention = PromptBrandMention(
             prompt_id=prompt.id,
-            brand_id=new_brand.id,
+            brand_id=brand.id,
             mentioned=mentioned,
             position=position if mentioned else None,
             sentiment="neutral",  # Default sentiment
@@ -481,6 +526,52 @@ def create_brand(brand_data: BrandCreate, session: Session = Depends(get_session
         session.add(mention)
 
     session.commit()
+    invalidate_data_version()
+    return len(all_prompts)
+
+
+@app.post("/api/brands", response_model=BrandDetailResponse)
+def create_brand(
+    brand_data: BrandCreate,
+    http_request: Request,
+    sync: bool = False,
+    idempotency_key: str | None = Header(default=None),
+    session: Session = Depends(get_session),
+    jobs: JobQueue = Depends(get_jobs)
+):
+    """
+    Create a new brand and sync mentions from existing prompts.
+
+    The mention backfill runs as a brand_mentions job: the brand is
+    returned with 202 Accepted and a Location header pointing at the job.
+    With sync=true the backfill runs within the request and the brand is
+    returned with its metrics.
+    """
+    # Check if brand already exists
+    existing = session.get(Brand, brand_data.id)
+    if existing:
+        raise HTTPException(status_code=400, detail=f"Brand with ID '{brand_data.id}' already exists")
+
+    # Create the brand
+    variations_str = ",".join(brand_data.variations) if brand_data.variations else brand_data.name
+    new_brand = Brand(
+        id=brand_data.id,
+        name=brand_data.name,
+        type=brand_data.type,
+        color=brand_data.color,
+        variations=variations_str
+    )
+    session.add(new_brand)
+    session.commit()
+    session.refresh(new_brand)
+
+    if not sync:
+        job, _ = jobs.enqueue("brand_mentions", {"brand_id": new_brand.id}, idempotency_key)
+        return _job_accepted(
+            job, preference_applied=_prefers_async(http_request), brand=get_brand_detail(new_brand.id, session)
+        )
+
+    _backfill_brand_mentions(session, new_brand)
 
     # Return the brand details
     return get_brand_detail(new_brand.id, session)
@@ -627,6 +718,8 @@ def get_brand_detail(brand_id: str, session: Session) -> BrandDetailResponse:
 @app.delete("/api/brands/{brand_id}")
 def delete_brand(brand_id: str, session: Session = Depends(get_session)):
     """Delete a brand and all its mentions"""
+    from services.context_cache import invalidate_data_version
+
     brand = session.get(Brand, brand_id)
     if not brand:
         raise HTTPException(status_code=404, detail="Brand not found")
@@ -645,6 +738,7 @@ def delete_brand(brand_id: str, session: Session = Depends(get_session)):
     # Delete the brand
     session.delete(brand)
     session.commit()
+    invalidate_data_version()
 
     return {"success": True, "message": f"Brand '{brand_id}' deleted successfully"}
 
@@ -1269,30 +1363,377 @@ def health_check():
 # AI-Powered Suggestions Endpoints
 # ============================================================================
 
+DISCONNECT_POLL_SECONDS = 0.5
+
+
+async def run_cancellable(http_request: Request, awaitable):
+    """
+    Await an LLM call, cancelling it if the client goes away.
+
+    Starlette keeps running a handler after its client disconnects; without
+    this an abandoned generation would keep its provider request (and tokens)
+    going for up to a minute.
+
+    Raises:
+        HTTPException(499): The client disconnected before the call finished
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                task.cancel()
+                raise HTTPException(status_code=499, detail="Client closed request")
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+def _cache_rows(brand_id: str, kind: str):
+    """
+    Query for a brand's cache rows of one kind in the current schema version, newest first.
+
+    kind is 'suggestions', 'suggestions_v2' or 'recommendations'; filters
+    and order are served by ix_cachedsuggestion_brand_kind_expires.
+    Payload columns are deferred (see services.suggestion_cache.load_payload).
+    """
+    from sqlalchemy.orm import defer
+
+    return (
+        select(CachedSuggestion)
+        # Payloads load on first access only, i.e. when load_payload misses its memory tier
+        .options(defer(CachedSuggestion.suggestions_json), defer(CachedSuggestion.payload))
+        .where(CachedSuggestion.brand_id == brand_id)
+        .where(CachedSuggestion.kind == kind)
+        .where(CachedSuggestion.schema_version == CACHE_SCHEMA_VERSIONS[kind])
+        .order_by(CachedSuggestion.expires_at.desc())
+    )
+
+
+def _find_cached(session: Session, brand_id: str, kind: str):
+    """Return the newest unexpired cache row of this kind, if any"""
+    return session.exec(
+        _cache_rows(brand_id, kind).where(CachedSuggestion.expires_at > datetime.utcnow())
+    ).first()
+
+
+def _find_generated_since(session: Session, brand_id: str, kind: str, since: datetime):
+    """Return a cache row of this kind written at or after since, if any"""
+    return session.exec(
+        _cache_rows(brand_id, kind).where(CachedSuggestion.generated_at >= since)
+    ).first()
+
+
+def _shared_generation(
+    session: Session,
+    endpoint: str,
+    brand_id: str,
+    generate,
+    find_fresh,
+    force_refresh: bool = False
+):
+    """
+    Awaitable running an expensive generation once per (endpoint, brand, data version).
+
+    Concurrent identical callers in this worker await one shared task; the
+    task holds a cross-worker lock (a lease row per key), and if it had
+    to wait for another worker it first reuses what that worker cached.
+    Forced refreshes share a flight only with each other: a normal flight
+    may answer from the LLM response cache.
+
+    Args:
+        generate: Coroutine factory doing the generation and cache write
+        find_fresh: (session, since) -> payload cached at or after since, or None
+        force_refresh: generate bypasses the LLM response cache
+    """
+    from database import engine
+    from services.context_cache import get_data_version
+    from services.single_flight import get_single_flight, cross_worker_lock
+
+    key = f"{endpoint}:{brand_id}:{get_data_version(session)}"
+    if force_refresh:
+        key += ":force_refresh"
+    requested_at = datetime.utcnow()
+
+    async def generate_once():
+        async with cross_worker_lock(key):
+            with Session(engine) as fresh_session:
+                fresh = find_fresh(fresh_session, requested_at)
+            if fresh is not None:
+                return fresh
+            return await generate()
+
+    return get_single_flight().run(key, generate_once)
+
+
+async def _coalesce_generation(
+    http_request: Request,
+    session: Session,
+    endpoint: str,
+    brand_id: str,
+    generate,
+    find_fresh,
+    force_refresh: bool = False
+):
+    """Run _shared_generation for a request, cancelling it when every waiting client disconnects"""
+    return await run_cancellable(
+        http_request, _shared_generation(session, endpoint, brand_id, generate, find_fresh, force_refresh)
+    )
+
+
+# Background refreshes of stale cache entries (held so they are not garbage collected)
+_revalidations: set[asyncio.Task] = set()
+# When the last background refresh per (endpoint, brand) failed
+_revalidation_failures: dict[tuple[str, str], datetime] = {}
+
+
+def _find_stale(session: Session, brand_id: str, kind: str):
+    """
+    Return the newest cache row of this kind that expired less than
+    SUGGESTIONS_MAX_STALE_HOURS ago, if any (0 = never serve stale rows).
+
+    Only meaningful after _find_cached found nothing unexpired.
+    """
+    max_stale_hours = float(os.getenv("SUGGESTIONS_MAX_STALE_HOURS", "24"))
+    if max_stale_hours <= 0:
+        return None
+    return session.exec(
+        _cache_rows(brand_id, kind)
+        .where(CachedSuggestion.expires_at > datetime.utcnow() - timedelta(hours=max_stale_hours))
+    ).first()
+
+
+def _revalidate_in_background(session: Session, endpoint: str, brand_id: str, generate, find_fresh):
+    """
+    Regenerate a stale entry off the request path.
+
+    Joins the shared generation, so a burst of stale reads (or a concurrent
+    generate request) still regenerates once. After a failed refresh the
+    entry is not refreshed again for SUGGESTIONS_REVALIDATE_BACKOFF_MINUTES,
+    so stale reads during a provider outage do not each start a generation.
+    """
+    import logging
+
+    key = (endpoint, brand_id)
+    backoff = timedelta(minutes=float(os.getenv("SUGGESTIONS_REVALIDATE_BACKOFF_MINUTES", "5")))
+    failed_at = _revalidation_failures.get(key)
+    if failed_at is not None and datetime.utcnow() - failed_at < backoff:
+        return
+
+    generation = _shared_generation(session, endpoint, brand_id, generate, find_fresh)
+
+    async def refresh():
+        try:
+            await generation
+            _revalidation_failures.pop(key, None)
+        except Exception as e:
+            _revalidation_failures[key] = datetime.utcnow()
+            logging.getLogger(__name__).warning(f"Background refresh of {endpoint} for {brand_id} failed: {e}")
+
+    task = asyncio.create_task(refresh())
+    _revalidations.add(task)
+    task.add_done_callback(_revalidations.discard)
+
+
+async def _suggestions_context(
+    session: Session,
+    services: ServiceContainer,
+    brand: Brand,
+    v2: bool = False
+) -> tuple[str, str]:
+    """
+    Build the RAG (brand_context, analysis_context) for a V1 or V2 suggestions request.
+
+    V2 uses the extended metrics and context builders.
+    """
+    from services import RAGService
+
+    rag_service = RAGService(session, services.embedding_service)
+
+    # Calculate brand metrics (V2 with extra data)
+    if v2:
+        metrics = rag_service.calculate_brand_metrics_v2(brand.id)
+    else:
+        metrics = rag_service.calculate_brand_metrics(brand.id)
+
+    # Find similar prompts using RAG
+    search_query = f"SEO for {brand.name} ecommerce platform visibility"
+    similar_prompts = await rag_service.find_similar_prompts(
+        query=search_query,
+        brand_id=brand.id,
+        limit=20
+    )
+
+    # Build context for LLM
+    if v2:
+        brand_context = rag_service.build_brand_context_v2(brand, metrics)
+        analysis_context = rag_service.build_analysis_context_v2(brand, similar_prompts, metrics, query=search_query)
+    else:
+        brand_context = rag_service.build_brand_context(brand, metrics)
+        analysis_context = rag_service.build_analysis_context(brand, similar_prompts, metrics, query=search_query)
+    return brand_context, analysis_context
+
+
+def _new_cache_row(session: Session, brand_id: str, kind: str, payload_json: str, **fields) -> CachedSuggestion:
+    """CachedSuggestion of this kind holding a (compressed) JSON payload, stamped with its schema and data version"""
+    from services.context_cache import get_data_version
+    from services.suggestion_cache import encode_payload
+
+    cache_hours = int(os.getenv("SUGGESTIONS_CACHE_HOURS", "24"))
+    return CachedSuggestion(
+        brand_id=brand_id,
+        kind=kind,
+        schema_version=CACHE_SCHEMA_VERSIONS[kind],
+        data_version=get_data_version(session),
+        generated_at=datetime.utcnow(),
+        expires_at=datetime.utcnow() + timedelta(hours=cache_hours),
+        **encode_payload(payload_json),
+        **fields
+    )
+
+
+def _cache_suggestions(session: Session, brand_id: str, suggestions, v2: bool = False):
+    """Store generated V1/V2 suggestions as the brand's newest cache row"""
+    cached_suggestion = _new_cache_row(
+        session, brand_id, "suggestions_v2" if v2 else "suggestions",
+        payload_json=suggestions.model_dump_json(),
+        model_used=f"{suggestions.model_used}-v2" if v2 else suggestions.model_used
+    )
+    session.add(cached_suggestion)
+    session.commit()
+
+
+async def _generate_suggestions(
+    brand_id: str,
+    services: ServiceContainer,
+    use_cache: bool = True
+) -> AISuggestionsResponse:
+    """
+    Build the RAG context, call the LLM and cache the result (V1).
+
+    Runs as a shared single-flight task, so it uses its own session rather
+    than the session of whichever request started it.
+    """
+    import logging
+    from database import engine
+
+    logger = logging.getLogger(__name__)
+
+    with Session(engine) as session:
+        brand = session.get(Brand, brand_id)
+        llm_client = services.llm_client
+
+        # Check if LLM is available
+        if not llm_client.is_available():
+            logger.error("No LLM provider available - check API keys")
+            raise HTTPException(
+                status_code=503,
+                detail="AI service unavailable. Please configure ANTHROPIC_API_KEY or OPENAI_API_KEY."
+            )
+
+        # 4-6. Metrics, similar prompts (RAG) and LLM context
+        brand_context, analysis_context = await _suggestions_context(session, services, brand)
+
+        # 7. Generate suggestions with LLM
+        suggestions = await llm_client.generate_structured_output(
+            analysis_context=analysis_context,
+            brand_context=brand_context,
+            output_schema=AISuggestionsResponse,
+            use_cache=use_cache
+        )
+
+        # 8. Cache the result
+        _cache_suggestions(session, brand_id, suggestions)
+
+        logger.info(f"Generated and cached AI suggestions for brand {brand_id}")
+        return suggestions
+
+
+async def _generate_suggestions_v2(
+    brand_id: str,
+    services: ServiceContainer,
+    use_cache: bool = True
+) -> AISuggestionsResponseV2:
+    """
+    Build the V2 RAG context, call the LLM and cache the result.
+
+    Runs as a shared single-flight task with its own session (see
+    _generate_suggestions).
+    """
+    import logging
+    from database import engine
+
+    logger = logging.getLogger(__name__)
+
+    with Session(engine) as session:
+        brand = session.get(Brand, brand_id)
+        llm_client = services.llm_client
+
+        # Check if LLM is available
+        if not llm_client.is_available():
+            logger.error("No LLM provider available - check API keys")
+            raise HTTPException(
+                status_code=503,
+                detail="AI service unavailable. Please configure ANTHROPIC_API_KEY or OPENAI_API_KEY."
+            )
+
+        # 4-6. V2 metrics, similar prompts (RAG) and LLM context
+        brand_context, analysis_context = await _suggestions_context(session, services, brand, v2=True)
+
+        # 7. Generate V2 suggestions with LLM
+        suggestions = await llm_client.generate_structured_output_v2(
+            analysis_context=analysis_context,
+            brand_context=brand_context,
+            output_schema=AISuggestionsResponseV2,
+            use_cache=use_cache
+        )
+
+        # 8. Cache the result with V2 marker
+        _cache_suggestions(session, brand_id, suggestions, v2=True)
+
+        logger.info(f"Generated and cached V2 AI suggestions for brand {brand_id}")
+        return suggestions
+
+
 @app.post("/api/suggestions/generate")
 async def generate_ai_suggestions(
+    http_request: Request,
     request: GenerateSuggestionsRequest = None,
     brand_id: str = "wix",
     force_refresh: bool = False,
-    session: Session = Depends(get_session)
+    sync: bool = False,
+    idempotency_key: str | None = Header(default=None),
+    session: Session = Depends(get_session),
+    services: ServiceContainer = Depends(get_services),
+    jobs: JobQueue = Depends(get_jobs)
 ):
     """
     Generate AI-powered SEO suggestions using RAG and LLM.
 
     This endpoint:
-    1. Checks for cached suggestions (unless force_refresh=True)
+    1. Checks for cached suggestions (unless force_refresh=True); an entry
+       expired less than SUGGESTIONS_MAX_STALE_HOURS ago is returned with
+       "stale": true while it is regenerated in the background
     2. Uses pgvector for semantic similarity search (if available)
     3. Calls Claude/GPT with structured output for recommendations
     4. Caches the result for future requests
 
+    A generation (not a cache hit) is queued as a job: the response is 202
+    Accepted with a Location header for polling the job, whose result is
+    the suggestions. An Idempotency-Key header makes retried requests
+    return the same job.
+
     Args:
         brand_id: Brand to analyze (default: "wix")
         force_refresh: Force regeneration even if cached (default: False)
+        sync: Generate within the request instead of queueing a job (default: False)
 
     Returns:
         AISuggestionsResponse with AI-generated recommendations
     """
-    import json
+    from services.suggestion_cache import load_payload
     import logging
 
     logger = logging.getLogger(__name__)
@@ -1304,75 +1745,45 @@ async def generate_ai_suggestions(
 
     # 1. Check cache first (unless force_refresh)
     if not force_refresh:
-        cached = session.exec(
-            select(CachedSuggestion)
-            .where(CachedSuggestion.brand_id == brand_id)
-            .where(CachedSuggestion.expires_at > datetime.utcnow())
-            .order_by(CachedSuggestion.generated_at.desc())
-        ).first()
+        cached = _find_cached(session, brand_id, "suggestions")
 
         if cached:
             logger.info(f"Returning cached suggestions for brand {brand_id}")
-            return json.loads(cached.suggestions_json)
+            return load_payload(cached)
 
     # 2. Get the brand
     brand = session.get(Brand, brand_id)
     if not brand:
         raise HTTPException(status_code=404, detail=f"Brand {brand_id} not found")
 
-    # 3. Try to use AI services
+    # 3. Serve a recently expired entry, or generate once for all concurrent identical requests
     try:
-        from services import EmbeddingService, LLMClient, RAGService
         from services.llm_client import LLMRateLimitError
 
-        # Initialize services
-        embedding_service = EmbeddingService()
-        llm_client = LLMClient()
-        rag_service = RAGService(session, embedding_service)
-
-        # Check if LLM is available
-        if not llm_client.is_available():
-            logger.error("No LLM provider available - check API keys")
-            raise HTTPException(
-                status_code=503,
-                detail="AI service unavailable. Please configure ANTHROPIC_API_KEY or OPENAI_API_KEY."
-            )
-
-        # 4. Calculate brand metrics
-        metrics = rag_service.calculate_brand_metrics(brand_id)
-
-        # 5. Find similar prompts using RAG
-        similar_prompts = await rag_service.find_similar_prompts(
-            query=f"SEO for {brand.name} ecommerce platform visibility",
-            brand_id=brand_id,
-            limit=20
-        )
-
-        # 6. Build context for LLM
-        brand_context = rag_service.build_brand_context(brand, metrics)
-        analysis_context = rag_service.build_analysis_context(brand, similar_prompts, metrics)
-
-        # 7. Generate suggestions with LLM
-        suggestions = await llm_client.generate_structured_output(
-            analysis_context=analysis_context,
-            brand_context=brand_context,
-            output_schema=AISuggestionsResponse
-        )
-
-        # 8. Cache the result
-        cache_hours = int(os.getenv("SUGGESTIONS_CACHE_HOURS", "24"))
-        cached_suggestion = CachedSuggestion(
-            brand_id=brand_id,
-            suggestions_json=suggestions.model_dump_json(),
-            generated_at=datetime.utcnow(),
-            expires_at=datetime.utcnow() + timedelta(hours=cache_hours),
-            model_used=suggestions.model_used
+        def find_fresh(fresh_session, since):
+            cached = _find_generated_since(fresh_session, brand_id, "suggestions", since)
+            return load_payload(cached) if cached else None
+
+        def generate():
+            return _generate_suggestions(brand_id, services, use_cache=not force_refresh)
+
+        # Expired but within the staleness window: answer now, regenerate in the background
+        if not force_refresh:
+            stale = _find_stale(session, brand_id, "suggestions")
+            if stale:
+                logger.info(f"Returning stale suggestions for brand {brand_id}, refreshing in background")
+                _revalidate_in_background(session, "suggestions", brand_id, generate, find_fresh)
+                return {**load_payload(stale), "stale": True}
+
+        if not sync:
+            return _enqueue_generation(http_request, jobs, services, "suggestions", brand_id, force_refresh, idempotency_key)
+
+        return await _coalesce_generation(
+            http_request, session, "suggestions", brand_id,
+            generate=generate,
+            find_fresh=find_fresh,
+            force_refresh=force_refresh
         )
-        session.add(cached_suggestion)
-        session.commit()
-
-        logger.info(f"Generated and cached AI suggestions for brand {brand_id}")
-        return suggestions
 
     except ImportError as e:
         logger.error(f"AI services not available: {e}")
@@ -1383,6 +1794,8 @@ async def generate_ai_suggestions(
     except LLMRateLimitError as e:
         logger.error(f"LLM rate limit error: {e}")
         raise HTTPException(status_code=503, detail="AI service temporarily unavailable - rate limit exceeded")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating AI suggestions: {e}", exc_info=True)
         raise HTTPException(
@@ -1393,10 +1806,15 @@ async def generate_ai_suggestions(
 
 @app.post("/api/suggestions/generate/v2")
 async def generate_ai_suggestions_v2(
+    http_request: Request,
     request: GenerateSuggestionsRequest = None,
     brand_id: str = "wix",
     force_refresh: bool = False,
-    session: Session = Depends(get_session)
+    sync: bool = False,
+    idempotency_key: str | None = Header(default=None),
+    session: Session = Depends(get_session),
+    services: ServiceContainer = Depends(get_services),
+    jobs: JobQueue = Depends(get_jobs)
 ):
     """
     Generate V2 AI-powered SEO suggestions for professional dashboard.
@@ -1410,8 +1828,12 @@ async def generate_ai_suggestions_v2(
     - Outreach targets
 
     No percentages - focuses on actionable recommendations.
+
+    Like V1, a recently expired entry is returned with "stale": true and
+    regenerated in the background, and a generation is queued as a job
+    (202 Accepted) unless sync=true.
     """
-    import json
+    from services.suggestion_cache import load_payload
     import logging
 
     logger = logging.getLogger(__name__)
@@ -1423,77 +1845,46 @@ async def generate_ai_suggestions_v2(
 
     # 1. Check cache first (unless force_refresh)
     if not force_refresh:
-        cached = session.exec(
-            select(CachedSuggestion)
-            .where(CachedSuggestion.brand_id == brand_id)
-            .where(CachedSuggestion.expires_at > datetime.utcnow())
-            .where(CachedSuggestion.model_used.contains("v2"))  # V2 cache only
-            .order_by(CachedSuggestion.generated_at.desc())
-        ).first()
+        cached = _find_cached(session, brand_id, "suggestions_v2")
 
         if cached:
             logger.info(f"Returning cached V2 suggestions for brand {brand_id}")
-            return json.loads(cached.suggestions_json)
+            return load_payload(cached)
 
     # 2. Get the brand
     brand = session.get(Brand, brand_id)
     if not brand:
         raise HTTPException(status_code=404, detail=f"Brand {brand_id} not found")
 
-    # 3. Try to use AI services
+    # 3. Serve a recently expired entry, or generate once for all concurrent identical requests
     try:
-        from services import EmbeddingService, LLMClient, RAGService
         from services.llm_client import LLMRateLimitError
 
-        # Initialize services
-        embedding_service = EmbeddingService()
-        llm_client = LLMClient()
-        rag_service = RAGService(session, embedding_service)
-
-        # Check if LLM is available
-        if not llm_client.is_available():
-            logger.error("No LLM provider available - check API keys")
-            raise HTTPException(
-                status_code=503,
-                detail="AI service unavailable. Please configure ANTHROPIC_API_KEY or OPENAI_API_KEY."
-            )
-
-        # 4. Calculate brand metrics (V2 with extra data)
-        metrics = rag_service.calculate_brand_metrics_v2(brand_id)
-
-        # 5. Find similar prompts using RAG
-        similar_prompts = await rag_service.find_similar_prompts(
-            query=f"SEO for {brand.name} ecommerce platform visibility",
-            brand_id=brand_id,
-            limit=20
+        def find_fresh(fresh_session, since):
+            cached = _find_generated_since(fresh_session, brand_id, "suggestions_v2", since)
+            return load_payload(cached) if cached else None
+
+        def generate():
+            return _generate_suggestions_v2(brand_id, services, use_cache=not force_refresh)
+
+        # Expired but within the staleness window: answer now, regenerate in the background
+        if not force_refresh:
+            stale = _find_stale(session, brand_id, "suggestions_v2")
+            if stale:
+                logger.info(f"Returning stale suggestions_v2 for brand {brand_id}, refreshing in background")
+                _revalidate_in_background(session, "suggestions_v2", brand_id, generate, find_fresh)
+                return {**load_payload(stale), "stale": True}
+
+        if not sync:
+            return _enqueue_generation(http_request, jobs, services, "suggestions_v2", brand_id, force_refresh, idempotency_key)
+
+        return await _coalesce_generation(
+            http_request, session, "suggestions_v2", brand_id,
+            generate=generate,
+            find_fresh=find_fresh,
+            force_refresh=force_refresh
         )
 
-        # 6. Build V2 context for LLM
-        brand_context = rag_service.build_brand_context_v2(brand, metrics)
-        analysis_context = rag_service.build_analysis_context_v2(brand, similar_prompts, metrics)
-
-        # 7. Generate V2 suggestions with LLM
-        suggestions = await llm_client.generate_structured_output_v2(
-            analysis_context=analysis_context,
-            brand_context=brand_context,
-            output_schema=AISuggestionsResponseV2
-        )
-
-        # 8. Cache the result with V2 marker
-        cache_hours = int(os.getenv("SUGGESTIONS_CACHE_HOURS", "24"))
-        cached_suggestion = CachedSuggestion(
-            brand_id=brand_id,
-            suggestions_json=suggestions.model_dump_json(),
-            generated_at=datetime.utcnow(),
-            expires_at=datetime.utcnow() + timedelta(hours=cache_hours),
-            model_used=f"{suggestions.model_used}-v2"
-        )
-        session.add(cached_suggestion)
-        session.commit()
-
-        logger.info(f"Generated and cached V2 AI suggestions for brand {brand_id}")
-        return suggestions
-
     except ImportError as e:
         logger.error(f"AI services not available: {e}")
         raise HTTPException(
@@ -1503,6 +1894,8 @@ async def generate_ai_suggestions_v2(
     except LLMRateLimitError as e:
         logger.error(f"LLM rate limit error: {e}")
         raise HTTPException(status_code=503, detail="AI service temporarily unavailable - rate limit exceeded")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating V2 AI suggestions: {e}", exc_info=True)
         raise HTTPException(
@@ -1584,113 +1977,62 @@ def _get_fallback_suggestions(session: Session, brand: Brand) -> dict:
     }
 
 
-@app.post("/api/embeddings/sync")
+@app.post("/api/embeddings/sync", status_code=202)
 async def sync_embeddings(
-    limit: int = 100,
-    session: Session = Depends(get_session)
+    limit: int | None = None,
+    idempotency_key: str | None = Header(default=None),
+    services: ServiceContainer = Depends(get_services),
+    jobs: JobQueue = Depends(get_jobs)
 ):
     """
-    Backfill embeddings for existing prompts.
+    Backfill embeddings for existing prompts in the background.
 
-    Run this endpoint to generate embeddings for prompts that don't have them yet.
-    This enables semantic similarity search for RAG.
+    Queues the resumable embedding sync as an embedding_sync job and
+    answers 202 Accepted with a Location header for polling the job; while
+    one is queued or running, that job is returned instead (started: false).
+    The worker walks prompts in ID order, commits one batch at a time
+    together with its checkpoint, and a retried or reclaimed job resumes
+    from that checkpoint.
+
+    Vectors are stored in pgvector on PostgreSQL, or in the local
+    memory-mapped vector index otherwise (e.g. SQLite).
 
     Args:
-        limit: Maximum number of prompts to process (default: 100)
+        limit: Stop after roughly this many prompts (default: no limit)
 
     Returns:
-        Summary of embeddings created
+        The job plus the current sync status (503 without an embedding
+        provider, 409 without vector storage)
     """
-    import logging
-    from database import IS_POSTGRES
-
-    logger = logging.getLogger(__name__)
-
-    if not IS_POSTGRES:
-        return {
-            "status": "skipped",
-            "message": "Embedding sync only available with PostgreSQL + pgvector",
-            "created": 0
-        }
-
     try:
-        from services import EmbeddingService
-
-        embedding_service = EmbeddingService()
-        if not embedding_service.is_available():
-            return {
-                "status": "error",
-                "message": "OpenAI API key not configured",
-                "created": 0
-            }
-
-        # Find prompts without embeddings
-        existing_ids = session.exec(
-            select(PromptEmbedding.prompt_id)
-        ).all()
-        existing_ids_set = set(existing_ids)
-
-        prompts_to_embed = session.exec(
-            select(Prompt)
-            .where(Prompt.id.notin_(existing_ids_set) if existing_ids_set else True)
-            .limit(limit)
-        ).all()
-
-        if not prompts_to_embed:
-            return {
-                "status": "complete",
-                "message": "All prompts already have embeddings",
-                "created": 0
-            }
-
-        # Generate embeddings
-        created = 0
-        for prompt in prompts_to_embed:
-            if not prompt.response_text:
-                continue
-
-            embedding = await embedding_service.embed_prompt(
-                prompt.query,
-                prompt.response_text
-            )
-
-            if embedding:
-                # Note: For full pgvector support, we'd store the embedding
-                # This is a simplified version that just tracks which prompts are embedded
-                prompt_embedding = PromptEmbedding(
-                    prompt_id=prompt.id,
-                    created_at=datetime.utcnow()
-                )
-                session.add(prompt_embedding)
-                created += 1
+        from services.embedding_sync import EmbeddingSyncWorker, vector_storage_available
+    except ImportError as e:
+        raise HTTPException(status_code=503, detail=f"AI service dependencies not installed: {e}")
 
-        session.commit()
-        logger.info(f"Created {created} embeddings")
+    if not vector_storage_available():
+        raise HTTPException(
+            status_code=409,
+            detail="Embedding sync requires PostgreSQL + pgvector or numpy for the local vector index"
+        )
 
-        return {
-            "status": "success",
-            "message": f"Generated embeddings for {created} prompts",
-            "created": created,
-            "remaining": len(prompts_to_embed) - created
-        }
+    if not services.embeddings_available():
+        raise HTTPException(status_code=503, detail="OpenAI API key not configured")
 
-    except ImportError as e:
-        return {
-            "status": "error",
-            "message": f"AI services not available: {e}",
-            "created": 0
-        }
-    except Exception as e:
-        logger.error(f"Error syncing embeddings: {e}")
-        return {
-            "status": "error",
-            "message": str(e),
-            "created": 0
-        }
+    job, created = jobs.enqueue("embedding_sync", {"limit": limit}, idempotency_key)
+    return _job_accepted(
+        job,
+        status=job.status,
+        message=f"Embedding sync {job.status}" if created else f"Embedding sync already {job.status}",
+        started=created,
+        sync=EmbeddingSyncWorker(services.embedding_service).status()
+    )
 
 
 @app.get("/api/suggestions/status")
-def get_suggestions_status(session: Session = Depends(get_session)):
+def get_suggestions_status(
+    session: Session = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
+):
     """
     Get status of AI suggestions feature.
 
@@ -1699,18 +2041,11 @@ def get_suggestions_status(session: Session = Depends(get_session)):
     """
     from database import IS_POSTGRES, is_vector_search_available
 
-    # Check AI services availability
-    try:
-        from services import EmbeddingService, LLMClient
-
-        embedding_service = EmbeddingService()
-        llm_client = LLMClient()
-
-        embedding_available = embedding_service.is_available()
-        llm_available = llm_client.is_available()
-    except ImportError:
-        embedding_available = False
-        llm_available = False
+    # Check AI services availability (shared clients, nothing is constructed here)
+    embedding_service = services.embedding_service
+    llm_client = services.llm_client
+    embedding_available = services.embeddings_available()
+    llm_available = llm_client.is_available()
 
     # Count cached suggestions
     cached_count = session.exec(
@@ -1726,27 +2061,225 @@ def get_suggestions_status(session: Session = Depends(get_session)):
         select(func.count(Prompt.id))
     ).one()
 
+    # Local vector index (used when pgvector is unavailable)
+    try:
+        from services.vector_index import get_local_vector_index
+        local_index = get_local_vector_index()
+        local_index_size = len(local_index) if local_index.is_available() else None
+    except ImportError:
+        local_index_size = None
+
+    # Embedding backfill progress (checkpoint, throughput, remaining)
+    try:
+        from services.embedding_sync import EmbeddingSyncWorker
+        embedding_sync = EmbeddingSyncWorker(embedding_service).status() if embedding_available else None
+    except ImportError:
+        embedding_sync = None
+
+    # Batch pre-generation job (last run, batch in flight)
+    try:
+        from services.batch_generation import pregeneration_status
+        pregeneration = pregeneration_status()
+    except ImportError:
+        pregeneration = None
+
+    # Shared GEO context snapshots (one build per brand and data version)
+    try:
+        from services.context_cache import get_data_version, get_geo_context_cache
+        geo_context = {
+            "data_version": get_data_version(session),
+            **get_geo_context_cache().stats()
+        }
+    except ImportError:
+        geo_context = None
+
+    # Tool-call structured output: retries, repair turns and wasted tokens
+    structured_output = llm_client.structured_output_stats() if llm_available else None
+
+    # Prompt-fingerprint response cache below the per-brand CachedSuggestion rows
+    from services.llm_cache import get_llm_response_cache
+    response_cache = get_llm_response_cache()
+
+    # Retention sweeps and payload compression of the CachedSuggestion table
+    from services.suggestion_cache import sweeper_stats
+    suggestion_cache = sweeper_stats()
+
+    # Background job queue (generation and backfills off the request path)
+    job_queue = get_jobs().stats()
+
+    # Generations currently shared between identical requests in this worker
+    from services.single_flight import get_single_flight
+    generation_flights = get_single_flight().stats()
+
     return {
         "ai_suggestions_enabled": llm_available,
         "services": {
             "embedding_service": embedding_available,
             "llm_service": llm_available,
-            "vector_search": IS_POSTGRES and is_vector_search_available() if IS_POSTGRES else False
+            "vector_search": IS_POSTGRES and is_vector_search_available() if IS_POSTGRES else False,
+            "local_vector_index": local_index_size is not None
         },
         "data": {
             "cached_suggestions": cached_count,
             "prompts_with_embeddings": embedding_count,
             "total_prompts": prompt_count,
-            "embedding_coverage": f"{(embedding_count / prompt_count * 100):.1f}%" if prompt_count > 0 else "0%"
-        }
+            "embedding_coverage": f"{(embedding_count / prompt_count * 100):.1f}%" if prompt_count > 0 else "0%",
+            "local_index_vectors": local_index_size or 0
+        },
+        "embedding_sync": embedding_sync,
+        "pregeneration": pregeneration,
+        "geo_context_cache": geo_context,
+        "generation_single_flight": generation_flights,
+        "suggestion_cache": suggestion_cache,
+        "jobs": job_queue,
+        "structured_output": structured_output,
+        "llm_response_cache": response_cache.stats() if response_cache else {"enabled": False}
     }
 
 
+@app.get("/api/llm/stats")
+def get_llm_stats(output_format: str = Query(default="json", alias="format")):
+    """
+    LLM provider call metrics for this worker process.
+
+    Per (provider, model, operation): calls, errors, latency percentiles and
+    tokens split into uncached input, output, prompt cache writes and reads
+    (cache_hit_ratio = cache reads / all prompt tokens). Also retries by
+    reason, provider fallbacks and the most recent calls. `providers` shows
+    each provider's circuit breaker state and adaptive concurrency limit.
+
+    Args:
+        output_format: ?format= 'json' (default) or 'prometheus' for the text exposition format
+    """
+    from services.llm_metrics import get_llm_metrics
+    from services.provider_health import provider_health_snapshot, provider_health_prometheus
+
+    metrics = get_llm_metrics()
+    if output_format == "prometheus":
+        return PlainTextResponse(
+            metrics.prometheus() + provider_health_prometheus(),
+            media_type="text/plain; version=0.0.4"
+        )
+    if output_format != "json":
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'prometheus'")
+    return {**metrics.snapshot(), "providers": provider_health_snapshot()}
+
+
 # ============================================================================
 # GEO Strategy Split API - One endpoint per widget section
 # ============================================================================
 
-async def _get_geo_context(session: Session, brand_id: str):
+# Section prompts (shared by the per-section endpoints and /api/geo/strategy)
+
+STRATEGIC_SUMMARY_PROMPT = """Generate a strategic summary with:
+- headline: One-line summary of current state (e.g., 'Strong in informational, weak in commercial queries')
+- key_insight: The single most important insight from the data
+- biggest_opportunity: Highest-impact opportunity with specifics
+- biggest_threat: Most urgent competitive threat
+- recommended_focus: What to focus on in the next 30 days
+
+Be SPECIFIC. Reference actual queries, competitors, and numbers from the data."""
+
+QUICK_WINS_PROMPT = """Generate exactly 3 quick wins - actions completable in 1-8 hours.
+
+Each quick win must have:
+- action: Specific task (e.g., 'Add FAQ schema to wix.com/pricing')
+- target_page: Exact URL or null for site-wide
+- effort_hours: 0.5-8 hours realistic estimate
+- expected_outcome: What will improve
+- steps: List of implementation steps
+
+Focus on:
+1. Schema markup additions (FAQ, HowTo)
+2. Content optimizations for missing queries
+3. llms.txt implementation
+4. Answer-first content reformatting
+
+Reference actual queries where the brand is absent.
+
+Return JSON with an "items" array containing the quick wins."""
+
+CONTENT_OPPORTUNITIES_PROMPT = """Generate exactly 4 content opportunities ranked by impact.
+
+Each opportunity must have:
+- topic: Content topic (e.g., 'Wix vs Shopify for small business')
+- action_type: 'create', 'optimize', or 'expand'
+- target_queries: List of specific queries this content should capture
+- competitor_gap: How competitors are winning this topic (or null)
+- content_brief: 2-3 sentence description of what to cover
+- effort_days: 0.5-30 days realistic estimate
+- impact: 'low', 'medium', 'high', or 'critical'
+
+Prioritize queries where the brand is ABSENT but competitors appear.
+Reference actual competitor positions and citations.
+
+Return JSON with an "items" array containing the opportunities."""
+
+COMPETITOR_GAPS_PROMPT = """Generate exactly 3 competitor gaps - areas where competitors outperform.
+
+Each gap must have:
+- competitor: Name (e.g., 'Shopify', 'WooCommerce')
+- gap_type: 'content', 'authority', 'technical', or 'sentiment'
+- description: Detailed description of the gap
+- action_to_close: Specific action to close this gap
+- urgency: 'immediate', 'this-quarter', or 'long-term'
+- evidence: List of data points supporting this gap
+
+Reference actual citation counts, positions, and queries from the data.
+
+Return JSON with an "items" array containing the gaps."""
+
+TECHNICAL_CHECKLIST_PROMPT = """Generate exactly 5 technical GEO optimization checks.
+
+Each check must have:
+- check: Name (e.g., 'llms.txt file implemented', 'FAQ schema on pricing page')
+- status: 'done', 'missing', or 'needs-improvement' (infer from data)
+- priority: 'critical', 'important', or 'nice-to-have'
+- how_to_fix: Specific implementation guidance
+- effort: Time estimate (e.g., '30 minutes', '2 hours')
+
+Include checks for:
+1. llms.txt implementation
+2. Schema markup (FAQ, HowTo, Product, Organization)
+3. Answer-first content structure
+4. Meta descriptions optimized for AI
+5. Canonical URLs and site structure
+6. Page speed for AI crawlers
+7. Structured data validation
+
+Return JSON with an "items" array containing the checks."""
+
+OUTREACH_TARGETS_PROMPT = """Generate exactly 4 outreach targets - publications and communities to pursue.
+
+Each target must have:
+- name: Name (e.g., 'r/ecommerce', 'Forbes', 'eCommerce Fuel podcast')
+- type: 'publication', 'blog', 'podcast', 'community', or 'review-site'
+- why: Why this target matters for AI visibility
+- action: Specific action to take
+
+Focus on:
+1. Sources that AI systems actually cite (from the data)
+2. Reddit communities relevant to the brand's audience
+3. Industry publications and blogs
+4. Review sites where the brand should have presence
+5. Podcasts and media opportunities
+
+Reference actual domains from the citation data.
+
+Return JSON with an "items" array containing the targets."""
+
+# Section name -> (prompt, LLM output schema); list schemas wrap their items in `.items`
+GEO_SECTIONS = {
+    "strategic_summary": (STRATEGIC_SUMMARY_PROMPT, StrategicSummary),
+    "quick_wins": (QUICK_WINS_PROMPT, QuickWinsList),
+    "content_opportunities": (CONTENT_OPPORTUNITIES_PROMPT, ContentOpportunitiesList),
+    "competitor_gaps": (COMPETITOR_GAPS_PROMPT, CompetitorGapsList),
+    "technical_checklist": (TECHNICAL_CHECKLIST_PROMPT, TechnicalChecksList),
+    "outreach_targets": (OUTREACH_TARGETS_PROMPT, OutreachTargetsList),
+}
+
+
+async def _get_geo_context(session: Session, brand_id: str, services: ServiceContainer):
     """Helper to get brand and build context for GEO endpoints."""
     import logging
     logger = logging.getLogger(__name__)
@@ -1756,12 +2289,10 @@ async def _get_geo_context(session: Session, brand_id: str):
         raise HTTPException(status_code=404, detail=f"Brand {brand_id} not found")
 
     try:
-        from services import EmbeddingService, LLMClient, RAGService
         from services.llm_client import LLMRateLimitError
+        from services.context_cache import get_data_version, get_geo_context_cache, build_geo_context
 
-        embedding_service = EmbeddingService()
-        llm_client = LLMClient()
-        rag_service = RAGService(session, embedding_service)
+        llm_client = services.llm_client
 
         if not llm_client.is_available():
             raise HTTPException(
@@ -1769,15 +2300,15 @@ async def _get_geo_context(session: Session, brand_id: str):
                 detail="AI service unavailable. Please configure ANTHROPIC_API_KEY."
             )
 
-        metrics = rag_service.calculate_brand_metrics_v2(brand_id)
-        similar_prompts = await rag_service.find_similar_prompts(
-            query=f"SEO for {brand.name} ecommerce platform",
-            brand_id=brand_id,
-            limit=15
+        # Sections requested together share one context build per data version
+        data_version = get_data_version(session)
+        snapshot = await get_geo_context_cache().get_or_build(
+            brand_id,
+            data_version,
+            lambda: build_geo_context(brand_id, data_version)
         )
-
-        brand_context = rag_service.build_brand_context_v2(brand, metrics)
-        analysis_context = rag_service.build_analysis_context_v2(brand, similar_prompts, metrics)
+        brand_context = snapshot.brand_context
+        analysis_context = snapshot.analysis_context
 
         return brand, llm_client, brand_context, analysis_context, LLMRateLimitError
 
@@ -1788,32 +2319,27 @@ async def _get_geo_context(session: Session, brand_id: str):
 
 @app.post("/api/geo/strategic-summary", response_model=StrategicSummarySection)
 async def generate_strategic_summary(
+    http_request: Request,
     brand_id: str = "wix",
-    session: Session = Depends(get_session)
+    force_refresh: bool = False,
+    session: Session = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
 ):
     """Generate strategic summary section."""
     import logging
     logger = logging.getLogger(__name__)
 
-    brand, llm_client, brand_context, analysis_context, LLMRateLimitError = await _get_geo_context(session, brand_id)
-
-    section_prompt = """Generate a strategic summary with:
-- headline: One-line summary of current state (e.g., 'Strong in informational, weak in commercial queries')
-- key_insight: The single most important insight from the data
-- biggest_opportunity: Highest-impact opportunity with specifics
-- biggest_threat: Most urgent competitive threat
-- recommended_focus: What to focus on in the next 30 days
-
-Be SPECIFIC. Reference actual queries, competitors, and numbers from the data."""
+    brand, llm_client, brand_context, analysis_context, LLMRateLimitError = await _get_geo_context(session, brand_id, services)
 
     try:
-        data = await llm_client.generate_section(
+        data = await run_cancellable(http_request, llm_client.generate_section(
             section_name="strategic_summary",
-            section_prompt=section_prompt,
+            section_prompt=STRATEGIC_SUMMARY_PROMPT,
             analysis_context=analysis_context,
             brand_context=brand_context,
-            schema=StrategicSummary
-        )
+            schema=StrategicSummary,
+            use_cache=not force_refresh
+        ))
 
         return StrategicSummarySection(
             brand=brand.name,
@@ -1823,6 +2349,8 @@ Be SPECIFIC. Reference actual queries, competitors, and numbers from the data.""
         )
     except LLMRateLimitError as e:
         raise HTTPException(status_code=503, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating strategic summary: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1830,42 +2358,27 @@ Be SPECIFIC. Reference actual queries, competitors, and numbers from the data.""
 
 @app.post("/api/geo/quick-wins", response_model=QuickWinsSection)
 async def generate_quick_wins(
+    http_request: Request,
     brand_id: str = "wix",
-    session: Session = Depends(get_session)
+    force_refresh: bool = False,
+    session: Session = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
 ):
     """Generate quick wins section."""
     import logging
     logger = logging.getLogger(__name__)
 
-    brand, llm_client, brand_context, analysis_context, LLMRateLimitError = await _get_geo_context(session, brand_id)
-
-    section_prompt = """Generate exactly 3 quick wins - actions completable in 1-8 hours.
-
-Each quick win must have:
-- action: Specific task (e.g., 'Add FAQ schema to wix.com/pricing')
-- target_page: Exact URL or null for site-wide
-- effort_hours: 0.5-8 hours realistic estimate
-- expected_outcome: What will improve
-- steps: List of implementation steps
-
-Focus on:
-1. Schema markup additions (FAQ, HowTo)
-2. Content optimizations for missing queries
-3. llms.txt implementation
-4. Answer-first content reformatting
-
-Reference actual queries where the brand is absent.
-
-Return JSON with an "items" array containing the quick wins."""
+    brand, llm_client, brand_context, analysis_context, LLMRateLimitError = await _get_geo_context(session, brand_id, services)
 
     try:
-        result = await llm_client.generate_section(
+        result = await run_cancellable(http_request, llm_client.generate_section(
             section_name="quick_wins",
-            section_prompt=section_prompt,
+            section_prompt=QUICK_WINS_PROMPT,
             analysis_context=analysis_context,
             brand_context=brand_context,
-            schema=QuickWinsList
-        )
+            schema=QuickWinsList,
+            use_cache=not force_refresh
+        ))
 
         return QuickWinsSection(
             brand=brand.name,
@@ -1875,6 +2388,8 @@ Return JSON with an "items" array containing the quick wins."""
         )
     except LLMRateLimitError as e:
         raise HTTPException(status_code=503, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating quick wins: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1882,39 +2397,27 @@ Return JSON with an "items" array containing the quick wins."""
 
 @app.post("/api/geo/content-opportunities", response_model=ContentOpportunitiesSection)
 async def generate_content_opportunities(
+    http_request: Request,
     brand_id: str = "wix",
-    session: Session = Depends(get_session)
+    force_refresh: bool = False,
+    session: Session = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
 ):
     """Generate content opportunities section."""
     import logging
     logger = logging.getLogger(__name__)
 
-    brand, llm_client, brand_context, analysis_context, LLMRateLimitError = await _get_geo_context(session, brand_id)
-
-    section_prompt = """Generate exactly 4 content opportunities ranked by impact.
-
-Each opportunity must have:
-- topic: Content topic (e.g., 'Wix vs Shopify for small business')
-- action_type: 'create', 'optimize', or 'expand'
-- target_queries: List of specific queries this content should capture
-- competitor_gap: How competitors are winning this topic (or null)
-- content_brief: 2-3 sentence description of what to cover
-- effort_days: 0.5-30 days realistic estimate
-- impact: 'low', 'medium', 'high', or 'critical'
-
-Prioritize queries where the brand is ABSENT but competitors appear.
-Reference actual competitor positions and citations.
-
-Return JSON with an "items" array containing the opportunities."""
+    brand, llm_client, brand_context, analysis_context, LLMRateLimitError = await _get_geo_context(session, brand_id, services)
 
     try:
-        result = await llm_client.generate_section(
+        result = await run_cancellable(http_request, llm_client.generate_section(
             section_name="content_opportunities",
-            section_prompt=section_prompt,
+            section_prompt=CONTENT_OPPORTUNITIES_PROMPT,
             analysis_context=analysis_context,
             brand_context=brand_context,
-            schema=ContentOpportunitiesList
-        )
+            schema=ContentOpportunitiesList,
+            use_cache=not force_refresh
+        ))
 
         return ContentOpportunitiesSection(
             brand=brand.name,
@@ -1924,6 +2427,8 @@ Return JSON with an "items" array containing the opportunities."""
         )
     except LLMRateLimitError as e:
         raise HTTPException(status_code=503, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating content opportunities: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1931,37 +2436,27 @@ Return JSON with an "items" array containing the opportunities."""
 
 @app.post("/api/geo/competitor-gaps", response_model=CompetitorGapsSection)
 async def generate_competitor_gaps(
+    http_request: Request,
     brand_id: str = "wix",
-    session: Session = Depends(get_session)
+    force_refresh: bool = False,
+    session: Session = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
 ):
     """Generate competitor gaps section."""
     import logging
     logger = logging.getLogger(__name__)
 
-    brand, llm_client, brand_context, analysis_context, LLMRateLimitError = await _get_geo_context(session, brand_id)
-
-    section_prompt = """Generate exactly 3 competitor gaps - areas where competitors outperform.
-
-Each gap must have:
-- competitor: Name (e.g., 'Shopify', 'WooCommerce')
-- gap_type: 'content', 'authority', 'technical', or 'sentiment'
-- description: Detailed description of the gap
-- action_to_close: Specific action to close this gap
-- urgency: 'immediate', 'this-quarter', or 'long-term'
-- evidence: List of data points supporting this gap
-
-Reference actual citation counts, positions, and queries from the data.
-
-Return JSON with an "items" array containing the gaps."""
+    brand, llm_client, brand_context, analysis_context, LLMRateLimitError = await _get_geo_context(session, brand_id, services)
 
     try:
-        result = await llm_client.generate_section(
+        result = await run_cancellable(http_request, llm_client.generate_section(
             section_name="competitor_gaps",
-            section_prompt=section_prompt,
+            section_prompt=COMPETITOR_GAPS_PROMPT,
             analysis_context=analysis_context,
             brand_context=brand_context,
-            schema=CompetitorGapsList
-        )
+            schema=CompetitorGapsList,
+            use_cache=not force_refresh
+        ))
 
         return CompetitorGapsSection(
             brand=brand.name,
@@ -1971,6 +2466,8 @@ Return JSON with an "items" array containing the gaps."""
         )
     except LLMRateLimitError as e:
         raise HTTPException(status_code=503, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating competitor gaps: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1978,43 +2475,27 @@ Return JSON with an "items" array containing the gaps."""
 
 @app.post("/api/geo/technical-checklist", response_model=TechnicalChecklistSection)
 async def generate_technical_checklist(
+    http_request: Request,
     brand_id: str = "wix",
-    session: Session = Depends(get_session)
+    force_refresh: bool = False,
+    session: Session = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
 ):
     """Generate technical GEO checklist section."""
     import logging
     logger = logging.getLogger(__name__)
 
-    brand, llm_client, brand_context, analysis_context, LLMRateLimitError = await _get_geo_context(session, brand_id)
+    brand, llm_client, brand_context, analysis_context, LLMRateLimitError = await _get_geo_context(session, brand_id, services)
 
-    section_prompt = """Generate exactly 5 technical GEO optimization checks.
-
-Each check must have:
-- check: Name (e.g., 'llms.txt file implemented', 'FAQ schema on pricing page')
-- status: 'done', 'missing', or 'needs-improvement' (infer from data)
-- priority: 'critical', 'important', or 'nice-to-have'
-- how_to_fix: Specific implementation guidance
-- effort: Time estimate (e.g., '30 minutes', '2 hours')
-
-Include checks for:
-1. llms.txt implementation
-2. Schema markup (FAQ, HowTo, Product, Organization)
-3. Answer-first content structure
-4. Meta descriptions optimized for AI
-5. Canonical URLs and site structure
-6. Page speed for AI crawlers
-7. Structured data validation
-
-Return JSON with an "items" array containing the checks."""
-
-    try:
-        result = await llm_client.generate_section(
-            section_name="technical_checklist",
-            section_prompt=section_prompt,
-            analysis_context=analysis_context,
-            brand_context=brand_context,
-            schema=TechnicalChecksList
-        )
+    try:
+        result = await run_cancellable(http_request, llm_client.generate_section(
+            section_name="technical_checklist",
+            section_prompt=TECHNICAL_CHECKLIST_PROMPT,
+            analysis_context=analysis_context,
+            brand_context=brand_context,
+            schema=TechnicalChecksList,
+            use_cache=not force_refresh
+        ))
 
         return TechnicalChecklistSection(
             brand=brand.name,
@@ -2024,6 +2505,8 @@ Return JSON with an "items" array containing the checks."""
         )
     except LLMRateLimitError as e:
         raise HTTPException(status_code=503, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating technical checklist: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -2031,42 +2514,27 @@ Return JSON with an "items" array containing the checks."""
 
 @app.post("/api/geo/outreach-targets", response_model=OutreachTargetsSection)
 async def generate_outreach_targets(
+    http_request: Request,
     brand_id: str = "wix",
-    session: Session = Depends(get_session)
+    force_refresh: bool = False,
+    session: Session = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
 ):
     """Generate outreach targets section."""
     import logging
     logger = logging.getLogger(__name__)
 
-    brand, llm_client, brand_context, analysis_context, LLMRateLimitError = await _get_geo_context(session, brand_id)
-
-    section_prompt = """Generate exactly 4 outreach targets - publications and communities to pursue.
-
-Each target must have:
-- name: Name (e.g., 'r/ecommerce', 'Forbes', 'eCommerce Fuel podcast')
-- type: 'publication', 'blog', 'podcast', 'community', or 'review-site'
-- why: Why this target matters for AI visibility
-- action: Specific action to take
-
-Focus on:
-1. Sources that AI systems actually cite (from the data)
-2. Reddit communities relevant to the brand's audience
-3. Industry publications and blogs
-4. Review sites where the brand should have presence
-5. Podcasts and media opportunities
-
-Reference actual domains from the citation data.
-
-Return JSON with an "items" array containing the targets."""
+    brand, llm_client, brand_context, analysis_context, LLMRateLimitError = await _get_geo_context(session, brand_id, services)
 
     try:
-        result = await llm_client.generate_section(
+        result = await run_cancellable(http_request, llm_client.generate_section(
             section_name="outreach_targets",
-            section_prompt=section_prompt,
+            section_prompt=OUTREACH_TARGETS_PROMPT,
             analysis_context=analysis_context,
             brand_context=brand_context,
-            schema=OutreachTargetsList
-        )
+            schema=OutreachTargetsList,
+            use_cache=not force_refresh
+        ))
 
         return OutreachTargetsSection(
             brand=brand.name,
@@ -2076,70 +2544,261 @@ Return JSON with an "items" array containing the targets."""
         )
     except LLMRateLimitError as e:
         raise HTTPException(status_code=503, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating outreach targets: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# ============================================================================
-# Unified GEO Recommendations API (Kanban Board)
-# ============================================================================
-
-@app.post("/api/geo/recommendations", response_model=RecommendationsResponse)
-async def generate_recommendations(
+@app.post("/api/geo/strategy", response_model=GeoStrategyResponse)
+async def generate_geo_strategy(
+    http_request: Request,
     brand_id: str = "wix",
+    warm_cache: bool = False,
     force_refresh: bool = False,
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
 ):
     """
-    Generate 10 prioritized GEO recommendations in a single API call.
-    Returns recommendations with their current completion status from database.
+    Generate all six GEO sections concurrently from one context build.
+
+    Every section call sends the same cache-controlled brand_context prefix.
+    With warm_cache=true the strategic summary runs first so the other five
+    read the prompt cache (cheaper, slower); by default all six run at once
+    and total latency is roughly that of the slowest section.
+
+    Sections that fail are returned as null with the reason in `errors`.
+    Sections whose prompt is unchanged since an earlier generation come from
+    the LLM response cache unless force_refresh=true.
     """
     import logging
-    import uuid
     logger = logging.getLogger(__name__)
 
-    brand, llm_client, brand_context, analysis_context, LLMRateLimitError = await _get_geo_context(session, brand_id)
+    brand, llm_client, brand_context, analysis_context, LLMRateLimitError = await _get_geo_context(session, brand_id, services)
 
-    # Check for existing recommendations in cache (reuse CachedSuggestion with type marker)
-    cache_key = f"recommendations_v1_{brand_id}"
-    if not force_refresh:
-        cached = session.exec(
-            select(CachedSuggestion)
-            .where(CachedSuggestion.brand_id == brand_id)
-            .where(CachedSuggestion.suggestions_json.contains('"type": "kanban_recommendations"'))
-            .where(CachedSuggestion.expires_at > datetime.utcnow())
-        ).first()
+    async def generate(name: str):
+        prompt, schema = GEO_SECTIONS[name]
+        result = await llm_client.generate_section(
+            section_name=name,
+            section_prompt=prompt,
+            analysis_context=analysis_context,
+            brand_context=brand_context,
+            schema=schema,
+            use_cache=not force_refresh
+        )
+        return result if name == "strategic_summary" else result.items
+
+    async def generate_all():
+        names = list(GEO_SECTIONS)
+        if warm_cache:
+            first = await asyncio.gather(generate(names[0]), return_exceptions=True)
+            rest = await asyncio.gather(*(generate(name) for name in names[1:]), return_exceptions=True)
+            return dict(zip(names, first + rest))
+        results = await asyncio.gather(*(generate(name) for name in names), return_exceptions=True)
+        return dict(zip(names, results))
+
+    results = await run_cancellable(http_request, generate_all())
+
+    sections = {}
+    errors = {}
+    for name, result in results.items():
+        if isinstance(result, Exception):
+            logger.error(f"Error generating {name}: {result}")
+            errors[name] = str(result)
+            sections[name] = None
+        else:
+            sections[name] = result
+
+    if len(errors) == len(GEO_SECTIONS):
+        rate_limited = all(isinstance(r, LLMRateLimitError) for r in results.values())
+        raise HTTPException(
+            status_code=503 if rate_limited else 500,
+            detail=f"All sections failed: {next(iter(errors.values()))}"
+        )
+
+    return GeoStrategyResponse(
+        brand=brand.name,
+        generated_at=datetime.utcnow(),
+        model_used="claude-sonnet-4-5",
+        errors=errors,
+        **sections
+    )
+
+
+# ============================================================================
+# Streaming (server-sent events) - items are sent as soon as they parse
+# ============================================================================
+
+def _sse(event: str, data) -> str:
+    """Format one server-sent event"""
+    import json
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+def _sse_response(events) -> StreamingResponse:
+    """Wrap an event generator; disables proxy buffering so events flush immediately"""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _stream_validated_events(chunks, schema, on_complete):
+    """
+    Turn a StreamedOutput (the partial JSON of the forced tool call) into
+    SSE events.
+
+    Emits `item` events (one validated list element, with its field and index)
+    and `field` events (a validated non-list field) while the model is still
+    generating, then `done` with on_complete(full result), or `error`. The
+    `done` result is authoritative: if the streamed input failed validation
+    it was repaired afterwards and may differ from the streamed items.
+    Closing the connection cancels this generator and the provider stream.
+    """
+    import logging
+    from pydantic import ValidationError
+    from services.json_stream import stream_validated
+    from services.llm_client import LLMRateLimitError
+
+    logger = logging.getLogger(__name__)
+    counts = Counter()
+
+    try:
+        async for kind, key, value in stream_validated(schema, chunks):
+            if kind == "item":
+                yield _sse("item", {"field": key, "index": counts[key], "data": value})
+                counts[key] += 1
+            else:
+                yield _sse("field", {"field": key, "data": value})
+
+        yield _sse("done", on_complete(chunks.result))
+    except LLMRateLimitError as e:
+        yield _sse("error", {"status": 503, "detail": str(e)})
+    except ValidationError as e:
+        logger.error(f"Streamed response validation failed: {e}")
+        yield _sse("error", {"status": 500, "detail": f"Invalid model output: {e.error_count()} errors"})
+    except Exception as e:
+        logger.error(f"Streaming generation failed: {e}", exc_info=True)
+        yield _sse("error", {"status": 500, "detail": str(e)})
+
+
+@app.get("/api/geo/stream/{section_name}")
+async def stream_geo_section(
+    section_name: str,
+    brand_id: str = "wix",
+    session: Session = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
+):
+    """
+    Stream one GEO section over server-sent events.
 
+    section_name is any /api/geo/* section (e.g. quick-wins). Events:
+    `start`, then `item`/`field` as each element validates, then `done`
+    with the same payload as the section endpoint (or `error`).
+    """
+    name = section_name.replace("-", "_")
+    if name not in GEO_SECTIONS:
+        raise HTTPException(status_code=404, detail=f"Unknown section {section_name}")
+
+    brand, llm_client, brand_context, analysis_context, LLMRateLimitError = await _get_geo_context(session, brand_id, services)
+    prompt, schema = GEO_SECTIONS[name]
+    brand_name = brand.name
+
+    def on_complete(result):
+        return {
+            "brand": brand_name,
+            "generated_at": datetime.utcnow(),
+            "model_used": "claude-sonnet-4-5",
+            "data": result if name == "strategic_summary" else result.items,
+        }
+
+    async def events():
+        yield _sse("start", {"section": name, "brand": brand_name})
+        chunks = llm_client.stream_section(
+            section_name=name,
+            section_prompt=prompt,
+            analysis_context=analysis_context,
+            brand_context=brand_context,
+            schema=schema
+        )
+        async for event in _stream_validated_events(chunks, schema, on_complete):
+            yield event
+
+    return _sse_response(events())
+
+
+@app.get("/api/suggestions/generate/v2/stream")
+async def stream_ai_suggestions_v2(
+    brand_id: str = "wix",
+    force_refresh: bool = False,
+    session: Session = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
+):
+    """
+    Stream the full V2 strategy over server-sent events.
+
+    Same events as /api/geo/stream/{section}; `item` events carry the
+    list field (quick_wins, content_opportunities, ...) they belong to.
+    A valid cached V2 result is sent as a single `done` event, and a
+    completed stream is cached like /api/suggestions/generate/v2.
+    """
+    import json
+    from services.suggestion_cache import load_payload
+    from database import engine
+
+    if not force_refresh:
+        cached = _find_cached(session, brand_id, "suggestions_v2")
         if cached:
-            import json
-            cached_data = json.loads(cached.suggestions_json)
-            recommendations = cached_data.get("recommendations", [])
-
-            # Merge with current status from RecommendationProgress
-            for rec in recommendations:
-                progress = session.get(RecommendationProgress, rec["id"])
-                if progress:
-                    rec["status"] = progress.status
-
-            # Calculate progress stats
-            progress_stats = {
-                "todo": sum(1 for r in recommendations if r["status"] == "todo"),
-                "in_progress": sum(1 for r in recommendations if r["status"] == "in_progress"),
-                "done": sum(1 for r in recommendations if r["status"] == "done"),
-            }
+            payload = load_payload(cached)
 
-            return RecommendationsResponse(
-                brand=brand.name,
-                generated_at=cached.generated_at,
-                model_used=cached.model_used,
-                recommendations=[Recommendation(**r) for r in recommendations],
-                progress=progress_stats
-            )
+            async def cached_events():
+                yield _sse("done", payload)
 
-    # Generate new recommendations via LLM
-    # IMPORTANT: Keep prompt concise to avoid response truncation
-    section_prompt = """Generate exactly 10 GEO recommendations. KEEP RESPONSES SHORT.
+            return _sse_response(cached_events())
+
+    brand = session.get(Brand, brand_id)
+    if not brand:
+        raise HTTPException(status_code=404, detail=f"Brand {brand_id} not found")
+    brand_name = brand.name
+
+    llm_client = services.llm_client
+    if not llm_client.is_available():
+        raise HTTPException(
+            status_code=503,
+            detail="AI service unavailable. Please configure ANTHROPIC_API_KEY or OPENAI_API_KEY."
+        )
+
+    # The POST endpoint's context: the streamed result replaces its cache entry
+    brand_context, analysis_context = await _suggestions_context(session, services, brand, v2=True)
+
+    def on_complete(suggestions):
+        # The request session may already be closed once streaming ends
+        with Session(engine) as cache_session:
+            _cache_suggestions(cache_session, brand_id, suggestions, v2=True)
+        return suggestions
+
+    async def events():
+        yield _sse("start", {"brand": brand_name})
+        chunks = llm_client.stream_structured_output_v2(
+            analysis_context=analysis_context,
+            brand_context=brand_context,
+            output_schema=AISuggestionsResponseV2,
+            use_cache=not force_refresh
+        )
+        async for event in _stream_validated_events(chunks, AISuggestionsResponseV2, on_complete):
+            yield event
+
+    return _sse_response(events())
+
+
+# ============================================================================
+# Unified GEO Recommendations API (Kanban Board)
+# ============================================================================
+
+# IMPORTANT: Keep prompt concise to avoid response truncation
+RECOMMENDATIONS_PROMPT = """Generate exactly 10 GEO recommendations. KEEP RESPONSES SHORT.
 
 Each recommendation:
 - id: UUID string
@@ -2159,120 +2818,278 @@ Be SPECIFIC but BRIEF. Reference actual data.
 
 Return JSON: {"recommendations": [...]}"""
 
-    try:
-        result = await llm_client.generate_section(
-            section_name="recommendations",
-            section_prompt=section_prompt,
-            analysis_context=analysis_context,
-            brand_context=brand_context,
-            schema=RecommendationLLMOutput
+
+def _load_recommendations(session: Session, brand_id: str) -> list[Recommendation]:
+    """Load a brand's kanban cards with their current status in one query, in rank order"""
+    import json
+    rows = session.exec(
+        select(KanbanRecommendation, RecommendationProgress.status)
+        .outerjoin(RecommendationProgress, RecommendationProgress.id == KanbanRecommendation.id)
+        .where(KanbanRecommendation.brand_id == brand_id)
+        .order_by(KanbanRecommendation.rank)
+    ).all()
+
+    return [
+        Recommendation(
+            id=card.id,
+            rank=card.rank,
+            title=card.title,
+            description=card.description,
+            category=card.category,
+            priority=card.priority,
+            effort=card.effort,
+            status=status or "todo",
+            steps=json.loads(card.steps_json)
         )
+        for card, status in rows
+    ]
 
-        recommendations = result.recommendations
 
-        # Ensure all have valid UUIDs
-        for rec in recommendations:
-            if not rec.id or len(rec.id) < 10:
-                rec.id = str(uuid.uuid4())
-            rec.status = "todo"  # New recommendations always start as todo
-
-        # Cache the recommendations
-        import json
-        cache_data = {
-            "type": "kanban_recommendations",
-            "recommendations": [r.model_dump() for r in recommendations]
-        }
+def _recommendations_from_cache(session: Session, brand_name: str, cached: CachedSuggestion) -> RecommendationsResponse:
+    """Build the kanban response for the run a cache row describes"""
+    recommendations = _load_recommendations(session, cached.brand_id)
+
+    # Calculate progress stats
+    progress_stats = Counter({"todo": 0, "in_progress": 0, "done": 0})
+    progress_stats.update(r.status for r in recommendations)
+
+    return RecommendationsResponse(
+        brand=brand_name,
+        generated_at=cached.generated_at,
+        model_used=cached.model_used,
+        recommendations=recommendations,
+        progress=dict(progress_stats)
+    )
+
+
+async def _generate_recommendations(
+    brand_id: str,
+    brand_name: str,
+    llm_client,
+    brand_context: str,
+    analysis_context: str,
+    use_cache: bool = True
+) -> RecommendationsResponse:
+    """
+    Generate 10 recommendations, replace the brand's cache row and reset its progress.
+
+    Runs as a shared single-flight task with its own session.
+    """
+    result = await llm_client.generate_section(
+        section_name="recommendations",
+        section_prompt=RECOMMENDATIONS_PROMPT,
+        analysis_context=analysis_context,
+        brand_context=brand_context,
+        schema=RecommendationLLMOutput,
+        use_cache=use_cache
+    )
+
+    recommendations = _store_recommendations(brand_id, result.recommendations)
+    progress_stats = {"todo": len(recommendations), "in_progress": 0, "done": 0}
+
+    return RecommendationsResponse(
+        brand=brand_name,
+        generated_at=datetime.utcnow(),
+        model_used="claude-sonnet-4-5",
+        recommendations=recommendations,
+        progress=progress_stats
+    )
+
+
+def _store_recommendations(brand_id: str, recommendations: list) -> list:
+    """
+    Replace the brand's kanban cards and cache row with new recommendations and reset its progress.
+
+    Every card gets a progress row, so a status change is a single UPDATE.
+
+    Returns:
+        The recommendations, with fresh UUIDs and status "todo"
+    """
+    import json
+    import uuid
+    from sqlalchemy import delete
+    from database import engine
+
+    # IDs are primary keys across all brands: never trust the model's (repeats, placeholders)
+    for rec in recommendations:
+        rec.id = str(uuid.uuid4())
+        rec.status = "todo"  # New recommendations always start as todo
+
+    # The cache row records the run (expiry, model); cards live in their own rows
+    cache_data = {
+        "type": "kanban_recommendations",
+        "recommendation_ids": [r.id for r in recommendations]
+    }
 
-        # Remove old cache
-        old_cache = session.exec(
-            select(CachedSuggestion)
+    with Session(engine) as session:
+        # Remove the previous run (old cache rows of any schema version, cards, progress)
+        session.exec(
+            delete(CachedSuggestion)
             .where(CachedSuggestion.brand_id == brand_id)
-            .where(CachedSuggestion.suggestions_json.contains('"type": "kanban_recommendations"'))
-        ).all()
-        for old in old_cache:
-            session.delete(old)
-
-        # Create new cache entry
-        cache_hours = int(os.getenv("SUGGESTIONS_CACHE_HOURS", "24"))
-        new_cache = CachedSuggestion(
-            brand_id=brand_id,
-            suggestions_json=json.dumps(cache_data),
-            generated_at=datetime.utcnow(),
-            expires_at=datetime.utcnow() + timedelta(hours=cache_hours),
-            model_used="claude-sonnet-4-5"
+            .where(CachedSuggestion.kind == "recommendations")
         )
-        session.add(new_cache)
+        session.exec(delete(KanbanRecommendation).where(KanbanRecommendation.brand_id == brand_id))
+        session.exec(delete(RecommendationProgress).where(RecommendationProgress.brand_id == brand_id))
 
-        # Clear old progress entries for this brand (new recommendations = fresh start)
-        old_progress = session.exec(
-            select(RecommendationProgress).where(RecommendationProgress.brand_id == brand_id)
-        ).all()
-        for old in old_progress:
-            session.delete(old)
+        session.add(_new_cache_row(
+            session, brand_id, "recommendations",
+            payload_json=json.dumps(cache_data),
+            model_used="claude-sonnet-4-5"
+        ))
+        for rec in recommendations:
+            session.add(KanbanRecommendation(
+                id=rec.id,
+                brand_id=brand_id,
+                rank=rec.rank,
+                title=rec.title,
+                description=rec.description,
+                category=rec.category,
+                priority=rec.priority,
+                effort=rec.effort,
+                steps_json=json.dumps(rec.steps)
+            ))
+            session.add(RecommendationProgress(id=rec.id, brand_id=brand_id, status=rec.status))
 
         session.commit()
 
-        progress_stats = {"todo": 10, "in_progress": 0, "done": 0}
+    return recommendations
 
-        return RecommendationsResponse(
-            brand=brand.name,
-            generated_at=datetime.utcnow(),
-            model_used="claude-sonnet-4-5",
-            recommendations=recommendations,
-            progress=progress_stats
+
+@app.post("/api/geo/recommendations", response_model=RecommendationsResponse)
+async def generate_recommendations(
+    http_request: Request,
+    brand_id: str = "wix",
+    force_refresh: bool = False,
+    sync: bool = False,
+    idempotency_key: str | None = Header(default=None),
+    session: Session = Depends(get_session),
+    services: ServiceContainer = Depends(get_services),
+    jobs: JobQueue = Depends(get_jobs)
+):
+    """
+    Generate 10 prioritized GEO recommendations in a single API call.
+    Returns recommendations with their current completion status from database.
+
+    A generation is queued as a job (202 Accepted, see
+    /api/suggestions/generate) unless sync=true.
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+
+    brand = session.get(Brand, brand_id)
+    if not brand:
+        raise HTTPException(status_code=404, detail=f"Brand {brand_id} not found")
+    brand_name = brand.name
+
+    # Check for existing recommendations in cache
+    if not force_refresh:
+        cached = _find_cached(session, brand_id, "recommendations")
+
+        if cached:
+            return _recommendations_from_cache(session, brand_name, cached)
+
+    if not sync:
+        return _enqueue_generation(http_request, jobs, services, "recommendations", brand_id, force_refresh, idempotency_key)
+
+    _, llm_client, brand_context, analysis_context, LLMRateLimitError = await _get_geo_context(session, brand_id, services)
+
+    def find_fresh(fresh_session, since):
+        cached = _find_generated_since(fresh_session, brand_id, "recommendations", since)
+        return _recommendations_from_cache(fresh_session, brand_name, cached) if cached else None
+
+    # Generate new recommendations via LLM (once for concurrent identical requests)
+    try:
+        return await _coalesce_generation(
+            http_request, session, "recommendations", brand_id,
+            generate=lambda: _generate_recommendations(
+                brand_id, brand_name, llm_client, brand_context, analysis_context,
+                use_cache=not force_refresh
+            ),
+            find_fresh=find_fresh,
+            force_refresh=force_refresh
         )
 
     except LLMRateLimitError as e:
         raise HTTPException(status_code=503, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating recommendations: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.patch("/api/geo/recommendations/status")
+async def update_recommendation_statuses(
+    update: RecommendationStatusBulkUpdate,
+    brand_id: str | None = None,
+    session: Session = Depends(get_session)
+):
+    """
+    Move many recommendations at once (e.g. clearing a column).
+
+    Issues one UPDATE per target status. brand_id (optional) restricts the
+    update to that brand's cards; unknown IDs are listed in not_found.
+    """
+    from sqlalchemy import update as sql_update
+
+    statuses = {change.id: change.status for change in update.updates}  # Last move of a card wins
+    query = select(RecommendationProgress.id).where(RecommendationProgress.id.in_(statuses))
+    if brand_id:
+        query = query.where(RecommendationProgress.brand_id == brand_id)
+    found = set(session.exec(query).all())
+
+    updated_at = datetime.utcnow()
+    for status in set(statuses.values()):
+        ids = [rec_id for rec_id, new_status in statuses.items() if new_status == status and rec_id in found]
+        if ids:
+            session.exec(
+                sql_update(RecommendationProgress)
+                .where(RecommendationProgress.id.in_(ids))
+                .values(status=status, updated_at=updated_at)
+            )
+    session.commit()
+
+    return {
+        "updated": [
+            {"id": rec_id, "status": status, "updated_at": updated_at.isoformat()}
+            for rec_id, status in statuses.items() if rec_id in found
+        ],
+        "not_found": [rec_id for rec_id in statuses if rec_id not in found]
+    }
+
+
 @app.patch("/api/geo/recommendations/{recommendation_id}/status")
 async def update_recommendation_status(
     recommendation_id: str,
     update: RecommendationStatusUpdate,
+    brand_id: str | None = None,
     session: Session = Depends(get_session)
 ):
-    """Update the status of a recommendation (todo/in_progress/done)."""
-    import logging
-    logger = logging.getLogger(__name__)
-
-    # Get or create progress entry
-    progress = session.get(RecommendationProgress, recommendation_id)
-
-    if progress:
-        progress.status = update.status
-        progress.updated_at = datetime.utcnow()
-    else:
-        # Need to find the brand_id from cached recommendations
-        # Search all caches to find which brand this recommendation belongs to
-        caches = session.exec(
-            select(CachedSuggestion)
-            .where(CachedSuggestion.suggestions_json.contains(recommendation_id))
-        ).all()
-
-        if not caches:
-            raise HTTPException(status_code=404, detail="Recommendation not found")
+    """
+    Update the status of a recommendation (todo/in_progress/done).
 
-        brand_id = caches[0].brand_id
+    A single UPDATE by primary key; brand_id (optional) restricts it to
+    that brand's cards.
+    """
+    from sqlalchemy import update as sql_update
 
-        progress = RecommendationProgress(
-            id=recommendation_id,
-            brand_id=brand_id,
-            status=update.status,
-            updated_at=datetime.utcnow()
-        )
-        session.add(progress)
+    updated_at = datetime.utcnow()
+    statement = (
+        sql_update(RecommendationProgress)
+        .where(RecommendationProgress.id == recommendation_id)
+        .values(status=update.status, updated_at=updated_at)
+    )
+    if brand_id:
+        statement = statement.where(RecommendationProgress.brand_id == brand_id)
 
+    if session.exec(statement).rowcount == 0:
+        raise HTTPException(status_code=404, detail="Recommendation not found")
     session.commit()
-    session.refresh(progress)
 
     return {
-        "id": progress.id,
-        "status": progress.status,
-        "updated_at": progress.updated_at.isoformat()
+        "id": recommendation_id,
+        "status": update.status,
+        "updated_at": updated_at.isoformat()
     }
 
 
@@ -2282,39 +3099,380 @@ async def get_recommendations(
     session: Session = Depends(get_session)
 ):
     """Get cached recommendations for a brand (without regenerating)."""
-    import json
-
-    cached = session.exec(
-        select(CachedSuggestion)
-        .where(CachedSuggestion.brand_id == brand_id)
-        .where(CachedSuggestion.suggestions_json.contains('"type": "kanban_recommendations"'))
-    ).first()
+    cached = session.exec(_cache_rows(brand_id, "recommendations")).first()
 
     if not cached:
         raise HTTPException(status_code=404, detail="No recommendations found. Generate first with POST.")
 
-    cached_data = json.loads(cached.suggestions_json)
-    recommendations = cached_data.get("recommendations", [])
-
-    # Merge with current status
-    for rec in recommendations:
-        progress = session.get(RecommendationProgress, rec["id"])
-        if progress:
-            rec["status"] = progress.status
-
-    progress_stats = {
-        "todo": sum(1 for r in recommendations if r["status"] == "todo"),
-        "in_progress": sum(1 for r in recommendations if r["status"] == "in_progress"),
-        "done": sum(1 for r in recommendations if r["status"] == "done"),
-    }
-
     brand = session.get(Brand, brand_id)
     brand_name = brand.name if brand else brand_id
 
-    return RecommendationsResponse(
-        brand=brand_name,
-        generated_at=cached.generated_at,
-        model_used=cached.model_used,
-        recommendations=[Recommendation(**r) for r in recommendations],
-        progress=progress_stats
+    return _recommendations_from_cache(session, brand_name, cached)
+
+
+# ============================================================================
+# Batch pre-generation (warm caches after data ingestion)
+# ============================================================================
+
+async def _store_pregenerated(brand_id: str, kind: str, result):
+    """Persist a pre-generated V1/V2 suggestions or kanban result like the generate endpoints do"""
+    from database import engine
+
+    def store():
+        if kind == "recommendations":
+            _store_recommendations(brand_id, result.recommendations)
+        else:
+            with Session(engine) as session:
+                _cache_suggestions(session, brand_id, result, v2=kind == "suggestions_v2")
+
+    await asyncio.to_thread(store)
+
+
+async def _brand_pregeneration_items(session: Session, llm_client, brand: Brand, data_version: str) -> list:
+    """
+    Batch items for one brand: V1 and V2 suggestions, the six GEO sections
+    and (only when missing or expired) kanban recommendations.
+
+    Section results live only in the LLM response cache, so they are
+    skipped when that cache is disabled. Kanban recommendations are not
+    replaced while current, since replacing them resets the board's progress.
+    """
+    import logging
+    from functools import partial
+    from services.batch_generation import BatchItem, batch_custom_id
+    from services.context_cache import get_geo_context_cache, build_geo_context
+    from services.llm_cache import get_llm_response_cache
+
+    brand_id = brand.id
+    services = get_services()  # Embeddings for the RAG context; LLM calls use the job's llm_client
+    items = []
+
+    brand_context, analysis_context = await _suggestions_context(session, services, brand)
+    items.append(BatchItem(
+        batch_custom_id(brand_id, "suggestions"),
+        llm_client.prepare_structured_output(analysis_context, brand_context, AISuggestionsResponse),
+        regenerate=partial(
+            llm_client.generate_structured_output,
+            analysis_context=analysis_context, brand_context=brand_context, output_schema=AISuggestionsResponse
+        ),
+        store=partial(_store_pregenerated, brand_id, "suggestions")
+    ))
+
+    brand_context, analysis_context = await _suggestions_context(session, services, brand, v2=True)
+    items.append(BatchItem(
+        batch_custom_id(brand_id, "suggestions_v2"),
+        llm_client.prepare_structured_output_v2(analysis_context, brand_context, AISuggestionsResponseV2),
+        regenerate=partial(
+            llm_client.generate_structured_output_v2,
+            analysis_context=analysis_context, brand_context=brand_context, output_schema=AISuggestionsResponseV2
+        ),
+        store=partial(_store_pregenerated, brand_id, "suggestions_v2")
+    ))
+
+    snapshot = await get_geo_context_cache().get_or_build(
+        brand_id, data_version, lambda: build_geo_context(brand_id, data_version)
     )
+    sections = dict(GEO_SECTIONS) if get_llm_response_cache() else {}
+    if not sections:
+        logging.getLogger(__name__).info("LLM response cache disabled, GEO sections not pre-generated")
+    if _find_cached(session, brand_id, "recommendations") is None:
+        sections["recommendations"] = (RECOMMENDATIONS_PROMPT, RecommendationLLMOutput)
+
+    for name, (prompt, schema) in sections.items():
+        items.append(BatchItem(
+            batch_custom_id(brand_id, name),
+            llm_client.prepare_section(name, prompt, snapshot.analysis_context, snapshot.brand_context, schema),
+            regenerate=partial(
+                llm_client.generate_section,
+                section_name=name, section_prompt=prompt, analysis_context=snapshot.analysis_context,
+                brand_context=snapshot.brand_context, schema=schema
+            ),
+            # Sections are served from the response cache accept_batch_result wrote to
+            store=partial(_store_pregenerated, brand_id, name) if name == "recommendations" else None
+        ))
+
+    return items
+
+
+async def _pregeneration_items(session: Session, llm_client) -> list:
+    """Batch items for every brand (see _brand_pregeneration_items)"""
+    from services.context_cache import get_data_version
+
+    data_version = get_data_version(session)
+    items = []
+    for brand in session.exec(select(Brand).order_by(Brand.id)).all():
+        items.extend(await _brand_pregeneration_items(session, llm_client, brand, data_version))
+    return items
+
+
+def _pregeneration_job(**kwargs):
+    """PregenerationJob for all brands' suggestions, sections and kanban recommendations"""
+    from services.batch_generation import PregenerationJob
+    return PregenerationJob(_pregeneration_items, **kwargs)
+
+
+@app.post("/api/suggestions/pregenerate", status_code=202)
+async def pregenerate_suggestions(
+    only_if_changed: bool = False,
+    idempotency_key: str | None = Header(default=None),
+    services: ServiceContainer = Depends(get_services),
+    jobs: JobQueue = Depends(get_jobs)
+):
+    """
+    Regenerate every brand's cached AI outputs in one provider batch.
+
+    Queues a pregeneration job and answers 202 Accepted with a Location
+    header for polling it; while one is queued or running, that job is
+    returned instead (started: false). Results arrive within the batch
+    window (usually minutes, at most 24 hours) and are written to the same
+    caches the generate endpoints read. Batch progress is also reported by
+    /api/suggestions/status.
+
+    Run after each data ingestion (or from a scheduler with
+    only_if_changed=true, which skips data that was already generated).
+
+    Args:
+        only_if_changed: Skip if the data has not changed since the last complete run
+
+    Returns:
+        The job plus the current pre-generation status (503 without an LLM provider)
+    """
+    try:
+        from services.batch_generation import pregeneration_status
+    except ImportError as e:
+        raise HTTPException(status_code=503, detail=f"AI service dependencies not installed: {e}")
+
+    if not services.llm_client.is_available():
+        raise HTTPException(
+            status_code=503,
+            detail="AI service unavailable. Please configure ANTHROPIC_API_KEY or OPENAI_API_KEY."
+        )
+
+    job, created = jobs.enqueue("pregeneration", {"only_if_changed": only_if_changed}, idempotency_key)
+    return _job_accepted(
+        job,
+        status=job.status,
+        message=f"Pre-generation {job.status}" if created else f"Pre-generation already {job.status}",
+        started=created,
+        pregeneration=pregeneration_status()
+    )
+
+
+@app.post("/api/suggestions/cache/sweep")
+async def sweep_suggestion_cache_now(keep: int | None = None):
+    """
+    Run the suggestion cache sweeper now instead of waiting for its interval.
+
+    Args:
+        keep: Rows to keep per brand and kind (default: SUGGESTIONS_CACHE_KEEP)
+
+    Returns:
+        Rows deleted and compacted, plus the sweeper status
+    """
+    from services.suggestion_cache import CACHE_KEEP_PER_KIND, sweep_suggestion_cache, sweeper_stats
+
+    result = await asyncio.to_thread(sweep_suggestion_cache, keep or CACHE_KEEP_PER_KIND)
+    return {**result, "sweeper": sweeper_stats()}
+
+
+# ============================================================================
+# Background jobs (generation and backfills off the request path)
+# ============================================================================
+
+def _prefers_async(http_request: Request) -> bool:
+    """Whether the client sent "Prefer: respond-async" (RFC 7240), answered with Preference-Applied"""
+    return "respond-async" in http_request.headers.get("prefer", "").lower()
+
+
+def _job_accepted(job, preference_applied: bool = False, **content) -> JSONResponse:
+    """202 Accepted for a queued job, with a Location header for polling its status"""
+    from services.job_queue import job_status
+
+    headers = {"Location": f"/api/jobs/{job.id}"}
+    if preference_applied:
+        headers["Preference-Applied"] = "respond-async"
+    return JSONResponse(
+        status_code=202,
+        content=jsonable_encoder({**content, "job": job_status(job)}),
+        headers=headers
+    )
+
+
+def _enqueue_generation(
+    http_request: Request,
+    jobs: JobQueue,
+    services: ServiceContainer,
+    kind: str,
+    brand_id: str,
+    force_refresh: bool,
+    idempotency_key: str | None
+) -> JSONResponse:
+    """Queue a suggestions/suggestions_v2/recommendations job (503 without an LLM provider)"""
+    if not services.llm_client.is_available():
+        raise HTTPException(
+            status_code=503,
+            detail="AI service unavailable. Please configure ANTHROPIC_API_KEY or OPENAI_API_KEY."
+        )
+    job, _ = jobs.enqueue(kind, {"brand_id": brand_id, "force_refresh": force_refresh}, idempotency_key)
+    return _job_accepted(job, preference_applied=_prefers_async(http_request))
+
+
+def _job_handler(run):
+    """Adapt a handler built on endpoint helpers: client errors (4xx) are not retried"""
+    from functools import wraps
+    from services.job_queue import PermanentJobError
+
+    @wraps(run)
+    async def handler(payload: dict):
+        try:
+            return await run(payload)
+        except HTTPException as e:
+            if e.status_code < 500:
+                raise PermanentJobError(e.detail) from e
+            raise
+
+    return handler
+
+
+async def _run_generation_job(kind: str, payload: dict):
+    """
+    suggestions, suggestions_v2 and recommendations jobs.
+
+    Shares the single-flight generation of the synchronous endpoints, so a
+    job and an identical request in flight at the same time generate once.
+    The result is the generated output as the endpoint would return it.
+    """
+    from database import engine
+    from services.job_queue import PermanentJobError
+    from services.suggestion_cache import load_payload
+
+    brand_id = payload["brand_id"]
+    use_cache = not payload.get("force_refresh", False)
+    services = get_services()
+
+    with Session(engine) as session:
+        brand = session.get(Brand, brand_id)
+        if brand is None:
+            raise PermanentJobError(f"Brand {brand_id} not found")
+
+        if kind == "recommendations":
+            _, llm_client, brand_context, analysis_context, _ = await _get_geo_context(session, brand_id, services)
+
+            def generate():
+                return _generate_recommendations(
+                    brand_id, brand.name, llm_client, brand_context, analysis_context, use_cache=use_cache
+                )
+
+            def find_fresh(fresh_session, since):
+                cached = _find_generated_since(fresh_session, brand_id, kind, since)
+                return _recommendations_from_cache(fresh_session, brand.name, cached) if cached else None
+        else:
+            generator = _generate_suggestions_v2 if kind == "suggestions_v2" else _generate_suggestions
+
+            def generate():
+                return generator(brand_id, services, use_cache=use_cache)
+
+            def find_fresh(fresh_session, since):
+                cached = _find_generated_since(fresh_session, brand_id, kind, since)
+                return load_payload(cached) if cached else None
+
+        result = await _shared_generation(session, kind, brand_id, generate, find_fresh, not use_cache)
+
+    return jsonable_encoder(result)
+
+
+async def _run_embedding_sync_job(payload: dict):
+    """embedding_sync job: resumes from the sync checkpoint on every attempt"""
+    from services.embedding_sync import EmbeddingSyncWorker
+    from services.job_queue import PermanentJobError
+
+    services = get_services()
+    if not services.embeddings_available():
+        raise PermanentJobError("OpenAI API key not configured")
+    return await EmbeddingSyncWorker(services.embedding_service).run(max_items=payload.get("limit"))
+
+
+async def _run_pregeneration_job(payload: dict):
+    """pregeneration job: a retry collects the batch an interrupted attempt submitted"""
+    return await _pregeneration_job().run(only_if_changed=payload.get("only_if_changed", False))
+
+
+async def _run_brand_mentions_job(payload: dict):
+    """brand_mentions job: the mention backfill of POST /api/brands"""
+    from database import engine
+    from services.job_queue import PermanentJobError
+
+    def backfill():
+        with Session(engine) as session:
+            brand = session.get(Brand, payload["brand_id"])
+            if brand is None:
+                raise PermanentJobError(f"Brand {payload['brand_id']} not found")
+            return {"brand_id": brand.id, "prompts_scanned": _backfill_brand_mentions(session, brand)}
+
+    return await asyncio.to_thread(backfill)
+
+
+def _register_job_handlers(queue: JobQueue):
+    """Job kinds this app runs, with their retry policies"""
+    from functools import partial
+    from services.job_queue import RetryPolicy
+
+    generation_retry = RetryPolicy(max_attempts=3, base_delay=30, max_delay=300)
+    for kind in ("suggestions", "suggestions_v2", "recommendations"):
+        queue.register(kind, _job_handler(partial(_run_generation_job, kind)), generation_retry)
+
+    queue.register(
+        "embedding_sync", _job_handler(_run_embedding_sync_job),
+        RetryPolicy(max_attempts=5, base_delay=30, max_delay=600), singleton=True
+    )
+    queue.register(
+        "pregeneration", _job_handler(_run_pregeneration_job),
+        RetryPolicy(max_attempts=3, base_delay=60, max_delay=900), singleton=True
+    )
+    queue.register("brand_mentions", _job_handler(_run_brand_mentions_job))
+
+
+@app.get("/api/jobs")
+def list_jobs(
+    kind: str | None = None,
+    status: str | None = None,
+    limit: int = 50,
+    session: Session = Depends(get_session),
+    jobs: JobQueue = Depends(get_jobs)
+):
+    """
+    Recent background jobs, newest first, plus counts per kind and status.
+
+    Args:
+        kind: Only jobs of this kind (e.g. embedding_sync)
+        status: Only jobs in this status (queued/running/succeeded/failed)
+        limit: Maximum jobs returned (default: 50)
+    """
+    from services.job_queue import job_status
+
+    query = select(BackgroundJob).order_by(BackgroundJob.created_at.desc()).limit(min(limit, 500))
+    if kind:
+        query = query.where(BackgroundJob.kind == kind)
+    if status:
+        query = query.where(BackgroundJob.status == status)
+
+    return {
+        "jobs": [job_status(job) for job in session.exec(query).all()],
+        "stats": jobs.stats()
+    }
+
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str, session: Session = Depends(get_session)):
+    """
+    Status of a background job (the Location of a 202 Accepted response).
+
+    result holds the handler's output once status is "succeeded";
+    last_error the most recent failure, including retried attempts.
+    """
+    from services.job_queue import job_status
+
+    job = session.get(BackgroundJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
@@ -1,5 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column, event, DDL
+from sqlalchemy import Column, Index, LargeBinary, event, DDL, text
 from typing import Optional
 from datetime import datetime
 
@@ -39,6 +39,11 @@ class Prompt(SQLModel, table=True):
 
 class PromptBrandMention(SQLModel, table=True):
     """Records which brands are mentioned in which prompts"""
+    __table_args__ = (
+        # Brand pre-filter for vector search and per-brand aggregates
+        Index("ix_promptbrandmention_brand_prompt", "brand_id", "prompt_id"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     prompt_id: int = Field(foreign_key="prompt.id")
     brand_id: str = Field(foreign_key="brand.id")
@@ -88,16 +93,103 @@ class PromptEmbedding(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+# Payload schema version per CachedSuggestion kind; bump when a response schema
+# changes so rows in the old shape stop being served
+CACHE_SCHEMA_VERSIONS = {
+    "suggestions": 1,  # AISuggestionsResponse
+    "suggestions_v2": 1,  # AISuggestionsResponseV2
+    "recommendations": 2,  # Kanban run header; cards are KanbanRecommendation rows
+}
+
+
 class CachedSuggestion(SQLModel, table=True):
     """Cached AI-generated SEO suggestions"""
+    __table_args__ = (
+        # Cache hit: newest unexpired row of one kind for a brand
+        Index("ix_cachedsuggestion_brand_kind_expires", "brand_id", "kind", "expires_at"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     brand_id: str = Field(foreign_key="brand.id", index=True)
-    suggestions_json: str  # JSON blob of AISuggestionsResponse
+    kind: str = "suggestions"  # suggestions | suggestions_v2 | recommendations
+    schema_version: int = 1  # See CACHE_SCHEMA_VERSIONS
+    data_version: str | None = None  # get_data_version() of the data it was generated from
+    suggestions_json: str  # JSON payload when payload_encoding is "json", else ""
+    payload_encoding: str = "json"  # json | zlib | zstd (see services.suggestion_cache)
+    payload: bytes | None = Field(default=None, sa_column=Column(LargeBinary))  # Compressed JSON payload
     generated_at: datetime = Field(default_factory=datetime.utcnow)
     expires_at: datetime  # Cache expiration (default 24h)
     model_used: str  # e.g., "claude-sonnet-4.5" or "gpt-5.1"
 
 
+class EmbeddingSyncState(SQLModel, table=True):
+    """Checkpoint for the background embedding sync worker (one row per worker name)"""
+    id: str = Field(primary_key=True)  # e.g., 'prompt_embeddings'
+    last_prompt_id: int = 0  # Keyset cursor: highest prompt ID handled in the current pass
+    status: str = "idle"  # idle | running | paused | complete | error
+    processed: int = 0  # Embeddings stored in the current pass
+    failed: int = 0  # Prompts the embedding API failed on in the current pass
+    items_per_second: float = 0.0  # Throughput of the last run
+    last_error: str | None = None
+    started_at: datetime | None = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class PregenerationState(SQLModel, table=True):
+    """Last batch pre-generation run of cached suggestions (one row per job name)"""
+    id: str = Field(primary_key=True)  # e.g., 'suggestions'
+    status: str = "idle"  # idle | running | submitted | complete | skipped | error
+    data_version: str | None = None  # Data version the current/last run generates for
+    batch_id: str | None = None  # Provider batch of the current run (collected after a restart)
+    requested: int = 0  # Outputs in the current run
+    from_batch: int = 0  # Stored from batch results
+    regenerated: int = 0  # Regenerated interactively (batch error, expiry or invalid output)
+    failed: int = 0
+    last_error: str | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class BackgroundJob(SQLModel, table=True):
+    """Persistent job queue entry: generation and backfill work run off the request path"""
+    __table_args__ = (
+        # Claim: next due queued job (or running job whose lease expired)
+        Index("ix_backgroundjob_status_run_after", "status", "run_after"),
+        # Singleton kinds: at most one queued or running job, even for concurrent enqueues
+        Index(
+            "ux_backgroundjob_active_singleton", "kind", unique=True,
+            sqlite_where=text("singleton AND status IN ('queued', 'running')"),
+            postgresql_where=text("singleton AND status IN ('queued', 'running')"),
+        ),
+    )
+
+    id: str = Field(primary_key=True)  # UUID
+    kind: str = Field(index=True)  # Registered handler, e.g. 'embedding_sync'
+    payload_json: str = "{}"  # Handler arguments
+    idempotency_key: str | None = Field(default=None, unique=True)  # Same key = same job
+    singleton: bool = False  # Kind allows one active job (ux_backgroundjob_active_singleton)
+    status: str = "queued"  # queued | running | succeeded | failed
+    attempts: int = 0  # Claims so far, including the running one
+    max_attempts: int = 3
+    run_after: datetime = Field(default_factory=datetime.utcnow)  # Not claimed before (retry backoff)
+    locked_by: str | None = None  # Worker holding the lease
+    locked_until: datetime | None = None  # Lease expiry, renewed while running
+    result_json: str | None = None
+    last_error: str | None = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class GenerationLease(SQLModel, table=True):
+    """Cross-worker lock of a single-flight generation (services.single_flight.cross_worker_lock)"""
+    key: str = Field(primary_key=True)  # Single-flight key: endpoint, brand, data version
+    holder: str  # Random token of the acquisition holding it
+    expires_at: datetime  # Free for another worker to take over after this
+
+
 class RecommendationProgress(SQLModel, table=True):
     """Tracks completion status of GEO recommendations per brand"""
     id: str = Field(primary_key=True)  # recommendation UUID
@@ -106,6 +198,25 @@ class RecommendationProgress(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class KanbanRecommendation(SQLModel, table=True):
+    """One GEO recommendation card; its status is the RecommendationProgress row with the same id"""
+    __table_args__ = (
+        # Board load: a brand's cards in rank order
+        Index("ix_kanbanrecommendation_brand_rank", "brand_id", "rank"),
+    )
+
+    id: str = Field(primary_key=True)  # recommendation UUID
+    brand_id: str = Field(foreign_key="brand.id")
+    rank: int  # 1-10 (1 is highest priority)
+    title: str
+    description: str
+    category: str  # content | technical | outreach | competitive
+    priority: str  # critical | high | medium | low
+    effort: str  # e.g., "4h", "1d"
+    steps_json: str = "[]"  # JSON list of implementation steps
+    generated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 # Dynamically add vector column to PromptEmbedding if pgvector is available
 if PGVECTOR_AVAILABLE and Vector is not None:
     # Add the embedding column with pgvector type
@@ -478,6 +478,17 @@ class OutreachTargetsSection(GeoSectionBase):
     data: list[OutreachTarget]
 
 
+class GeoStrategyResponse(GeoSectionBase):
+    """Response for /api/geo/strategy (all sections, generated concurrently)"""
+    strategic_summary: Optional[StrategicSummary] = None
+    quick_wins: Optional[list[QuickWin]] = None
+    content_opportunities: Optional[list[ContentOpportunity]] = None
+    competitor_gaps: Optional[list[CompetitorGap]] = None
+    technical_checklist: Optional[list[TechnicalCheck]] = None
+    outreach_targets: Optional[list[OutreachTarget]] = None
+    errors: dict[str, str] = Field(default_factory=dict, description="Sections that failed, with the reason")
+
+
 # --- LLM Output Wrappers (for structured output parsing) ---
 
 class QuickWinsList(BaseModel):
@@ -553,3 +564,19 @@ class RecommendationStatusUpdate(BaseModel):
     status: Literal["todo", "in_progress", "done"] = Field(
         description="New status for the recommendation"
     )
+
+
+class RecommendationStatusChange(BaseModel):
+    """One card move in a bulk status update"""
+    id: str = Field(description="Recommendation UUID")
+    status: Literal["todo", "in_progress", "done"] = Field(
+        description="New status for the recommendation"
+    )
+
+
+class RecommendationStatusBulkUpdate(BaseModel):
+    """Request body for PATCH /api/geo/recommendations/status"""
+    updates: list[RecommendationStatusChange] = Field(
+        min_length=1,
+        description="Recommendations to move and their new status"
+    )
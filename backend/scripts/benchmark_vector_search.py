@@ -0,0 +1,116 @@
+"""
+Benchmark the pgvector similarity query: literal SQL vs bound binary parameter.
+
+The legacy path formatted all 3072 floats into the statement text and
+filtered brands with a correlated EXISTS; the current path (RAGService)
+binds the vector as a binary parameter and pre-filters the brand's prompts.
+Reports planner time, executor time and end-to-end latency for both.
+
+Requires PostgreSQL + pgvector with embeddings synced (scripts/sync_embeddings.py).
+Run from the backend directory:
+    python scripts/benchmark_vector_search.py
+    python scripts/benchmark_vector_search.py --brand wix --runs 50
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+from dotenv import load_dotenv
+load_dotenv()
+
+from sqlmodel import Session, text
+from database import engine, IS_POSTGRES
+from services.embeddings import EMBEDDING_DIMENSIONS
+from services.rag_service import VECTOR_SEARCH_SQL, VECTOR_SEARCH_BY_BRAND_SQL
+
+
+def legacy_sql(embedding: np.ndarray, brand_id: str | None, limit: int) -> str:
+    """The pre-parameterization query, kept here for comparison only"""
+    embedding_str = "[" + ",".join(str(x) for x in embedding.tolist()) + "]"
+    sql = f"""
+        SELECT p.id, p.query, p.run_number, p.response_text, p.scraped_at,
+               pe.embedding <=> '{embedding_str}'::vector AS distance
+        FROM prompt p
+        JOIN promptembedding pe ON p.id = pe.prompt_id
+        WHERE pe.embedding IS NOT NULL
+    """
+    if brand_id:
+        sql += f"""
+            AND EXISTS (
+                SELECT 1 FROM promptbrandmention m
+                WHERE m.prompt_id = p.id
+                AND m.brand_id = '{brand_id}'
+            )
+        """
+    return sql + f" ORDER BY distance ASC LIMIT {limit}"
+
+
+def explain(session: Session, statement, params: dict) -> tuple[float, float]:
+    """Return (planning ms, execution ms) from EXPLAIN ANALYZE"""
+    explain_stmt = text(f"EXPLAIN (ANALYZE, FORMAT JSON) {statement.text}")
+    plan = session.exec(explain_stmt, params=params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Planning Time"], plan[0]["Execution Time"]
+
+
+def summarize(label: str, planning: list[float], execution: list[float], wall: list[float]):
+    """Print median/p95 for one variant"""
+    def p95(values):
+        return sorted(values)[max(0, int(len(values) * 0.95) - 1)]
+
+    print(f"\n{label}")
+    print(f"  planning  median {statistics.median(planning):8.2f} ms   p95 {p95(planning):8.2f} ms")
+    print(f"  execution median {statistics.median(execution):8.2f} ms   p95 {p95(execution):8.2f} ms")
+    print(f"  end-to-end median {statistics.median(wall):7.2f} ms   p95 {p95(wall):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pgvector similarity search")
+    parser.add_argument("--brand", default=None, help="Brand ID filter (default: none)")
+    parser.add_argument("--runs", type=int, default=20, help="Runs per variant (default: 20)")
+    parser.add_argument("--limit", type=int, default=15, help="Result limit (default: 15)")
+    args = parser.parse_args()
+
+    if not IS_POSTGRES:
+        print("This benchmark requires PostgreSQL + pgvector (set DATABASE_URL)")
+        return
+
+    rng = np.random.default_rng(42)
+    vectors = rng.normal(size=(args.runs, EMBEDDING_DIMENSIONS)).astype(np.float32)
+
+    results = {"legacy": ([], [], []), "parameterized": ([], [], [])}
+
+    with Session(engine) as session:
+        for vector in vectors:
+            # Legacy: literal vector + correlated EXISTS
+            statement = text(legacy_sql(vector, args.brand, args.limit))
+            planning, execution = explain(session, statement, {})
+            started = time.perf_counter()
+            session.exec(statement).fetchall()
+            wall = (time.perf_counter() - started) * 1000
+            for bucket, value in zip(results["legacy"], (planning, execution, wall)):
+                bucket.append(value)
+
+            # Current: bound binary vector + brand pre-filter
+            statement = VECTOR_SEARCH_BY_BRAND_SQL if args.brand else VECTOR_SEARCH_SQL
+            params = {"query_embedding": vector, "limit": args.limit}
+            if args.brand:
+                params["brand_id"] = args.brand
+            planning, execution = explain(session, statement, params)
+            started = time.perf_counter()
+            session.exec(statement, params=params).fetchall()
+            wall = (time.perf_counter() - started) * 1000
+            for bucket, value in zip(results["parameterized"], (planning, execution, wall)):
+                bucket.append(value)
+
+    print(f"Vector search benchmark ({args.runs} runs, limit {args.limit}, brand {args.brand or '-'})")
+    summarize("Legacy (literal vector, correlated EXISTS)", *results["legacy"])
+    summarize("Parameterized (binary vector, brand pre-filter)", *results["parameterized"])
+
+
+if __name__ == "__main__":
+    main()
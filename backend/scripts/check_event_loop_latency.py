@@ -0,0 +1,123 @@
+"""
+Check that dashboard reads stay responsive while an LLM generation is in flight.
+
+Runs the app in-process, swaps the Anthropic client for a stand-in that takes
+--generation-seconds to answer, starts a GEO section generation and keeps
+polling /api/metrics meanwhile. With the async client the reads keep their
+normal latency; --blocking simulates the old sync client (time.sleep inside
+the coroutine) to show the whole worker freezing.
+
+Exits non-zero if the slowest read exceeds --max-latency-ms.
+
+Run from the backend directory:
+    python scripts/check_event_loop_latency.py
+    python scripts/check_event_loop_latency.py --blocking
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+
+from dotenv import load_dotenv
+load_dotenv()
+os.environ.setdefault("ANTHROPIC_API_KEY", "local-check")  # Stand-in client never calls out
+
+import httpx
+
+import main
+from services import llm_client as llm_module
+
+SUMMARY = {
+    "headline": "Latency check",
+    "key_insight": "-",
+    "biggest_opportunity": "-",
+    "biggest_threat": "-",
+    "recommended_focus": "-",
+}
+
+
+def make_stand_in(generation_seconds: float, blocking: bool):
+    """Build an AsyncAnthropic replacement that answers after a fixed delay"""
+
+    class _ToolUse:
+        type = "tool_use"
+        id = "stand-in"
+        input = SUMMARY
+
+    class _Response:
+        content = [_ToolUse()]
+
+    class _Messages:
+        async def create(self, **kwargs):
+            if blocking:
+                time.sleep(generation_seconds)  # What the sync SDK client did
+            else:
+                await asyncio.sleep(generation_seconds)
+            return _Response()
+
+    class StandInAnthropic:
+        def __init__(self, **kwargs):
+            self.messages = _Messages()
+
+    return StandInAnthropic
+
+
+async def run(args) -> list[float]:
+    llm_module.anthropic.AsyncAnthropic = make_stand_in(args.generation_seconds, args.blocking)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check", timeout=None) as client:
+        # Warm up (imports, caches, GEO context build)
+        await client.get("/api/metrics")
+
+        generation = asyncio.create_task(
+            client.post("/api/geo/strategic-summary", params={"brand_id": args.brand})
+        )
+
+        # Each sample is the read plus any extra delay in waking up after the
+        # pause, so a stalled event loop shows up even between reads
+        latencies = []
+        while not generation.done():
+            started = time.perf_counter()
+            await client.get("/api/metrics")
+            await asyncio.sleep(args.interval)
+            latencies.append((time.perf_counter() - started - args.interval) * 1000)
+
+        response = await generation
+        print(f"Generation finished with HTTP {response.status_code}")
+        return latencies
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Check event loop responsiveness during LLM generation")
+    parser.add_argument("--brand", default="wix", help="Brand ID (default: wix)")
+    parser.add_argument("--generation-seconds", type=float, default=5.0,
+                        help="Simulated provider latency (default: 5)")
+    parser.add_argument("--interval", type=float, default=0.1,
+                        help="Pause between dashboard reads in seconds (default: 0.1)")
+    parser.add_argument("--max-latency-ms", type=float, default=1000.0,
+                        help="Fail if any read is slower than this (default: 1000)")
+    parser.add_argument("--blocking", action="store_true",
+                        help="Simulate the old blocking client for comparison")
+    args = parser.parse_args()
+
+    latencies = asyncio.run(run(args))
+    if not latencies:
+        print("No reads completed during generation")
+        sys.exit(1)
+
+    print(f"Dashboard reads during generation: {len(latencies)}")
+    print(f"  median {statistics.median(latencies):8.1f} ms")
+    print(f"  max    {max(latencies):8.1f} ms")
+
+    if max(latencies) > args.max_latency_ms:
+        print(f"FAIL: slowest read exceeded {args.max_latency_ms:.0f} ms")
+        sys.exit(1)
+    print("OK: event loop stayed responsive")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,156 @@
+"""
+Load-test the generation endpoints offline against stand-in providers.
+
+Runs the app in-process with LLM_PROVIDER_MODE=fake (or replay), so no API
+keys are used and nothing is billed. Fires --requests requests at one
+endpoint with --concurrency in flight and reports throughput, latency
+percentiles and status codes, plus how many provider calls were actually
+made (coalescing, response cache), retries, fallbacks and circuit state.
+
+Latency and failures of the stand-in providers are configurable, e.g. to
+watch the circuit breaker and concurrency limiter react to 429s.
+
+Note: generations write cache rows to the configured database.
+
+Run from the backend directory:
+    python scripts/load_test_generation.py --endpoint quick-wins --requests 50 --concurrency 10
+    python scripts/load_test_generation.py --endpoint suggestions --force-refresh --concurrency 20
+    python scripts/load_test_generation.py --endpoint strategy --failure-rate 0.3 --failure-kind rate_limit
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+from collections import Counter
+
+from dotenv import load_dotenv
+
+ENDPOINTS = {
+    "strategic-summary": "/api/geo/strategic-summary",
+    "quick-wins": "/api/geo/quick-wins",
+    "content-opportunities": "/api/geo/content-opportunities",
+    "competitor-gaps": "/api/geo/competitor-gaps",
+    "technical-checklist": "/api/geo/technical-checklist",
+    "outreach-targets": "/api/geo/outreach-targets",
+    "strategy": "/api/geo/strategy",
+    "recommendations": "/api/geo/recommendations",
+    "suggestions": "/api/suggestions/generate",
+    "suggestions-v2": "/api/suggestions/generate/v2",
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline load test of the generation endpoints")
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="quick-wins",
+                        help="Endpoint to load (default: quick-wins)")
+    parser.add_argument("--brand", default="wix", help="Brand ID (default: wix)")
+    parser.add_argument("--requests", type=int, default=50, help="Total requests (default: 50)")
+    parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight (default: 10)")
+    parser.add_argument("--force-refresh", action="store_true",
+                        help="Send force_refresh=true (bypass result caches)")
+    parser.add_argument("--mode", choices=["fake", "replay"], default="fake",
+                        help="Stand-in mode: synthesize, or replay recordings (default: fake)")
+    parser.add_argument("--latency-ms", type=float, default=800, help="Mean provider latency (default: 800)")
+    parser.add_argument("--jitter-ms", type=float, default=200, help="Latency standard deviation (default: 200)")
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                        help="Fraction of provider calls that fail (default: 0)")
+    parser.add_argument("--failure-kind", default="rate_limit",
+                        choices=["rate_limit", "overloaded", "server_error", "connection", "timeout"],
+                        help="Injected failure type (default: rate_limit)")
+    parser.add_argument("--response-cache", action="store_true",
+                        help="Keep the LLM response cache enabled (default: disabled)")
+    return parser.parse_args()
+
+
+def configure(args):
+    """Provider settings are read at import time, so set them before importing the app"""
+    os.environ.update({
+        "LLM_PROVIDER_MODE": args.mode,
+        "FAKE_PROVIDER_LATENCY_MS": str(args.latency_ms),
+        "FAKE_PROVIDER_LATENCY_JITTER_MS": str(args.jitter_ms),
+        "FAKE_PROVIDER_FAILURE_RATE": str(args.failure_rate),
+        "FAKE_PROVIDER_FAILURE_KIND": args.failure_kind,
+        "LLM_CACHE_ENABLED": "true" if args.response_cache else "false",
+    })
+
+
+async def run(args):
+    import httpx
+    import main
+    from database import create_db_and_tables
+
+    create_db_and_tables()
+    # No lifespan (and so no job workers) under ASGITransport: generate within the request
+    params = {"brand_id": args.brand, "sync": "true"}
+    if args.force_refresh:
+        params["force_refresh"] = "true"
+
+    latencies = []
+    statuses = Counter()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=None) as client:
+
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(ENDPOINTS[args.endpoint], params=params)
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+        llm_stats = (await client.get("/api/llm/stats")).json()
+        status = (await client.get("/api/suggestions/status")).json()
+
+    return latencies, statuses, elapsed, llm_stats, status
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def main_cli():
+    load_dotenv()
+    args = parse_args()
+    configure(args)
+
+    latencies, statuses, elapsed, llm_stats, status = asyncio.run(run(args))
+
+    print(f"\n{args.requests} x POST {ENDPOINTS[args.endpoint]} "
+          f"(concurrency {args.concurrency}, provider latency {args.latency_ms:.0f}ms, "
+          f"failure rate {args.failure_rate:.0%} {args.failure_kind})")
+    print(f"  throughput   {args.requests / elapsed:8.1f} req/s over {elapsed:.1f}s")
+    print(f"  latency p50  {percentile(latencies, 0.5) * 1000:8.0f} ms")
+    print(f"  latency p95  {percentile(latencies, 0.95) * 1000:8.0f} ms")
+    print(f"  latency max  {max(latencies) * 1000:8.0f} ms")
+    print(f"  statuses     {dict(sorted(statuses.items()))}")
+
+    print("\nProvider calls")
+    print(f"  calls        {llm_stats['calls']} ({llm_stats['errors']} failed)")
+    print(f"  tokens       {llm_stats['tokens']}")
+    print(f"  retries      {sum(r['count'] for r in llm_stats['retries'])}")
+    print(f"  fallbacks    {sum(f['count'] for f in llm_stats['fallbacks'])}")
+    for provider, health in llm_stats.get("providers", {}).items():
+        print(f"  {provider:12} circuit {health['circuit']['state']}, "
+              f"concurrency limit {health['concurrency']['limit']}")
+
+    flights = status.get("generation_single_flight") or {}
+    print("\nCoalescing")
+    print(f"  generations started {flights.get('started', 0)}, joined {flights.get('shared', 0)}")
+    response_cache = status.get("llm_response_cache") or {}
+    if response_cache.get("enabled"):
+        print(f"  response cache hits {response_cache.get('hits', 0)}, misses {response_cache.get('misses', 0)}")
+
+    if statuses.get(200, 0) == 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
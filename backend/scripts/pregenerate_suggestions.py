@@ -0,0 +1,64 @@
+"""
+Pre-generate every brand's cached AI outputs after a data ingestion.
+
+Submits V1/V2 suggestions, GEO sections and missing kanban recommendations
+for all brands as one Message Batches request (half the per-token price of
+interactive calls), waits for the results and writes them to the caches the
+API reads. With --if-changed it exits immediately unless the data changed
+since the last complete run, so it can be scheduled frequently (e.g. cron).
+A run interrupted while its batch is processing collects that batch on the
+next run instead of submitting a new one.
+
+With LLM_PROVIDER_MODE=fake the batch runs against the local stand-in.
+
+Run from the backend directory:
+    python scripts/pregenerate_suggestions.py
+    python scripts/pregenerate_suggestions.py --if-changed
+    python scripts/pregenerate_suggestions.py --interactive   # No batch API (e.g. OpenAI only)
+    python scripts/pregenerate_suggestions.py --status
+"""
+
+import argparse
+import asyncio
+import json
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from database import create_db_and_tables
+from services.batch_generation import BATCH_POLL_SECONDS, pregeneration_status
+from main import _pregeneration_job
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate cached AI suggestions for all brands")
+    parser.add_argument("--if-changed", action="store_true",
+                        help="Skip if the data has not changed since the last complete run")
+    parser.add_argument("--interactive", action="store_true",
+                        help="Generate with interactive calls instead of a provider batch")
+    parser.add_argument("--poll-seconds", type=float, default=BATCH_POLL_SECONDS,
+                        help=f"Batch status poll interval (default: {BATCH_POLL_SECONDS:.0f})")
+    parser.add_argument("--status", action="store_true",
+                        help="Print the last run's status and exit")
+    args = parser.parse_args()
+
+    create_db_and_tables()
+
+    if args.status:
+        print(json.dumps(pregeneration_status(), indent=2))
+        return
+
+    job = _pregeneration_job(poll_seconds=args.poll_seconds)
+    status = asyncio.run(job.run(only_if_changed=args.if_changed, use_batch=not args.interactive))
+
+    print("\n--- Pre-generation ---")
+    print(f"Status: {status['status']} (data version {status['data_version']})")
+    if status["status"] != "skipped":
+        print(f"Outputs: {status['requested']}")
+        print(f"From batch: {status['from_batch']}")
+        print(f"Regenerated interactively: {status['regenerated']}")
+        print(f"Failed: {status['failed']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Backfill prompt embeddings outside the API process.
+
+Resumes from the checkpoint stored in the database, so it can be stopped
+and restarted at any time (and picks up where the API's background task left off).
+
+Run from the backend directory:
+    python scripts/sync_embeddings.py
+    python scripts/sync_embeddings.py --batch-size 100 --limit 500
+    python scripts/sync_embeddings.py --reset
+"""
+
+import argparse
+import asyncio
+import json
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from database import create_db_and_tables
+from services.embedding_sync import EmbeddingSyncWorker, BATCH_SIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill prompt embeddings")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help=f"Prompts per embedding call and commit (default: {BATCH_SIZE})")
+    parser.add_argument("--limit", type=int, default=None,
+                        help="Stop after roughly this many prompts (default: no limit)")
+    parser.add_argument("--reset", action="store_true",
+                        help="Ignore the checkpoint and start a new pass from the first prompt")
+    parser.add_argument("--status", action="store_true",
+                        help="Print the current sync status and exit")
+    args = parser.parse_args()
+
+    create_db_and_tables()
+    worker = EmbeddingSyncWorker(batch_size=args.batch_size)
+
+    if args.status:
+        print(json.dumps(worker.status(), indent=2))
+        return
+
+    before = worker.status()
+    print(f"Remaining prompts: {before['remaining']} (checkpoint: {before['checkpoint']})")
+
+    status = asyncio.run(worker.run(max_items=args.limit, reset=args.reset))
+
+    print("\n--- Embedding Sync ---")
+    print(f"Status: {status['status']}")
+    print(f"Embedded this pass: {status['processed']} ({status['failed']} failed)")
+    print(f"Throughput: {status['items_per_second']} prompts/s")
+    print(f"Remaining: {status['remaining']}")
+
+
+if __name__ == "__main__":
+    main()
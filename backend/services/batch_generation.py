@@ -0,0 +1,276 @@
+"""
+Batch pre-generation of cached suggestions through the Message Batches API.
+
+Suggestions are otherwise generated on the first request after the cache
+expires, and that user waits 30+ seconds. After each data ingestion this job
+regenerates every brand's outputs (V1 and V2 suggestions, GEO sections,
+kanban recommendations) in one provider batch, at half the per-token price
+of interactive calls, so users read a warm cache.
+
+The job records the data version it generated for and the ID of the batch
+in flight (PregenerationState): run(only_if_changed=True) is a no-op until
+new data arrives, and a restarted job collects the batch it already
+submitted instead of paying for a new one. Results that errored, expired or
+fail validation (batch requests get no repair turn) are regenerated
+interactively through LLMClient.
+"""
+import os
+import re
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional
+from sqlmodel import Session
+
+from models import PregenerationState
+from database import engine
+from .container import get_service_container
+from .context_cache import get_data_version
+from .llm_client import LLMClient, PreparedRequest
+
+logger = logging.getLogger(__name__)
+
+PREGENERATION_STATE_ID = "suggestions"
+BATCH_POLL_SECONDS = float(os.getenv("LLM_BATCH_POLL_SECONDS", "30"))
+BATCH_MAX_WAIT_SECONDS = float(os.getenv("LLM_BATCH_MAX_WAIT_SECONDS", "86400"))  # Provider limit is 24h
+
+
+class BatchItem:
+    """
+    One output to pre-generate.
+
+    regenerate produces the result interactively when the batch did not;
+    store persists a validated result (cache row, kanban rows) and is None
+    for outputs that only live in the LLM response cache.
+    """
+
+    __slots__ = ("custom_id", "prepared", "regenerate", "store")
+
+    def __init__(
+        self,
+        custom_id: str,
+        prepared: PreparedRequest,
+        regenerate: Callable[[], Awaitable[Any]],
+        store: Optional[Callable[[Any], Awaitable[None]]] = None
+    ):
+        self.custom_id = custom_id
+        self.prepared = prepared
+        self.regenerate = regenerate
+        self.store = store
+
+
+def batch_custom_id(*parts: str) -> str:
+    """Deterministic batch custom_id (the API allows [a-zA-Z0-9_-], at most 64 characters)"""
+    return re.sub(r"[^a-zA-Z0-9_-]", "_", "-".join(parts))[:64]
+
+
+class PregenerationJob:
+    """
+    Regenerate all brands' cached outputs in one provider batch.
+
+    build_items(session, llm_client) returns the BatchItems for the current
+    data; it must be deterministic for a data version so a resumed run can
+    match the results of an earlier submission by custom_id.
+    """
+
+    def __init__(
+        self,
+        build_items: Callable[[Session, LLMClient], Awaitable[list[BatchItem]]],
+        llm_client: Optional[LLMClient] = None,
+        poll_seconds: float = BATCH_POLL_SECONDS,
+        max_wait_seconds: float = BATCH_MAX_WAIT_SECONDS
+    ):
+        self.build_items = build_items
+        self.llm_client = llm_client or get_service_container().llm_client
+        self.poll_seconds = poll_seconds
+        self.max_wait_seconds = max_wait_seconds
+
+    def _get_state(self, session: Session) -> PregenerationState:
+        """Load the state row, creating it on first use"""
+        state = session.get(PregenerationState, PREGENERATION_STATE_ID)
+        if state is None:
+            state = PregenerationState(id=PREGENERATION_STATE_ID)
+            session.add(state)
+            session.commit()
+            session.refresh(state)
+        return state
+
+    def _update_state(self, **fields):
+        with Session(engine) as session:
+            state = self._get_state(session)
+            for name, value in fields.items():
+                setattr(state, name, value)
+            state.updated_at = datetime.utcnow()
+            session.add(state)
+            session.commit()
+
+    async def run(self, only_if_changed: bool = False, use_batch: bool = True) -> dict:
+        """
+        Pre-generate every item for the current data version.
+
+        Args:
+            only_if_changed: Skip if the last complete run covered this data version
+            use_batch: Submit a provider batch (False = interactive calls only,
+                e.g. when only OpenAI is configured)
+
+        Returns:
+            Final job status
+        """
+        if not self.llm_client.is_available():
+            raise RuntimeError("No LLM provider available - check API keys")
+        use_batch = use_batch and self.llm_client.anthropic_client is not None
+
+        with Session(engine) as session:
+            state = self._get_state(session)
+            data_version = get_data_version(session)
+            if only_if_changed and state.status in ("complete", "skipped") and state.data_version == data_version:
+                logger.info(f"Pre-generation skipped, data version {data_version} already generated")
+                self._update_state(status="skipped")
+                return self.status()
+            # Set from submission until completion, so it survives restarts and errors
+            resume_batch = state.batch_id if use_batch and state.data_version == data_version else None
+            items = await self.build_items(session, self.llm_client)
+
+        self._update_state(
+            status="running", data_version=data_version, batch_id=resume_batch, requested=len(items),
+            from_batch=0, regenerated=0, failed=0, last_error=None,
+            started_at=datetime.utcnow(), finished_at=None
+        )
+        started = time.monotonic()
+
+        try:
+            pending = items
+            if use_batch and items:
+                if resume_batch and await self._can_resume(resume_batch):
+                    batch_id = resume_batch
+                else:
+                    batch_id = await self._submit(items)
+                self._update_state(status="submitted", batch_id=batch_id)
+                await self._wait(batch_id)
+                pending = await self._collect(batch_id, items, started)
+                self._update_state(from_batch=len(items) - len(pending))
+            regenerated, failed = await self._regenerate(pending)
+        except Exception as e:
+            logger.error(f"Pre-generation failed: {e}", exc_info=True)
+            # A submitted batch keeps its ID, so the next run collects it
+            self._update_state(status="error", last_error=str(e), finished_at=datetime.utcnow())
+            raise
+
+        self._update_state(
+            status="complete", batch_id=None, regenerated=regenerated, failed=failed,
+            finished_at=datetime.utcnow()
+        )
+        logger.info(
+            f"Pre-generated {len(items) - failed}/{len(items)} outputs in {time.monotonic() - started:.0f}s "
+            f"({len(items) - len(pending)} from batch, {regenerated} regenerated, {failed} failed)"
+        )
+        return self.status()
+
+    async def _submit(self, items: list[BatchItem]) -> str:
+        batch = await self.llm_client.anthropic_client.messages.batches.create(
+            requests=[{"custom_id": item.custom_id, "params": item.prepared.params} for item in items]
+        )
+        logger.info(f"Submitted pre-generation batch {batch.id} ({len(items)} requests)")
+        return batch.id
+
+    async def _can_resume(self, batch_id: str) -> bool:
+        try:
+            batch = await self.llm_client.anthropic_client.messages.batches.retrieve(batch_id)
+        except Exception as e:
+            logger.warning(f"Cannot resume batch {batch_id}, submitting a new one: {e}")
+            return False
+        logger.info(f"Resuming pre-generation batch {batch_id} ({batch.processing_status})")
+        return True
+
+    async def _wait(self, batch_id: str):
+        """Poll until the batch has ended; cancel it after max_wait_seconds"""
+        batches = self.llm_client.anthropic_client.messages.batches
+        deadline = time.monotonic() + self.max_wait_seconds
+        while True:
+            batch = await batches.retrieve(batch_id)
+            if batch.processing_status == "ended":
+                return
+            if time.monotonic() >= deadline:
+                await batches.cancel(batch_id)
+                raise TimeoutError(f"Batch {batch_id} still {batch.processing_status} after {self.max_wait_seconds:.0f}s")
+            await asyncio.sleep(self.poll_seconds)
+
+    async def _collect(self, batch_id: str, items: list[BatchItem], started: float) -> list[BatchItem]:
+        """
+        Validate and store the batch results.
+
+        Returns:
+            Items the batch did not produce a valid, stored result for
+        """
+        by_id = {item.custom_id: item for item in items}
+        stored = set()
+        latency = time.monotonic() - started
+
+        async for entry in await self.llm_client.anthropic_client.messages.batches.results(batch_id):
+            item = by_id.get(entry.custom_id)
+            if item is None:
+                continue
+            if entry.result.type != "succeeded":
+                logger.warning(f"Batch request {entry.custom_id} {entry.result.type}")
+                continue
+            result = await self.llm_client.accept_batch_result(item.prepared, entry.result.message, latency)
+            if result is None:
+                continue
+            try:
+                if item.store:
+                    await item.store(result)
+                stored.add(entry.custom_id)
+            except Exception as e:
+                logger.error(f"Storing batch result {entry.custom_id} failed: {e}")
+
+        return [item for item in items if item.custom_id not in stored]
+
+    async def _regenerate(self, items: list[BatchItem]) -> tuple[int, int]:
+        """
+        Generate the remaining items interactively.
+
+        Returns:
+            (regenerated, failed)
+        """
+        async def regenerate(item: BatchItem):
+            result = await item.regenerate()
+            if item.store:
+                await item.store(result)
+
+        results = await asyncio.gather(*(regenerate(item) for item in items), return_exceptions=True)
+        failed = 0
+        for item, result in zip(items, results):
+            if isinstance(result, Exception):
+                failed += 1
+                logger.error(f"Regenerating {item.custom_id} failed: {result}")
+        return len(items) - failed, failed
+
+    def status(self) -> dict:
+        return pregeneration_status()
+
+
+def pregeneration_status() -> dict:
+    """
+    Current job state and counters.
+
+    running covers the whole run, including the wait for a submitted batch,
+    in whichever process (or pregeneration job worker) runs it.
+    """
+    with Session(engine) as session:
+        state = session.get(PregenerationState, PREGENERATION_STATE_ID)
+        if state is None:
+            return {"status": "idle", "running": False}
+        return {
+            "status": state.status,
+            "running": state.status in ("running", "submitted"),
+            "data_version": state.data_version,
+            "batch_id": state.batch_id,
+            "requested": state.requested,
+            "from_batch": state.from_batch,
+            "regenerated": state.regenerated,
+            "failed": state.failed,
+            "last_error": state.last_error,
+            "started_at": state.started_at.isoformat() if state.started_at else None,
+            "finished_at": state.finished_at.isoformat() if state.finished_at else None,
+        }
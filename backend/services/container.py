@@ -0,0 +1,74 @@
+"""
+Per-worker container of the AI services.
+
+LLMClient and EmbeddingService used to be constructed for every request,
+each with new SDK clients and connection pools, so every request paid for
+fresh TCP and TLS handshakes. The container builds them once per worker
+process over keep-alive pools: main's lifespan creates it on startup and
+closes the pools on shutdown, and handlers receive it through the
+main.get_services dependency. Background jobs and scripts running without
+the lifespan get the same instance from get_service_container().
+"""
+import logging
+from typing import Any, Optional
+
+from .provider_clients import create_anthropic_client, create_openai_client, keepalive_limits
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """
+    Shared LLMClient and EmbeddingService of a worker process.
+
+    embedding_service is None when the openai package is not installed.
+    """
+
+    def __init__(self):
+        from .llm_client import LLMClient
+
+        limits = keepalive_limits()
+        self._anthropic_client = create_anthropic_client(limits)
+        self._openai_client = create_openai_client(limits)
+
+        # One OpenAI pool serves both the chat fallback and embeddings
+        self.llm_client = LLMClient(anthropic_client=self._anthropic_client, openai_client=self._openai_client)
+        try:
+            from .embeddings import EmbeddingService
+            self.embedding_service: Optional[Any] = EmbeddingService(client=self._openai_client)
+        except ImportError as e:
+            logger.warning(f"Embedding service not available: {e}")
+            self.embedding_service = None
+
+    def embeddings_available(self) -> bool:
+        return self.embedding_service is not None and self.embedding_service.is_available()
+
+    async def aclose(self):
+        """Close the SDK clients' connection pools"""
+        for client in (self._anthropic_client, self._openai_client):
+            if client is None:
+                continue
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"Closing {type(client).__name__} failed: {e}")
+        self._anthropic_client = self._openai_client = None
+
+
+_service_container: Optional[ServiceContainer] = None
+
+
+def get_service_container() -> ServiceContainer:
+    """Return the process-wide service container, creating it on first use"""
+    global _service_container
+    if _service_container is None:
+        _service_container = ServiceContainer()
+    return _service_container
+
+
+async def close_service_container():
+    """Close and drop the process-wide container (a later get creates a new one)"""
+    global _service_container
+    if _service_container is not None:
+        await _service_container.aclose()
+        _service_container = None
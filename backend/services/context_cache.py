@@ -0,0 +1,232 @@
+"""
+Shared GEO context snapshots for the section endpoints.
+
+The six /api/geo/* section endpoints all need the same brand and analysis
+context. Building it costs a metrics pass, an embedding call and a similarity
+search, so the assembled strings are cached per (brand, data version) and
+concurrent requests for the same key share a single in-flight build.
+"""
+import os
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Optional, Callable, Awaitable
+from sqlalchemy import case
+from sqlmodel import Session, select, func
+
+from models import Brand, Prompt, PromptBrandMention, Source, PromptSource, PromptEmbedding
+from database import engine
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+CACHE_MAX_ENTRIES = int(os.getenv("GEO_CONTEXT_CACHE_SIZE", "32"))
+# Upper bound on staleness for changes the data version does not see (e.g. brand edits)
+CACHE_TTL_SECONDS = int(os.getenv("GEO_CONTEXT_CACHE_TTL_SECONDS", "3600"))
+# How long a computed data version is reused. Writes in this process call
+# invalidate_data_version(); other writers (import scripts, other workers)
+# are seen within this window.
+DATA_VERSION_TTL_SECONDS = float(os.getenv("DATA_VERSION_TTL_SECONDS", "5"))
+
+# (computed_at, version) of the last fingerprint, and a counter of invalidations
+_data_version: Optional[tuple[float, str]] = None
+_data_version_generation = 0
+
+
+def get_data_version(session: Session) -> str:
+    """
+    Fingerprint the analysed data.
+
+    Counts and max IDs catch inserts and deletes; the mention sums also catch
+    in-place re-analysis (e.g. scripts/fix_brand_mentions.py). The aggregates
+    scan every analysis table, so the result is memoized for
+    DATA_VERSION_TTL_SECONDS.
+
+    Returns:
+        Short hex digest that changes whenever the underlying data changes
+    """
+    global _data_version
+    if _data_version is not None and time.monotonic() - _data_version[0] < DATA_VERSION_TTL_SECONDS:
+        return _data_version[1]
+
+    generation = _data_version_generation
+    version = _compute_data_version(session)
+    # Not memoized if data was written while the aggregates ran
+    if generation == _data_version_generation:
+        _data_version = (time.monotonic(), version)
+    return version
+
+
+def invalidate_data_version():
+    """Recompute the data version on next use (call after writing analysed data)"""
+    global _data_version, _data_version_generation
+    _data_version = None
+    _data_version_generation += 1
+
+
+def _compute_data_version(session: Session) -> str:
+    """Fingerprint the analysed data in a single aggregate query"""
+    def table_stats(model):
+        return (
+            select(func.count(model.id)).scalar_subquery(),
+            select(func.coalesce(func.max(model.id), 0)).scalar_subquery(),
+        )
+
+    row = session.exec(
+        select(
+            *table_stats(Prompt),
+            *table_stats(PromptBrandMention),
+            select(func.coalesce(func.sum(case((PromptBrandMention.mentioned == True, 1), else_=0)), 0)).scalar_subquery(),
+            select(func.coalesce(func.sum(PromptBrandMention.position), 0)).scalar_subquery(),
+            *table_stats(Source),
+            *table_stats(PromptSource),
+            *table_stats(PromptEmbedding),
+            select(func.count(Brand.id)).scalar_subquery(),
+        )
+    ).one()
+
+    fingerprint = ":".join(str(value) for value in row)
+    return hashlib.sha1(fingerprint.encode()).hexdigest()[:16]
+
+
+class GeoContextSnapshot:
+    """Immutable context strings for one brand at one data version"""
+
+    __slots__ = ("brand_id", "data_version", "brand_context", "analysis_context", "built_at")
+
+    def __init__(self, brand_id: str, data_version: str, brand_context: str, analysis_context: str):
+        self.brand_id = brand_id
+        self.data_version = data_version
+        self.brand_context = brand_context
+        self.analysis_context = analysis_context
+        self.built_at = time.monotonic()
+
+    def is_expired(self, ttl_seconds: int = CACHE_TTL_SECONDS) -> bool:
+        return time.monotonic() - self.built_at > ttl_seconds
+
+
+async def build_geo_context(brand_id: str, data_version: str, embedding_service=None) -> GeoContextSnapshot:
+    """
+    Build the brand and analysis context for the GEO endpoints.
+
+    Uses its own session so a shared build is not tied to the request that
+    happened to start it.
+    """
+    from .container import get_service_container
+    from .rag_service import RAGService
+
+    with Session(engine) as session:
+        brand = session.get(Brand, brand_id)
+        if brand is None:
+            raise LookupError(f"Brand {brand_id} not found")
+
+        rag_service = RAGService(session, embedding_service or get_service_container().embedding_service)
+        metrics = rag_service.calculate_brand_metrics_v2(brand_id)
+        query = f"SEO for {brand.name} ecommerce platform"
+        similar_prompts = await rag_service.find_similar_prompts(
+            query=query,
+            brand_id=brand_id,
+            limit=15
+        )
+
+        return GeoContextSnapshot(
+            brand_id=brand_id,
+            data_version=data_version,
+            brand_context=rag_service.build_brand_context_v2(brand, metrics),
+            analysis_context=rag_service.build_analysis_context_v2(brand, similar_prompts, metrics, query=query),
+        )
+
+
+class GeoContextCache:
+    """
+    LRU of context snapshots keyed by (brand_id, data_version), with single-flight builds.
+
+    Only plain strings are cached, never ORM objects, so snapshots can be
+    shared safely across request sessions.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl_seconds: int = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[str, str], GeoContextSnapshot] = OrderedDict()
+        self._builds = SingleFlight()
+        self.hits = 0
+
+    def get(self, brand_id: str, data_version: str) -> Optional[GeoContextSnapshot]:
+        """Return a fresh cached snapshot, if any"""
+        key = (brand_id, data_version)
+        snapshot = self._entries.get(key)
+        if snapshot is None:
+            return None
+        if snapshot.is_expired(self.ttl_seconds):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return snapshot
+
+    def put(self, snapshot: GeoContextSnapshot):
+        """Store a snapshot, dropping older versions of the same brand"""
+        for key in [k for k in self._entries if k[0] == snapshot.brand_id]:
+            del self._entries[key]
+        self._entries[(snapshot.brand_id, snapshot.data_version)] = snapshot
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, brand_id: Optional[str] = None):
+        """Drop cached snapshots for one brand (or all brands)"""
+        if brand_id is None:
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if k[0] == brand_id]:
+            del self._entries[key]
+
+    async def get_or_build(
+        self,
+        brand_id: str,
+        data_version: str,
+        build: Callable[[], Awaitable[GeoContextSnapshot]]
+    ) -> GeoContextSnapshot:
+        """
+        Return the cached snapshot or build it once for all concurrent callers.
+
+        The build runs as its own task (see SingleFlight), so a disconnecting
+        client does not cancel the build other requests are waiting on.
+        """
+        snapshot = self.get(brand_id, data_version)
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot
+
+        async def build_and_store() -> GeoContextSnapshot:
+            snapshot = await build()
+            self.put(snapshot)
+            return snapshot
+
+        # Cached for later requests, so finish the build even if every caller leaves
+        return await self._builds.run(
+            (brand_id, data_version), build_and_store, cancel_when_abandoned=False
+        )
+
+    def stats(self) -> dict:
+        """Cache counters for the status endpoint"""
+        builds = self._builds.stats()
+        return {
+            "entries": len(self._entries),
+            "in_flight": builds["in_flight"],
+            "hits": self.hits,
+            "misses": builds["started"],
+            "shared_builds": builds["shared"],
+        }
+
+
+_geo_context_cache: Optional[GeoContextCache] = None
+
+
+def get_geo_context_cache() -> GeoContextCache:
+    """Return the process-wide GEO context cache (created lazily)"""
+    global _geo_context_cache
+    if _geo_context_cache is None:
+        _geo_context_cache = GeoContextCache()
+    return _geo_context_cache
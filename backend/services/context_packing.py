@@ -0,0 +1,283 @@
+"""
+Diversified, token-budgeted excerpt selection for RAG context.
+
+Retrieved prompts are often several runs of the same query with nearly the
+same answer. Instead of keeping the first few responses and truncating each,
+responses are split into excerpts, scored against the retrieval query, and
+picked with max-marginal-relevance (MMR) until the token budget is full, so
+each token sent to the LLM carries something the previous ones did not.
+
+Excerpts are compared with hashed TF-IDF vectors built on the fly (no extra
+embedding calls); every scoring step is a NumPy matrix operation over the
+candidate matrix.
+"""
+import os
+import re
+import zlib
+import logging
+from typing import Optional, Sequence
+
+from models import Prompt
+
+logger = logging.getLogger(__name__)
+
+# numpy is optional - without it excerpts are packed in retrieval order
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+# Packing configuration
+TOKEN_BUDGET = int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", "800"))
+MMR_LAMBDA = float(os.getenv("RAG_MMR_LAMBDA", "0.7"))  # 1.0 = pure relevance, 0.0 = pure diversity
+EXCERPT_MAX_CHARS = 480
+EXCERPT_MIN_CHARS = 40
+DUPLICATE_SIMILARITY = 0.9  # Excerpts this close to a selected one are never added
+RANK_PRIOR_WEIGHT = 0.15  # Share of relevance taken from the retrieval rank
+HASH_DIMENSIONS = 2048
+CHARS_PER_TOKEN = 4  # Rough estimate for English prose
+
+_TERM_PATTERN = re.compile(r"[^\W_]+")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can do for from has have how i if in is it its "
+    "of on or our so that the their them there these they this to was we what when "
+    "which will with you your".split()
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count (about four characters per token)"""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def prompt_header_tokens(prompt: Prompt) -> int:
+    """Approximate tokens of the numbered query line heading a prompt's excerpts"""
+    return estimate_tokens(prompt.query) + 16
+
+
+def split_excerpts(text: str, max_chars: int = EXCERPT_MAX_CHARS) -> list[str]:
+    """
+    Split a response into self-contained excerpts of at most max_chars.
+
+    Lines are merged until the limit; lines that are longer on their own
+    are split at sentence boundaries (and hard-cut as a last resort).
+    """
+    pieces = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if len(line) <= max_chars:
+            pieces.append(line)
+            continue
+        for sentence in _SENTENCE_SPLIT.split(line):
+            while len(sentence) > max_chars:
+                pieces.append(sentence[:max_chars].rstrip() + "...")
+                sentence = sentence[max_chars:].lstrip()
+            if sentence:
+                pieces.append(sentence)
+
+    excerpts = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + 1 + len(piece) > max_chars:
+            excerpts.append(current)
+            current = piece
+        else:
+            current = f"{current} {piece}" if current else piece
+    if current:
+        excerpts.append(current)
+
+    # Drop fragments and table/markup debris that carry little prose
+    return [
+        e for e in excerpts
+        if len(e) >= EXCERPT_MIN_CHARS
+        and e.count("|") < 4
+        and sum(c.isalpha() for c in e) >= len(e) // 2
+    ]
+
+
+def _terms(text: str) -> list[str]:
+    return [t for t in _TERM_PATTERN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def hashed_tfidf(texts: Sequence[str], dimensions: int = HASH_DIMENSIONS):
+    """
+    Build L2-normalized hashed TF-IDF vectors for a set of texts.
+
+    Returns:
+        (matrix, idf) - an (n x dimensions) float32 matrix and the idf weights,
+        so a query can be projected into the same space
+    """
+    counts = np.zeros((len(texts), dimensions), dtype=np.float32)
+    for row, text in enumerate(texts):
+        columns = [zlib.crc32(term.encode()) % dimensions for term in _terms(text)]
+        if columns:
+            np.add.at(counts[row], columns, 1.0)
+
+    document_frequency = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + len(texts)) / (1 + document_frequency)).astype(np.float32) + 1.0
+    matrix = np.log1p(counts) * idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms), idf
+
+
+def project_query(query: str, idf, dimensions: int = HASH_DIMENSIONS):
+    """Project a query into the hashed TF-IDF space of a candidate set"""
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for term in _terms(query):
+        vector[zlib.crc32(term.encode()) % dimensions] = 1.0
+    vector *= idf
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def mmr_select(
+    relevance,
+    vectors,
+    costs,
+    budget: int,
+    diversity_lambda: float = MMR_LAMBDA,
+    group_ids=None,
+    group_costs=None
+) -> list[int]:
+    """
+    Greedy max-marginal-relevance selection under a token budget.
+
+    Each step scores every remaining candidate at once:
+        lambda * relevance - (1 - lambda) * max similarity to the selection
+    and picks the best one that still fits. Candidates nearly identical to a
+    selected one are dropped outright.
+
+    Args:
+        relevance: (n,) relevance scores
+        vectors: (n x d) L2-normalized candidate vectors
+        costs: (n,) token cost of each candidate
+        budget: Total tokens available
+        diversity_lambda: Relevance/diversity trade-off
+        group_ids: Optional (n,) group per candidate (e.g. source prompt)
+        group_costs: Optional (n,) one-off cost paid by the first pick of a group
+
+    Returns:
+        Indices of the selected candidates, in selection order
+    """
+    n = len(relevance)
+    costs = np.asarray(costs, dtype=np.float32).copy()
+    if group_costs is not None:
+        costs += group_costs
+
+    max_similarity = np.zeros(n, dtype=np.float32)
+    eligible = np.ones(n, dtype=bool)  # Neither selected nor a near-duplicate of a selection
+    available = costs <= budget
+    remaining = float(budget)
+    selected = []
+
+    while available.any():
+        scores = diversity_lambda * relevance - (1 - diversity_lambda) * max_similarity
+        scores = np.where(available, scores, -np.inf)
+        best = int(np.argmax(scores))
+
+        selected.append(best)
+        remaining -= costs[best]
+        eligible[best] = False
+
+        if group_ids is not None and group_costs is not None:
+            # The group header is paid for; later picks from it only cost their text
+            same_group = group_ids == group_ids[best]
+            costs[same_group] -= group_costs[same_group]
+            group_costs = np.where(same_group, 0, group_costs)
+
+        max_similarity = np.maximum(max_similarity, vectors @ vectors[best])
+        eligible &= max_similarity < DUPLICATE_SIMILARITY
+        # Affordability is re-checked against current costs (headers paid) rather than narrowed
+        available = eligible & (costs <= remaining)
+
+    return selected
+
+
+def pack_prompt_excerpts(
+    query: str,
+    prompts: list[Prompt],
+    token_budget: int = TOKEN_BUDGET,
+    header_tokens: Optional[int] = None,
+    listed: Optional[set[int]] = None
+) -> list[tuple[Prompt, list[str]]]:
+    """
+    Select the most informative, non-redundant response excerpts within a token budget.
+
+    Args:
+        query: Retrieval query the prompts were found with
+        prompts: Retrieved prompts, best first
+        token_budget: Tokens available for excerpts and their prompt headers
+        header_tokens: Per-prompt header overhead (default: query length + 16)
+        listed: Indices of prompts whose header the caller prints anyway and
+            budgets for itself; their excerpts cost only their own text
+
+    Returns:
+        (prompt, excerpts) pairs in retrieval order; excerpts keep their
+        original order within each response
+    """
+    candidates = []  # (prompt index, excerpt index, text)
+    seen = set()
+    for p_index, prompt in enumerate(prompts):
+        for e_index, excerpt in enumerate(split_excerpts(prompt.response_text or "")):
+            key = excerpt.lower()
+            if key in seen:
+                continue
+            seen.add(key)
+            candidates.append((p_index, e_index, excerpt))
+
+    if not candidates:
+        return []
+
+    listed = listed or set()
+
+    def header_cost(p_index: int) -> int:
+        if p_index in listed:
+            return 0
+        return header_tokens if header_tokens is not None else prompt_header_tokens(prompts[p_index])
+
+    if NUMPY_AVAILABLE:
+        texts = [text for _, _, text in candidates]
+        vectors, idf = hashed_tfidf(texts)
+        query_vector = project_query(query, idf)
+
+        prompt_index = np.array([c[0] for c in candidates])
+        rank_prior = 1.0 - prompt_index / max(len(prompts), 1)
+        relevance = (1 - RANK_PRIOR_WEIGHT) * (vectors @ query_vector) + RANK_PRIOR_WEIGHT * rank_prior
+
+        selected = mmr_select(
+            relevance,
+            vectors,
+            costs=[estimate_tokens(text) for text in texts],
+            budget=token_budget,
+            group_ids=prompt_index,
+            group_costs=np.array([header_cost(i) for i in prompt_index], dtype=np.float32)
+        )
+    else:
+        # Retrieval order, first fit
+        selected = []
+        used = 0
+        opened = set()
+        for i, (p_index, _, text) in enumerate(candidates):
+            cost = estimate_tokens(text) + (0 if p_index in opened else header_cost(p_index))
+            if used + cost <= token_budget:
+                selected.append(i)
+                used += cost
+                opened.add(p_index)
+
+    chosen: dict[int, list[tuple[int, str]]] = {}
+    for i in selected:
+        p_index, e_index, text = candidates[i]
+        chosen.setdefault(p_index, []).append((e_index, text))
+
+    logger.debug(
+        f"Packed {len(selected)} of {len(candidates)} excerpts from {len(chosen)} prompts"
+    )
+    return [
+        (prompts[p_index], [text for _, text in sorted(chosen[p_index])])
+        for p_index in sorted(chosen)
+    ]
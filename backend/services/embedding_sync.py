@@ -0,0 +1,268 @@
+"""
+Background worker that backfills prompt embeddings.
+
+Walks prompts in primary-key (keyset) order, embeds one batch per API call
+and commits each batch together with its checkpoint, so a restarted worker
+resumes where the last committed batch ended.
+"""
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, func
+
+from models import Prompt, PromptEmbedding, EmbeddingSyncState, BackgroundJob
+from database import engine, IS_POSTGRES
+from .container import get_service_container
+from .context_cache import invalidate_data_version
+from .embeddings import EmbeddingService
+from .vector_index import get_local_vector_index
+
+logger = logging.getLogger(__name__)
+
+# Worker configuration
+SYNC_STATE_ID = "prompt_embeddings"
+JOB_KIND = "embedding_sync"  # Job kind running this worker in the API (registered in main.py)
+BATCH_SIZE = int(os.getenv("EMBEDDING_SYNC_BATCH_SIZE", "50"))
+BATCH_PAUSE_SECONDS = float(os.getenv("EMBEDDING_SYNC_BATCH_PAUSE_SECONDS", "0.5"))
+
+# Vectors go to the pgvector column when present, otherwise to the local index
+USE_PGVECTOR = IS_POSTGRES and "embedding" in PromptEmbedding.__table__.c
+
+
+class EmbeddingSyncWorker:
+    """
+    Resumable embedding backfill.
+
+    A pass starts at prompt ID 0 and advances a keyset cursor batch by batch.
+    Only prompts without a PromptEmbedding row are embedded, so a new pass
+    after a completed one only retries prompts that failed previously.
+    """
+
+    def __init__(
+        self,
+        embedding_service: Optional[EmbeddingService] = None,
+        batch_size: int = BATCH_SIZE
+    ):
+        self.embedding_service = embedding_service or get_service_container().embedding_service
+        self.batch_size = batch_size
+
+    def _get_state(self, session: Session) -> EmbeddingSyncState:
+        """Load the checkpoint row, creating it on first use"""
+        state = session.get(EmbeddingSyncState, SYNC_STATE_ID)
+        if state is None:
+            state = EmbeddingSyncState(id=SYNC_STATE_ID)
+            session.add(state)
+            session.commit()
+            session.refresh(state)
+        return state
+
+    async def run(self, max_items: Optional[int] = None, reset: bool = False) -> dict:
+        """
+        Run the backfill until no prompts remain (or max_items is reached).
+
+        Args:
+            max_items: Stop after roughly this many prompts (None = no limit)
+            reset: Start a new pass from the first prompt
+
+        Returns:
+            Final worker status
+        """
+        if not self.embedding_service.is_available():
+            raise RuntimeError("OpenAI API key not configured")
+
+        if not USE_PGVECTOR:
+            self._forget_unindexed()
+
+        with Session(engine) as session:
+            state = self._get_state(session)
+            if reset or state.status == "complete":
+                # New pass: rewind the cursor and reset per-pass counters
+                state.last_prompt_id = 0
+                state.processed = 0
+                state.failed = 0
+            state.status = "running"
+            state.last_error = None
+            state.started_at = datetime.utcnow()
+            state.updated_at = datetime.utcnow()
+            session.add(state)
+            session.commit()
+
+        started = time.monotonic()
+        handled = 0
+
+        try:
+            while max_items is None or handled < max_items:
+                batch_handled = await self.run_batch()
+                if batch_handled == 0:
+                    break
+                handled += batch_handled
+                await asyncio.sleep(BATCH_PAUSE_SECONDS)
+        except Exception as e:
+            logger.error(f"Embedding sync failed: {e}", exc_info=True)
+            self._finish("error", handled, started, error=str(e))
+            raise
+
+        finished = max_items is None or handled < max_items
+        self._finish("complete" if finished else "paused", handled, started)
+        return self.status()
+
+    def _forget_unindexed(self):
+        """
+        Local index only: delete PromptEmbedding rows whose vector is not in
+        the index (e.g. the index was discarded as inconsistent) and rewind
+        the cursor, so this pass embeds those prompts again.
+        """
+        index = get_local_vector_index()
+        with Session(engine) as session:
+            prompt_ids = session.exec(select(PromptEmbedding.prompt_id)).all()
+            missing = [prompt_id for prompt_id in prompt_ids if not index.contains(prompt_id)]
+            if not missing:
+                return
+            for start in range(0, len(missing), 500):
+                session.exec(
+                    delete(PromptEmbedding).where(PromptEmbedding.prompt_id.in_(missing[start:start + 500]))
+                )
+            state = self._get_state(session)
+            state.last_prompt_id = 0
+            session.add(state)
+            session.commit()
+        invalidate_data_version()
+        logger.warning(f"{len(missing)} embedded prompts are missing from the local vector index; re-embedding them")
+
+    async def run_batch(self) -> int:
+        """
+        Embed and commit the next batch after the checkpoint.
+
+        Returns:
+            Number of prompts the cursor advanced over (0 when the pass is done)
+        """
+        with Session(engine) as session:
+            state = self._get_state(session)
+            cursor = state.last_prompt_id
+
+            rows = session.exec(
+                select(Prompt.id, Prompt.query, Prompt.response_text)
+                .outerjoin(PromptEmbedding, PromptEmbedding.prompt_id == Prompt.id)
+                .where(Prompt.id > cursor)
+                .where(PromptEmbedding.id == None)
+                .order_by(Prompt.id)
+                .limit(self.batch_size)
+            ).all()
+
+        if not rows:
+            return 0
+
+        local_index = None if USE_PGVECTOR else get_local_vector_index()
+        # Already in the local index: appended by a batch whose commit never happened
+        indexed = {row.id for row in rows if local_index is not None and local_index.contains(row.id)}
+        to_embed = [row for row in rows if row.response_text and row.id not in indexed]
+        texts = [
+            f"Query: {row.query}\n\nAI Response: {row.response_text}"
+            for row in to_embed
+        ]
+        vectors = await self.embedding_service.embed_texts(texts) if texts else []
+
+        stored = 0
+        failed = 0
+        now = datetime.utcnow()
+        values = [{"prompt_id": prompt_id, "created_at": now} for prompt_id in indexed]
+        local_vectors = []
+        for row, vector in zip(to_embed, vectors):
+            if vector is None:
+                failed += 1
+                continue
+            value = {"prompt_id": row.id, "created_at": now}
+            if USE_PGVECTOR:
+                value["embedding"] = vector
+            else:
+                local_vectors.append((row.id, vector))
+            values.append(value)
+
+        if local_vectors:
+            # Appended before the commit: if the commit fails, the next batch
+            # finds these prompts in the index and only records their rows
+            local_index.add(local_vectors)
+
+        with Session(engine) as session:
+            try:
+                if values:
+                    session.exec(PromptEmbedding.__table__.insert().values(values))
+                    stored = len(values)
+                state = self._get_state(session)
+                state.last_prompt_id = rows[-1].id
+                state.processed += stored
+                state.failed += failed
+                state.updated_at = datetime.utcnow()
+                session.add(state)
+                session.commit()
+                if stored:
+                    invalidate_data_version()
+            except IntegrityError:
+                # Another worker embedded some of these prompts concurrently;
+                # the next batch query skips whatever is already stored.
+                session.rollback()
+                logger.warning("Embedding batch overlapped with another worker, retrying")
+                return len(rows)
+
+        logger.info(
+            f"Embedded {stored} prompts (cursor at {rows[-1].id}, {failed} failed)"
+        )
+        return len(rows)
+
+    def _finish(self, status: str, handled: int, started: float, error: Optional[str] = None):
+        """Persist the final status and throughput of a run"""
+        elapsed = time.monotonic() - started
+        with Session(engine) as session:
+            state = self._get_state(session)
+            state.status = status
+            state.last_error = error
+            state.items_per_second = round(handled / elapsed, 2) if elapsed > 0 else 0.0
+            state.updated_at = datetime.utcnow()
+            session.add(state)
+            session.commit()
+
+    def status(self) -> dict:
+        """
+        Return checkpoint, throughput and the number of prompts still to embed.
+
+        status is what the last run recorded (the CLI script records it too);
+        running is whether an embedding_sync job holds an unexpired lease, so
+        a run that died mid-pass does not read as running.
+        """
+        with Session(engine) as session:
+            state = session.get(EmbeddingSyncState, SYNC_STATE_ID)
+            running = session.exec(
+                select(func.count(BackgroundJob.id))
+                .where(BackgroundJob.kind == JOB_KIND)
+                .where(BackgroundJob.status == "running")
+                .where(BackgroundJob.locked_until > datetime.utcnow())
+            ).one() > 0
+            remaining = session.exec(
+                select(func.count(Prompt.id))
+                .outerjoin(PromptEmbedding, PromptEmbedding.prompt_id == Prompt.id)
+                .where(PromptEmbedding.id == None)
+                .where(Prompt.response_text != None)
+            ).one()
+
+            return {
+                "status": state.status if state else "idle",
+                "running": running,
+                "checkpoint": state.last_prompt_id if state else 0,
+                "processed": state.processed if state else 0,
+                "failed": state.failed if state else 0,
+                "items_per_second": state.items_per_second if state else 0.0,
+                "remaining": remaining,
+                "last_error": state.last_error if state else None,
+                "started_at": state.started_at.isoformat() if state and state.started_at else None,
+                "updated_at": state.updated_at.isoformat() if state else None,
+            }
+
+
+def vector_storage_available() -> bool:
+    """Check if synced embeddings have somewhere to go (pgvector or the local index)"""
+    return USE_PGVECTOR or get_local_vector_index().is_available()
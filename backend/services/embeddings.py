@@ -6,7 +6,10 @@ import os
 import logging
 import asyncio
 from typing import Optional
-from openai import OpenAI, RateLimitError, APIConnectionError
+from openai import AsyncOpenAI, RateLimitError, APIConnectionError
+
+from .fake_providers import provider_client
+from .provider_clients import NEW_CLIENT, create_openai_client
 
 logger = logging.getLogger(__name__)
 
@@ -17,18 +20,24 @@ EMBEDDING_DIMENSIONS = 3072
 # Retry configuration
 MAX_RETRIES = 3
 BASE_DELAY = 1.0
+TIMEOUT_SECONDS = float(os.getenv("EMBEDDING_TIMEOUT_SECONDS", "30"))  # Per API call
 
 
 class EmbeddingService:
     """Service for generating text embeddings using OpenAI API"""
 
-    def __init__(self):
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            logger.warning("OPENAI_API_KEY not set - embedding features will not work")
-            self.client = None
-        else:
-            self.client = OpenAI(api_key=api_key)
+    def __init__(self, client: Optional[AsyncOpenAI] = NEW_CLIENT):
+        """
+        Args:
+            client: Shared AsyncOpenAI or None (services.container); default: a new one
+        """
+        if client is NEW_CLIENT:
+            client = create_openai_client()
+        if client is None:
+            logger.warning("OpenAI client not available - embedding features will not work")
+
+        # Stand-in or recording client for offline load tests (LLM_PROVIDER_MODE)
+        self.client = provider_client("openai", client)
 
     def is_available(self) -> bool:
         """Check if the embedding service is available"""
@@ -56,10 +65,11 @@ class EmbeddingService:
 
         for attempt in range(1, MAX_RETRIES + 1):
             try:
-                response = self.client.embeddings.create(
+                response = await self.client.embeddings.create(
                     model=EMBEDDING_MODEL,
                     input=text,
-                    dimensions=EMBEDDING_DIMENSIONS
+                    dimensions=EMBEDDING_DIMENSIONS,
+                    timeout=TIMEOUT_SECONDS
                 )
                 return response.data[0].embedding
 
@@ -115,10 +125,11 @@ class EmbeddingService:
 
             for attempt in range(1, MAX_RETRIES + 1):
                 try:
-                    response = self.client.embeddings.create(
+                    response = await self.client.embeddings.create(
                         model=EMBEDDING_MODEL,
                         input=batch,
-                        dimensions=EMBEDDING_DIMENSIONS
+                        dimensions=EMBEDDING_DIMENSIONS,
+                        timeout=TIMEOUT_SECONDS
                     )
                     # Extract embeddings in order
                     batch_results = [None] * len(batch)
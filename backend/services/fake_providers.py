@@ -0,0 +1,513 @@
+"""
+Local stand-ins for the Anthropic and OpenAI clients, for offline load tests.
+
+LLM_PROVIDER_MODE selects what LLMClient and EmbeddingService talk to:
+    live   - the real SDK clients (default)
+    fake   - stand-ins that synthesize schema-valid output from each
+             request's tool schema, with simulated latency and failures
+    record - the real clients, saving every structured/text response to
+             FAKE_PROVIDER_RECORDINGS keyed by request fingerprint
+    replay - stand-ins that return recorded responses and synthesize the
+             ones that were never recorded
+
+Stand-ins implement only the SDK surface LLMClient, EmbeddingService and
+the batch pre-generation job use (messages.create/stream, messages.batches,
+chat.completions.create, embeddings.create).
+Injected failures are real SDK exception types, so retries, fallback,
+circuit breakers and the concurrency limiter behave as they would against
+a struggling provider. Usage objects report estimated token counts and
+simulate prompt cache writes and reads for cache_control blocks.
+
+Batches run each request through the stand-in messages.create, so their
+results are synthesized too. Embeddings are never recorded; stand-in vectors are hashed bag-of-words
+features, so similar texts still get similar vectors.
+"""
+import os
+import re
+import json
+import math
+import zlib
+import random
+import asyncio
+import logging
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Optional
+
+from .llm_cache import prompt_fingerprint
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_MODE = os.getenv("LLM_PROVIDER_MODE", "live").lower()
+STAND_IN_MODES = ("fake", "replay")
+RECORDINGS_PATH = Path(os.getenv(
+    "FAKE_PROVIDER_RECORDINGS",
+    str(Path(__file__).resolve().parent.parent / "recordings")
+))
+
+# Simulated provider behaviour
+LATENCY_MS = float(os.getenv("FAKE_PROVIDER_LATENCY_MS", "800"))
+LATENCY_JITTER_MS = float(os.getenv("FAKE_PROVIDER_LATENCY_JITTER_MS", "200"))
+EMBEDDING_LATENCY_MS = float(os.getenv("FAKE_EMBEDDING_LATENCY_MS", "50"))
+FAILURE_RATE = float(os.getenv("FAKE_PROVIDER_FAILURE_RATE", "0"))
+FAILURE_KIND = os.getenv("FAKE_PROVIDER_FAILURE_KIND", "rate_limit")  # rate_limit|overloaded|server_error|connection|timeout
+STREAM_CHUNK_CHARS = 24
+CHARS_PER_TOKEN = 4
+
+_TERM_PATTERN = re.compile(r"[^\W_]+")
+
+
+# --- Schema-valid output synthesis ---
+
+class _Synthesizer:
+    """Build a value that satisfies a (Pydantic-generated) JSON schema"""
+
+    def __init__(self, root: dict, rng: random.Random):
+        self.defs = root.get("$defs", {})
+        self.rng = rng
+
+    def value(self, schema: dict, name: str = "value") -> Any:
+        if "$ref" in schema:
+            return self.value(self.defs[schema["$ref"].split("/")[-1]], name)
+        if "const" in schema:
+            return schema["const"]
+        if "enum" in schema:
+            return self.rng.choice(schema["enum"])
+        for key in ("anyOf", "oneOf"):
+            if key in schema:
+                options = [option for option in schema[key] if option.get("type") != "null"]
+                return self.value(options[0] if options else schema[key][0], name)
+        if "allOf" in schema:
+            return self.value(schema["allOf"][0], name)
+
+        kind = schema.get("type", "object")
+        if isinstance(kind, list):
+            kind = next((k for k in kind if k != "null"), "null")
+
+        if kind == "object":
+            return {
+                field: self.value(field_schema, field)
+                for field, field_schema in schema.get("properties", {}).items()
+            }
+        if kind == "array":
+            low = schema.get("minItems", 0)
+            high = schema.get("maxItems", max(low, 5))
+            count = min(max(low, 3), high)
+            return [self.value(schema.get("items", {}), name) for _ in range(count)]
+        if kind in ("integer", "number"):
+            return self._number(schema, kind)
+        if kind == "boolean":
+            return self.rng.random() < 0.5
+        if kind == "null":
+            return None
+        return self._string(schema, name)
+
+    def _number(self, schema: dict, kind: str):
+        low = schema.get("minimum", schema.get("exclusiveMinimum", 0))
+        high = schema.get("maximum", schema.get("exclusiveMaximum", max(low, 0) + 10))
+        if kind == "integer":
+            low = math.floor(low) + (1 if "exclusiveMinimum" in schema else 0)
+            high = math.ceil(high) - (1 if "exclusiveMaximum" in schema else 0)
+            return self.rng.randint(low, max(low, high))
+        value = round(self.rng.uniform(low, high), 1)
+        return min(max(value, low), high)
+
+    def _string(self, schema: dict, name: str) -> str:
+        if schema.get("format") == "date-time":
+            return datetime.utcnow().isoformat()
+        if schema.get("format") == "uri":
+            return f"https://example.com/{name.replace('_', '-')}"
+        text = f"Stand-in {name.replace('_', ' ')} {self.rng.randint(1, 999)}"
+        low = schema.get("minLength", 0)
+        high = schema.get("maxLength")
+        text = text.ljust(low, ".")
+        return text[:high] if high else text
+
+
+def synthesize(schema: dict, seed: str) -> Any:
+    """Deterministic schema-valid value (same seed, same output)"""
+    return _Synthesizer(schema, random.Random(seed)).value(schema)
+
+
+def fake_embedding(text: str, dimensions: int) -> list[float]:
+    """Unit vector of hashed term features (similar texts share dimensions)"""
+    vector = [0.0] * dimensions
+    for term in _TERM_PATTERN.findall(text.lower()):
+        digest = zlib.crc32(term.encode())
+        vector[digest % dimensions] += 1.0 if digest & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+# --- Recordings ---
+
+def _request_key(provider: str, request: dict) -> str:
+    """Fingerprint of a request, ignoring transport options"""
+    return prompt_fingerprint(
+        provider=provider, **{k: v for k, v in request.items() if k not in ("timeout", "stream")}
+    )
+
+
+def _recording_path(key: str) -> Path:
+    return RECORDINGS_PATH / f"{key[:32]}.json"
+
+
+def load_recording(key: str) -> Optional[dict]:
+    path = _recording_path(key)
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text())
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Ignoring unreadable recording {path.name}: {e}")
+        return None
+
+
+def save_recording(key: str, record: dict):
+    try:
+        RECORDINGS_PATH.mkdir(parents=True, exist_ok=True)
+        _recording_path(key).write_text(json.dumps(record, default=str))
+    except OSError as e:
+        logger.warning(f"Could not save recording: {e}")
+
+
+# --- Simulated latency, failures and usage ---
+
+def _sdk(provider: str):
+    if provider == "anthropic":
+        import anthropic
+        return anthropic
+    import openai
+    return openai
+
+
+async def _simulate(provider: str, latency_ms: float = LATENCY_MS, jitter_ms: float = LATENCY_JITTER_MS):
+    """Sleep for the simulated latency, then maybe raise an injected SDK error"""
+    await asyncio.sleep(max(0.0, random.gauss(latency_ms, jitter_ms)) / 1000)
+    if FAILURE_RATE <= 0 or random.random() >= FAILURE_RATE:
+        return
+
+    import httpx
+    sdk = _sdk(provider)
+    request = httpx.Request("POST", f"https://stand-in.{provider}.local")
+
+    def status_error(cls, status: int):
+        return cls(f"Injected {status}", response=httpx.Response(status, request=request), body=None)
+
+    if FAILURE_KIND == "connection":
+        raise sdk.APIConnectionError(request=request)
+    if FAILURE_KIND == "timeout":
+        raise sdk.APITimeoutError(request=request)
+    if FAILURE_KIND == "server_error":
+        raise status_error(sdk.InternalServerError, 500)
+    if FAILURE_KIND == "overloaded":
+        raise status_error(sdk.APIStatusError, 529)
+    raise status_error(sdk.RateLimitError, 429)
+
+
+class _PromptCacheSimulator:
+    """Report cache writes the first time a cache_control prefix is seen, reads after"""
+
+    def __init__(self):
+        self._seen: set[str] = set()
+
+    def usage(self, system: Any, messages: Any, output: str) -> SimpleNamespace:
+        cached_chars = 0
+        blocks = system if isinstance(system, list) else []
+        prefix = []
+        for block in blocks:
+            prefix.append(block)
+            if isinstance(block, dict) and block.get("cache_control"):
+                cached_chars = sum(len(str(b.get("text", ""))) for b in prefix)
+        total_chars = len(json.dumps(system, default=str)) + len(json.dumps(messages, default=str))
+
+        cache_write = cache_read = 0
+        if cached_chars:
+            prefix_key = prompt_fingerprint(prefix=prefix)
+            if prefix_key in self._seen:
+                cache_read = cached_chars // CHARS_PER_TOKEN
+            else:
+                cache_write = cached_chars // CHARS_PER_TOKEN
+                self._seen.add(prefix_key)
+        return SimpleNamespace(
+            input_tokens=max(1, (total_chars - cached_chars) // CHARS_PER_TOKEN),
+            output_tokens=max(1, len(output) // CHARS_PER_TOKEN),
+            cache_creation_input_tokens=cache_write,
+            cache_read_input_tokens=cache_read,
+        )
+
+
+_prompt_cache = _PromptCacheSimulator()
+
+
+# --- Anthropic stand-in ---
+
+def _fake_anthropic_response(request: dict) -> SimpleNamespace:
+    """Message for a request: the forced tool's input (synthesized or replayed), else plain text"""
+    key = _request_key("anthropic", request)
+    recorded = load_recording(key) if PROVIDER_MODE == "replay" else None
+
+    tool_choice = request.get("tool_choice") or {}
+    if request.get("tools") and tool_choice.get("name"):
+        tool = next(t for t in request["tools"] if t["name"] == tool_choice["name"])
+        payload = recorded["tool_input"] if recorded and "tool_input" in recorded else synthesize(
+            tool["input_schema"], key
+        )
+        content = [SimpleNamespace(type="tool_use", id=f"toolu_{key[:20]}", name=tool["name"], input=payload)]
+        output = json.dumps(payload)
+    else:
+        output = recorded["text"] if recorded and "text" in recorded else "Stand-in response."
+        content = [SimpleNamespace(type="text", text=output)]
+
+    return SimpleNamespace(
+        content=content,
+        stop_reason="tool_use" if content[0].type == "tool_use" else "end_turn",
+        usage=_prompt_cache.usage(request.get("system"), request.get("messages"), output)
+    )
+
+
+class _FakeAnthropicStream:
+    """
+    Async context manager mirroring AsyncMessageStream: iterating yields
+    content_block_delta events (input_json_delta for a forced tool call,
+    text_delta otherwise), then get_final_message returns the message.
+    """
+
+    def __init__(self, request: dict):
+        self.request = request
+        self._message = None
+
+    async def __aenter__(self):
+        await _simulate("anthropic", LATENCY_MS / 4, LATENCY_JITTER_MS / 4)  # Time to first token
+        self._message = _fake_anthropic_response(self.request)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def __aiter__(self):
+        block = self._message.content[0]
+        if block.type == "tool_use":
+            text, delta_type, field = json.dumps(block.input), "input_json_delta", "partial_json"
+        else:
+            text, delta_type, field = block.text, "text_delta", "text"
+        chunks = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)]
+        pause = (LATENCY_MS * 3 / 4) / 1000 / max(len(chunks), 1)
+        for chunk in chunks:
+            await asyncio.sleep(pause)
+            yield SimpleNamespace(
+                type="content_block_delta", index=0,
+                delta=SimpleNamespace(type=delta_type, **{field: chunk})
+            )
+
+    async def get_final_message(self):
+        return self._message
+
+
+class _FakeAnthropicMessages:
+    async def create(self, **request):
+        await _simulate("anthropic")
+        return _fake_anthropic_response(request)
+
+    def stream(self, **request):
+        return _FakeAnthropicStream(request)
+
+
+class _FakeBatches:
+    """Message Batches stand-in: requests run in the background, results are kept in memory"""
+
+    def __init__(self, messages: _FakeAnthropicMessages):
+        self._messages = messages
+        self._batches: dict[str, SimpleNamespace] = {}
+        self._results: dict[str, list] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def _result(self, entry: dict) -> SimpleNamespace:
+        try:
+            message = await self._messages.create(**entry["params"])
+            result = SimpleNamespace(type="succeeded", message=message)
+        except Exception as e:
+            result = SimpleNamespace(type="errored", error=SimpleNamespace(type=type(e).__name__, message=str(e)))
+        return SimpleNamespace(custom_id=entry["custom_id"], result=result)
+
+    async def _process(self, batch: SimpleNamespace, requests: list[dict]):
+        self._results[batch.id] = await asyncio.gather(*(self._result(entry) for entry in requests))
+        batch.request_counts.processing = 0
+        for entry in self._results[batch.id]:
+            setattr(batch.request_counts, entry.result.type, getattr(batch.request_counts, entry.result.type) + 1)
+        batch.processing_status = "ended"
+        batch.ended_at = datetime.utcnow()
+
+    async def create(self, requests: list[dict], **kwargs):
+        batch_id = f"msgbatch_{prompt_fingerprint(requests=requests, at=datetime.utcnow())[:24]}"
+        batch = SimpleNamespace(
+            id=batch_id,
+            processing_status="in_progress",
+            request_counts=SimpleNamespace(processing=len(requests), succeeded=0, errored=0, canceled=0, expired=0),
+            created_at=datetime.utcnow(),
+            ended_at=None,
+        )
+        self._batches[batch_id] = batch
+        task = asyncio.create_task(self._process(batch, list(requests)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return batch
+
+    async def retrieve(self, batch_id: str, **kwargs):
+        if batch_id not in self._batches:
+            import anthropic
+            import httpx
+            request = httpx.Request("GET", f"https://stand-in.anthropic.local/v1/messages/batches/{batch_id}")
+            raise anthropic.NotFoundError(
+                f"Unknown batch {batch_id}", response=httpx.Response(404, request=request), body=None
+            )
+        return self._batches[batch_id]
+
+    async def results(self, batch_id: str, **kwargs):
+        entries = self._results.get(batch_id, [])
+
+        async def iterate():
+            for entry in entries:
+                yield entry
+
+        return iterate()
+
+    async def cancel(self, batch_id: str, **kwargs):
+        batch = await self.retrieve(batch_id)
+        batch.processing_status = "canceling"
+        return batch
+
+
+# Shared by all stand-in clients, so a batch outlives the client that submitted it
+_fake_batches = _FakeBatches(_FakeAnthropicMessages())
+
+
+class FakeAnthropic:
+    """Stand-in for anthropic.AsyncAnthropic"""
+
+    def __init__(self, **kwargs):
+        self.messages = _FakeAnthropicMessages()
+        self.messages.batches = _fake_batches
+
+
+class _RecordingAnthropicMessages:
+    def __init__(self, messages):
+        self._messages = messages
+        self.batches = messages.batches  # Batch results are not recorded
+
+    async def create(self, **request):
+        response = await self._messages.create(**request)
+        block = response.content[0] if response.content else None
+        if block is not None:
+            record = {"tool_input": block.input} if block.type == "tool_use" else {"text": block.text}
+            save_recording(_request_key("anthropic", request), record)
+        return response
+
+    def stream(self, **request):
+        return self._messages.stream(**request)  # Streams are not recorded
+
+
+class RecordingAnthropic:
+    """Real Anthropic client that records every messages.create response"""
+
+    def __init__(self, client):
+        self.messages = _RecordingAnthropicMessages(client.messages)
+
+
+# --- OpenAI stand-in ---
+
+class _FakeChatCompletions:
+    async def create(self, **request):
+        await _simulate("openai")
+        key = _request_key("openai", request)
+        recorded = load_recording(key) if PROVIDER_MODE == "replay" else None
+
+        tool_choice = request.get("tool_choice") or {}
+        name = tool_choice.get("function", {}).get("name") if isinstance(tool_choice, dict) else None
+        tool_calls = None
+        content = None
+        if request.get("tools") and name:
+            function = next(t["function"] for t in request["tools"] if t["function"]["name"] == name)
+            arguments = recorded["arguments"] if recorded and "arguments" in recorded else json.dumps(
+                synthesize(function["parameters"], key)
+            )
+            tool_calls = [SimpleNamespace(
+                id=f"call_{key[:20]}", type="function",
+                function=SimpleNamespace(name=name, arguments=arguments)
+            )]
+            output = arguments
+        else:
+            content = output = recorded["text"] if recorded and "text" in recorded else "Stand-in response."
+
+        prompt_chars = len(json.dumps(request.get("messages", []), default=str))
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content, tool_calls=tool_calls))],
+            usage=SimpleNamespace(
+                prompt_tokens=max(1, prompt_chars // CHARS_PER_TOKEN),
+                completion_tokens=max(1, len(output) // CHARS_PER_TOKEN),
+                prompt_tokens_details=SimpleNamespace(cached_tokens=0)
+            )
+        )
+
+
+class _FakeEmbeddings:
+    async def create(self, model: str, input, dimensions: int = 3072, **kwargs):
+        await _simulate("openai", EMBEDDING_LATENCY_MS, jitter_ms=0)
+        texts = [input] if isinstance(input, str) else list(input)
+        return SimpleNamespace(
+            data=[
+                SimpleNamespace(index=i, embedding=fake_embedding(text, dimensions))
+                for i, text in enumerate(texts)
+            ],
+            usage=SimpleNamespace(prompt_tokens=sum(len(t) for t in texts) // CHARS_PER_TOKEN)
+        )
+
+
+class FakeOpenAI:
+    """Stand-in for openai.AsyncOpenAI (chat completions and embeddings)"""
+
+    def __init__(self, **kwargs):
+        self.chat = SimpleNamespace(completions=_FakeChatCompletions())
+        self.embeddings = _FakeEmbeddings()
+
+
+class _RecordingChatCompletions:
+    def __init__(self, completions):
+        self._completions = completions
+
+    async def create(self, **request):
+        response = await self._completions.create(**request)
+        message = response.choices[0].message
+        if message.tool_calls:
+            record = {"arguments": message.tool_calls[0].function.arguments}
+        else:
+            record = {"text": message.content}
+        save_recording(_request_key("openai", request), record)
+        return response
+
+
+class RecordingOpenAI:
+    """Real OpenAI client that records chat completion responses (embeddings pass through)"""
+
+    def __init__(self, client):
+        self.chat = SimpleNamespace(completions=_RecordingChatCompletions(client.chat.completions))
+        self.embeddings = client.embeddings
+
+
+def provider_client(provider: str, client: Any) -> Any:
+    """
+    Apply LLM_PROVIDER_MODE to a provider client.
+
+    Args:
+        provider: 'anthropic' or 'openai'
+        client: The real SDK client, or None if it could not be created
+
+    Returns:
+        A stand-in (fake/replay), a recording wrapper (record) or client (live)
+    """
+    if PROVIDER_MODE in STAND_IN_MODES:
+        return FakeAnthropic() if provider == "anthropic" else FakeOpenAI()
+    if PROVIDER_MODE == "record" and client is not None:
+        return RecordingAnthropic(client) if provider == "anthropic" else RecordingOpenAI(client)
+    return client
@@ -0,0 +1,397 @@
+"""
+Persistent job queue for generation and backfill work, backed by the database.
+
+Long-running work (LLM generation, embedding sync, brand backfills) used to
+run inside HTTP requests, holding a worker and running into proxy timeouts.
+Endpoints now enqueue a BackgroundJob row and answer 202 Accepted with the
+job's URL; worker coroutines in every app process claim due jobs and run
+the handler registered for their kind. No broker is involved: the job table
+is the queue, so it works with SQLite and PostgreSQL alike.
+
+- Claiming is a conditional UPDATE, so each job runs in one worker at a time
+  across processes. A running job holds a lease renewed by a heartbeat; a
+  job whose worker died is claimed again once its lease expires.
+- Failed attempts are retried with exponential backoff up to the kind's
+  RetryPolicy.max_attempts; PermanentJobError and exceptions listed in
+  give_up_on fail at once.
+- An idempotency key (scoped to the job kind) returns the existing job
+  instead of enqueueing a new one, and singleton kinds have at most one
+  queued or running job. Both are unique indexes, so concurrent enqueues
+  in different requests or processes still end up with a single job.
+- Finished jobs are deleted after JOB_RETENTION_HOURS.
+"""
+import os
+import json
+import uuid
+import random
+import socket
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional
+from sqlalchemy import and_, delete, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, func
+
+from models import BackgroundJob
+from database import engine
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))  # Worker coroutines per process (0 = enqueue only)
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "120"))  # Renewed every third of the lease
+JOB_RETENTION_HOURS = float(os.getenv("JOB_RETENTION_HOURS", "168"))
+
+ACTIVE_STATUSES = ("queued", "running")
+FINISHED_STATUSES = ("succeeded", "failed")
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler for failures a retry can't fix (e.g. unknown brand)"""
+
+
+class RetryPolicy:
+    """
+    How often and how soon a failed job is tried again.
+
+    The n-th retry waits base_delay * 2**(n-1) seconds (at most max_delay)
+    with full jitter.
+    """
+
+    __slots__ = ("max_attempts", "base_delay", "max_delay", "give_up_on")
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 5.0,
+        max_delay: float = 300.0,
+        give_up_on: tuple[type[BaseException], ...] = ()
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.give_up_on = give_up_on
+
+    def delay(self, attempt: int) -> float:
+        """Seconds before retrying after the given (1-based) attempt failed"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class JobHandler:
+    """A registered job kind"""
+
+    __slots__ = ("run", "retry", "singleton")
+
+    def __init__(self, run: Callable[[dict], Awaitable[Any]], retry: RetryPolicy, singleton: bool):
+        self.run = run
+        self.retry = retry
+        self.singleton = singleton
+
+
+def _claimable(now: datetime):
+    """Due queued jobs, and running jobs whose worker stopped renewing the lease"""
+    return or_(
+        and_(BackgroundJob.status == "queued", BackgroundJob.run_after <= now),
+        and_(BackgroundJob.status == "running", BackgroundJob.locked_until < now)
+    )
+
+
+def job_status(job: BackgroundJob) -> dict:
+    """API representation of a job"""
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "payload": json.loads(job.payload_json),
+        "idempotency_key": job.idempotency_key,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "run_after": job.run_after.isoformat(),
+        "result": json.loads(job.result_json) if job.result_json else None,
+        "last_error": job.last_error,
+        "created_at": job.created_at.isoformat(),
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+class JobQueue:
+    """
+    Handler registry, enqueueing and the worker coroutines of one process.
+
+    Handlers take the job's payload dict and return a JSON-serializable
+    result (stored on the job) or None.
+    """
+
+    def __init__(
+        self,
+        poll_seconds: float = JOB_POLL_SECONDS,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+        retention_hours: float = JOB_RETENTION_HOURS
+    ):
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.retention_hours = retention_hours
+        self.handlers: dict[str, JobHandler] = {}
+        self._workers: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._last_prune: Optional[datetime] = None
+        self._worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    def register(
+        self,
+        kind: str,
+        run: Callable[[dict], Awaitable[Any]],
+        retry: Optional[RetryPolicy] = None,
+        singleton: bool = False
+    ):
+        """
+        Register the handler for a job kind.
+
+        Args:
+            singleton: At most one queued or running job of this kind;
+                enqueueing another returns the active one
+        """
+        self.handlers[kind] = JobHandler(run, retry or RetryPolicy(), singleton)
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Optional[dict] = None,
+        idempotency_key: Optional[str] = None
+    ) -> tuple[BackgroundJob, bool]:
+        """
+        Add a job, or return the existing one for the idempotency key (or the
+        active job of a singleton kind).
+
+        Returns:
+            (job detached from any session, whether this call created it)
+        """
+        handler = self.handlers.get(kind)
+        if handler is None:
+            raise KeyError(f"No job handler registered for {kind!r}")
+        if idempotency_key:
+            idempotency_key = f"{kind}:{idempotency_key}"
+
+        with Session(engine) as session:
+            existing = self._existing(session, kind, idempotency_key, handler.singleton)
+            if existing is not None:
+                return existing, False
+
+            job = BackgroundJob(
+                id=str(uuid.uuid4()),
+                kind=kind,
+                payload_json=json.dumps(payload or {}),
+                idempotency_key=idempotency_key,
+                singleton=handler.singleton,
+                max_attempts=handler.retry.max_attempts
+            )
+            session.add(job)
+            try:
+                session.commit()
+            except IntegrityError:
+                # Another request enqueued the same idempotency key (or singleton kind) first
+                session.rollback()
+                existing = self._existing(session, kind, idempotency_key, handler.singleton)
+                if existing is None:
+                    raise
+                return existing, False
+            session.refresh(job)
+
+        logger.info(f"Enqueued {kind} job {job.id}")
+        self._wakeup.set()
+        return job, True
+
+    def _existing(self, session: Session, kind: str, idempotency_key: Optional[str], singleton: bool):
+        if idempotency_key:
+            job = session.exec(
+                select(BackgroundJob).where(BackgroundJob.idempotency_key == idempotency_key)
+            ).first()
+            if job is not None:
+                return job
+        if singleton:
+            return session.exec(
+                select(BackgroundJob)
+                .where(BackgroundJob.kind == kind)
+                .where(BackgroundJob.status.in_(ACTIVE_STATUSES))
+                .order_by(BackgroundJob.created_at)
+            ).first()
+        return None
+
+    def get(self, job_id: str) -> Optional[BackgroundJob]:
+        with Session(engine) as session:
+            return session.get(BackgroundJob, job_id)
+
+    def _claim(self, worker_id: str) -> Optional[BackgroundJob]:
+        """Take the lease on the next due job of a registered kind"""
+        now = datetime.utcnow()
+        with Session(engine) as session:
+            candidates = session.exec(
+                select(BackgroundJob.id)
+                .where(_claimable(now))
+                .where(BackgroundJob.kind.in_(list(self.handlers)))
+                .order_by(BackgroundJob.run_after)
+                .limit(5)
+            ).all()
+            for job_id in candidates:
+                claimed = session.exec(
+                    update(BackgroundJob)
+                    .where(BackgroundJob.id == job_id)
+                    .where(_claimable(now))
+                    .values(
+                        status="running", locked_by=worker_id,
+                        locked_until=now + timedelta(seconds=self.lease_seconds),
+                        attempts=BackgroundJob.attempts + 1,
+                        started_at=now, updated_at=now
+                    )
+                ).rowcount
+                session.commit()
+                if claimed:
+                    return session.get(BackgroundJob, job_id)
+        return None
+
+    def _update_owned(self, job_id: str, worker_id: str, **values) -> bool:
+        """Update a job only while this worker holds its lease"""
+        with Session(engine) as session:
+            updated = session.exec(
+                update(BackgroundJob)
+                .where(BackgroundJob.id == job_id)
+                .where(BackgroundJob.locked_by == worker_id)
+                .where(BackgroundJob.status == "running")
+                .values(updated_at=datetime.utcnow(), **values)
+            ).rowcount
+            session.commit()
+        return updated > 0
+
+    async def _heartbeat(self, job_id: str, worker_id: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            locked_until = datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+            if not await asyncio.to_thread(self._update_owned, job_id, worker_id, locked_until=locked_until):
+                logger.warning(f"Lost the lease on job {job_id}")
+                return
+
+    async def _execute(self, job: BackgroundJob, worker_id: str):
+        handler = self.handlers[job.kind]
+        if job.attempts > job.max_attempts:
+            # Reclaimed after the worker of its last attempt died
+            await asyncio.to_thread(
+                self._update_owned, job.id, worker_id, status="failed", locked_by=None, locked_until=None,
+                last_error=job.last_error or "Lease expired on the final attempt", finished_at=datetime.utcnow()
+            )
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(job.id, worker_id))
+        try:
+            result = await handler.run(json.loads(job.payload_json))
+        except asyncio.CancelledError:
+            # Shutdown: hand the job back without counting the attempt
+            await asyncio.to_thread(
+                self._update_owned, job.id, worker_id, status="queued", locked_by=None, locked_until=None,
+                attempts=job.attempts - 1
+            )
+            raise
+        except Exception as e:
+            permanent = isinstance(e, (PermanentJobError, *handler.retry.give_up_on))
+            retry = job.attempts < job.max_attempts and not permanent
+            error = f"{type(e).__name__}: {e}"
+            if retry:
+                delay = handler.retry.delay(job.attempts)
+                logger.warning(f"{job.kind} job {job.id} attempt {job.attempts} failed, retrying in {delay:.0f}s: {error}")
+                values = {"status": "queued", "run_after": datetime.utcnow() + timedelta(seconds=delay)}
+            else:
+                logger.error(f"{job.kind} job {job.id} failed after {job.attempts} attempts: {error}")
+                values = {"status": "failed", "finished_at": datetime.utcnow()}
+            await asyncio.to_thread(
+                self._update_owned, job.id, worker_id, locked_by=None, locked_until=None, last_error=error, **values
+            )
+        else:
+            await asyncio.to_thread(
+                self._update_owned, job.id, worker_id, status="succeeded", locked_by=None, locked_until=None,
+                result_json=json.dumps(result, default=str) if result is not None else None,
+                finished_at=datetime.utcnow()
+            )
+            logger.info(f"{job.kind} job {job.id} succeeded")
+        finally:
+            heartbeat.cancel()
+
+    def _prune(self):
+        """Delete jobs that finished more than retention_hours ago (at most hourly)"""
+        now = datetime.utcnow()
+        if self._last_prune and now - self._last_prune < timedelta(hours=1):
+            return
+        self._last_prune = now
+        with Session(engine) as session:
+            deleted = session.exec(
+                delete(BackgroundJob)
+                .where(BackgroundJob.status.in_(FINISHED_STATUSES))
+                .where(BackgroundJob.finished_at < now - timedelta(hours=self.retention_hours))
+            ).rowcount
+            session.commit()
+        if deleted:
+            logger.info(f"Pruned {deleted} finished jobs")
+
+    async def _worker(self, number: int):
+        worker_id = f"{self._worker_prefix}:{number}"
+        while True:
+            try:
+                if number == 0:
+                    await asyncio.to_thread(self._prune)
+                job = await asyncio.to_thread(self._claim, worker_id)
+                if job is not None:
+                    await self._execute(job, worker_id)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} error: {e}", exc_info=True)
+
+            # Idle: wait for the next poll, or for a job enqueued by this process
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self, workers: int = JOB_WORKERS) -> int:
+        """
+        Start worker coroutines in this process (no-op if already started).
+
+        Returns:
+            Number of workers running
+        """
+        if not self._workers:
+            self._wakeup = asyncio.Event()  # Bound to the running loop
+            self._workers = [asyncio.create_task(self._worker(n)) for n in range(workers)]
+        return len(self._workers)
+
+    async def stop(self):
+        """Cancel the workers; running jobs are handed back to the queue"""
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    def stats(self) -> dict:
+        """Jobs per status and kind, plus this process's workers"""
+        with Session(engine) as session:
+            rows = session.exec(
+                select(BackgroundJob.kind, BackgroundJob.status, func.count(BackgroundJob.id))
+                .group_by(BackgroundJob.kind, BackgroundJob.status)
+            ).all()
+        counts: dict[str, dict[str, int]] = {}
+        for kind, status, count in rows:
+            counts.setdefault(kind, {})[status] = count
+        return {"workers": len(self._workers), "kinds": sorted(self.handlers), "jobs": counts}
+
+
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue, creating it on first use"""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue()
+    return _job_queue
@@ -0,0 +1,180 @@
+"""
+Incremental parsing of streamed JSON for progressive rendering.
+
+Structured outputs stream as partial JSON of one object (the input of a
+forced tool call, see LLMClient.stream_section). JSONItemStream scans
+each delta once and reports top-level members and the elements of top-level
+arrays as soon as their closing character arrives, so e.g. each quick win
+can be validated and sent to the client while the rest is still generating.
+"""
+import json
+import logging
+import typing
+from typing import Any, AsyncIterator, Optional, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+logger = logging.getLogger(__name__)
+
+
+class JSONItemStream:
+    """
+    Single-pass scanner over a streamed JSON object.
+
+    feed() returns completed events in order:
+        ("item", key, value)   - one element of the top-level array under key
+        ("member", key, value) - a complete top-level member (emitted after its items)
+
+    Anything before the opening brace (e.g. a ```json fence) is ignored.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._expect_key = False
+        self._key = None
+        self._value_start = None  # Start of the current top-level member value
+        self._item_start = None  # Start of the current top-level array element
+        self.closed = False
+
+    def _in_array(self) -> bool:
+        return len(self._stack) == 2 and self._stack[1] == "["
+
+    def _decode(self, start: int, end: int) -> Any:
+        return json.loads(self._text[start:end])
+
+    def _emit(self, events: list, kind: str, start: int, end: int):
+        """Decode a completed value; malformed ones are left to the final validation"""
+        try:
+            events.append((kind, self._key, self._decode(start, end)))
+        except json.JSONDecodeError as e:
+            logger.debug(f"Skipping malformed streamed {kind} for {self._key}: {e}")
+
+    def feed(self, chunk: str) -> list[tuple[str, str, Any]]:
+        """Consume a text delta and return the events it completed"""
+        self._text += chunk
+        events = []
+        text = self._text
+
+        for i in range(self._pos, len(text)):
+            if self.closed:
+                break
+            c = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1 and self._expect_key:
+                        self._key = self._decode(self._string_start, i + 1)
+                continue
+
+            if not self._stack:
+                if c == "{":
+                    self._stack.append(c)
+                    self._expect_key = True
+                continue
+
+            depth = len(self._stack)
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+                self._mark_value_start(depth, i)
+            elif c in "{[":
+                self._mark_value_start(depth, i)
+                self._stack.append(c)
+            elif c in "}]":
+                self._stack.pop()
+                if depth == 3 and self._in_array() and self._item_start is not None:
+                    self._emit(events, "item", self._item_start, i + 1)
+                    self._item_start = None
+                elif depth == 2:
+                    if self._item_start is not None:
+                        # Scalar last element, ended by the closing bracket
+                        self._emit(events, "item", self._item_start, i)
+                        self._item_start = None
+                    self._emit(events, "member", self._value_start, i + 1)
+                    self._value_start = None
+                elif depth == 1:
+                    if self._value_start is not None:
+                        self._emit(events, "member", self._value_start, i)
+                        self._value_start = None
+                    self.closed = True
+            elif c == ",":
+                if depth == 1:
+                    if self._value_start is not None:
+                        self._emit(events, "member", self._value_start, i)
+                        self._value_start = None
+                    self._expect_key = True
+                elif self._in_array() and self._item_start is not None:
+                    self._emit(events, "item", self._item_start, i)
+                    self._item_start = None
+            elif c == ":":
+                if depth == 1:
+                    self._expect_key = False
+            elif not c.isspace():
+                # First character of a number/true/false/null
+                self._mark_value_start(depth, i)
+
+        self._pos = len(text)
+        return events
+
+    def _mark_value_start(self, depth: int, i: int):
+        """Record where a member value or array element begins"""
+        if depth == 1 and not self._expect_key and self._value_start is None:
+            self._value_start = i
+        elif depth == 2 and self._in_array() and self._item_start is None:
+            self._item_start = i
+
+    @property
+    def text(self) -> str:
+        """Everything received so far"""
+        return self._text
+
+
+def _field_adapters(schema: Type[BaseModel]) -> dict[str, tuple[str, TypeAdapter]]:
+    """Map each field to ('item', element adapter) for lists or ('member', adapter)"""
+    adapters = {}
+    for name, field in schema.model_fields.items():
+        annotation = field.annotation
+        if typing.get_origin(annotation) is list:
+            adapters[name] = ("item", TypeAdapter(typing.get_args(annotation)[0]))
+        else:
+            adapters[name] = ("member", TypeAdapter(annotation))
+    return adapters
+
+
+async def stream_validated(
+    schema: Type[BaseModel],
+    chunks: AsyncIterator[str],
+    parser: Optional[JSONItemStream] = None
+) -> AsyncIterator[tuple[str, str, Any]]:
+    """
+    Validate a streamed object against schema, field by field.
+
+    Yields:
+        ("item", field, model) for each validated list element and
+        ("member", field, value) for each validated non-list field.
+        Invalid partial values are skipped; callers use the validated
+        (and repaired) full result once the stream ends.
+    """
+    adapters = _field_adapters(schema)
+    parser = parser or JSONItemStream()
+
+    async for chunk in chunks:
+        for kind, key, value in parser.feed(chunk):
+            expected = adapters.get(key)
+            if expected is None or expected[0] != kind:
+                continue
+            try:
+                yield kind, key, expected[1].validate_python(value)
+            except ValidationError as e:
+                logger.warning(f"Streamed {key} {kind} failed validation: {e}")
@@ -0,0 +1,178 @@
+"""
+Local cache of validated LLM responses, keyed by prompt fingerprint.
+
+CachedSuggestion stores one result per brand; this cache sits below it in
+LLMClient and answers any request whose model, system blocks, messages and
+output schema are identical to one already answered - e.g. a GEO section
+regenerated while nothing in its analysis context changed.
+
+Entries live in a small SQLite file shared by all worker processes, expire
+after a TTL and are evicted least-recently-used beyond a size bound.
+"""
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+CACHE_PATH = Path(os.getenv(
+    "LLM_CACHE_PATH",
+    str(Path(__file__).resolve().parent.parent / "llm_cache.sqlite3")
+))
+CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "500"))
+
+
+def prompt_fingerprint(**parts: Any) -> str:
+    """
+    Stable hash of everything that determines a response.
+
+    Parts are serialized as canonical JSON (sorted keys), so dict ordering
+    does not matter; anything non-JSON falls back to its str().
+    """
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed response cache with TTL and LRU eviction.
+
+    Lookups and writes run in a worker thread so the event loop never
+    waits on the file lock.
+    """
+
+    def __init__(
+        self,
+        path: Path = CACHE_PATH,
+        ttl_seconds: float = CACHE_TTL_SECONDS,
+        max_entries: int = CACHE_MAX_ENTRIES
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.counters: Counter = Counter()
+        self._initialized = False
+
+    @contextmanager
+    def _transaction(self):
+        """Open a connection, commit on success and always close it"""
+        connection = sqlite3.connect(self.path, timeout=5)
+        try:
+            with connection:
+                if not self._initialized:
+                    self._create_table(connection)
+                yield connection
+        finally:
+            connection.close()
+
+    def _create_table(self, connection: sqlite3.Connection):
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_response (
+                key TEXT PRIMARY KEY,
+                label TEXT,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_llm_response_accessed ON llm_response (accessed_at)"
+        )
+        self._initialized = True
+
+    def _get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT payload, created_at FROM llm_response WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                connection.execute("DELETE FROM llm_response WHERE key = ?", (key,))
+                self.counters["expired"] += 1
+                return None
+            connection.execute("UPDATE llm_response SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def _put(self, key: str, payload: Any, label: str):
+        now = time.time()
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO llm_response (key, label, payload, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, label, json.dumps(payload), now, now)
+            )
+            expired = connection.execute(
+                "DELETE FROM llm_response WHERE created_at < ?", (now - self.ttl_seconds,)
+            ).rowcount
+            # Least recently used beyond the size bound
+            evicted = connection.execute(
+                """
+                DELETE FROM llm_response WHERE key IN (
+                    SELECT key FROM llm_response ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,)
+            ).rowcount
+        self.counters["expired"] += expired
+        self.counters["evicted"] += evicted
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the cached payload for key, or None (missing, expired or unreadable)"""
+        try:
+            payload = await asyncio.to_thread(self._get, key)
+        except (sqlite3.Error, json.JSONDecodeError) as e:
+            logger.warning(f"LLM response cache read failed: {e}")
+            payload = None
+        self.counters["hits" if payload is not None else "misses"] += 1
+        return payload
+
+    async def put(self, key: str, payload: Any, label: str = ""):
+        """Store a JSON-serializable payload (failures are logged, never raised)"""
+        try:
+            await asyncio.to_thread(self._put, key, payload, label)
+            self.counters["writes"] += 1
+        except sqlite3.Error as e:
+            logger.warning(f"LLM response cache write failed: {e}")
+
+    def stats(self) -> dict:
+        """Entry count and hit/miss/eviction counters for this process"""
+        try:
+            with self._transaction() as connection:
+                entries = connection.execute("SELECT COUNT(*) FROM llm_response").fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+        return {
+            "enabled": CACHE_ENABLED,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            **{key: self.counters[key] for key in ("hits", "misses", "writes", "expired", "evicted")}
+        }
+
+
+_llm_response_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """Return the process-wide response cache, or None when LLM_CACHE_ENABLED=false"""
+    global _llm_response_cache
+    if not CACHE_ENABLED:
+        return None
+    if _llm_response_cache is None:
+        _llm_response_cache = LLMResponseCache()
+    return _llm_response_cache
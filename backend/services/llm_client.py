@@ -2,16 +2,38 @@
 LLM Client for generating AI-powered SEO suggestions.
 Supports both Claude (Anthropic) and GPT (OpenAI) with automatic fallback.
 Uses prompt caching for Claude to reduce costs by 90%.
+
+Both providers use their async SDK clients, so a long generation awaits
+the network instead of blocking the event loop for every other request.
+
+Structured output goes through tool/function calling with the Pydantic
+schema as the tool's input schema. When the submitted input fails
+validation, a short repair turn sends back only the validation errors and
+asks for the broken fields, instead of regenerating the whole response.
+Validated outputs are cached by prompt fingerprint (services/llm_cache.py),
+and every provider call is instrumented (services/llm_metrics.py) and
+guarded by a per-provider circuit breaker and adaptive concurrency limit
+(services/provider_health.py).
 """
 import os
 import json
 import logging
 import asyncio
+import time
 import random
-from typing import Optional, Type, TypeVar
+from collections import Counter
 from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, Type, TypeVar
 from pydantic import BaseModel, ValidationError
 
+from .llm_cache import get_llm_response_cache, prompt_fingerprint
+from .llm_metrics import get_llm_metrics
+from .provider_health import (
+    FAILED, RATE_LIMITED, ProviderUnavailableError, get_provider_health
+)
+from .fake_providers import provider_client
+from .provider_clients import NEW_CLIENT, create_anthropic_client, create_openai_client
+
 logger = logging.getLogger(__name__)
 
 # Try importing both providers
@@ -23,16 +45,31 @@ except ImportError:
     anthropic = None
 
 try:
-    from openai import OpenAI
+    import openai
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
-    OpenAI = None
+    openai = None
 
 # Configuration
 MAX_RETRIES = 4
 BASE_DELAY = 0.5
 
+# Per-call timeouts (seconds); a timed-out call is not retried
+TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+TIMEOUT_SECONDS_V2 = float(os.getenv("LLM_TIMEOUT_SECONDS_V2", "300"))  # Full V2 strategy (12k tokens)
+
+# Output token limits per request type (Claude)
+MAX_TOKENS = 4096
+MAX_TOKENS_V2 = 12000  # Large response for comprehensive V2 recommendations
+MAX_TOKENS_SECTION = 2500  # Smaller per-section
+
+# Repair turns after a structured output fails validation (0 disables repairs)
+MAX_REPAIR_TURNS = int(os.getenv("LLM_MAX_REPAIR_TURNS", "2"))
+MAX_REPAIR_ERRORS = 20  # Validation errors listed in a repair request
+
+CORRECTIONS_TOOL = "submit_corrections"
+
 # Model names (2026)
 CLAUDE_MODEL = os.getenv("LLM_MODEL_CLAUDE", "claude-sonnet-4-5-20250929")
 OPENAI_MODEL = os.getenv("LLM_MODEL_OPENAI", "gpt-4o")  # Fallback to gpt-4o if gpt-5 not available
@@ -45,6 +82,222 @@ class LLMRateLimitError(Exception):
     pass
 
 
+class LLMTimeoutError(LLMRateLimitError):
+    """Raised when a provider call exceeds its timeout"""
+    pass
+
+
+class LLMCircuitOpenError(LLMRateLimitError):
+    """Raised without calling a provider whose circuit breaker is open"""
+    pass
+
+
+# Transport-level errors that count against a provider's circuit breaker
+_TRANSPORT_ERRORS = tuple(
+    module.APIConnectionError for module in (anthropic, openai) if module is not None
+)
+
+
+def _classify_provider_error(error: Exception) -> Optional[str]:
+    """
+    Map a provider exception to a circuit breaker outcome.
+
+    429 and 529 (overloaded) shrink the concurrency limit, other 5xx and
+    connection errors/timeouts count as failures; remaining 4xx say nothing
+    about provider health.
+    """
+    status = getattr(error, "status_code", None)
+    if status in (429, 529):
+        return RATE_LIMITED
+    if status is not None:
+        return FAILED if status >= 500 else None
+    return FAILED if isinstance(error, _TRANSPORT_ERRORS) else None
+
+
+# Process-wide structured output counters (see LLMClient.structured_output_stats)
+_structured_output_stats: Counter = Counter()
+
+
+# Filled in by the server after the model answers, never asked of the model
+SERVER_STAMPED_FIELDS = ("generated_at",)
+
+
+def _output_tool(schema: Type[BaseModel], label: str) -> tuple[str, str, dict]:
+    """(name, description, input schema) of the tool a structured output is submitted through"""
+    input_schema = schema.model_json_schema()
+    for field in SERVER_STAMPED_FIELDS:
+        input_schema.get("properties", {}).pop(field, None)
+    if "required" in input_schema:
+        input_schema["required"] = [field for field in input_schema["required"] if field not in SERVER_STAMPED_FIELDS]
+    return f"submit_{schema.__name__}", f"Submit the {label}", input_schema
+
+
+def _validate_output(schema: Type[T], submitted: dict) -> T:
+    """Validate a model's submission, stamping the server-filled fields (generated_at) with the current time"""
+    stamped = {field: datetime.utcnow() for field in SERVER_STAMPED_FIELDS if field in schema.model_fields}
+    return schema.model_validate({**submitted, **stamped})
+
+
+def _claude_cache_key(system_content: list[dict], messages: list[dict], schema: Type[BaseModel], max_tokens: int) -> str:
+    """Response cache key of a Claude structured output request"""
+    return prompt_fingerprint(
+        provider="anthropic", model=CLAUDE_MODEL, max_tokens=max_tokens,
+        system=system_content, messages=messages, schema=schema.model_json_schema()
+    )
+
+
+def _usage_tokens(response: Any) -> int:
+    """Total tokens billed for a response (Anthropic or OpenAI usage)"""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return 0
+    return sum(
+        value for value in (
+            getattr(usage, field, 0)
+            for field in ("input_tokens", "output_tokens", "prompt_tokens", "completion_tokens")
+        )
+        if isinstance(value, int)
+    )
+
+
+class _ToolOutput:
+    """
+    Validation-repair state for one structured output request.
+
+    The first turn submits the full object through the schema tool. If it
+    fails validation, the next turn asks only for the top-level fields that
+    had errors (through a corrections tool restricted to those fields) and
+    merges them in; errors that cannot be pinned to a field ask for the full
+    object again.
+    """
+
+    def __init__(self, schema: Type[T], label: str):
+        self.schema = schema
+        self.label = label
+        self.name, self.description, self.input_schema = _output_tool(schema, label)
+        self.payload: dict = {}
+        self.error: Optional[ValidationError] = None
+        self.fields: Optional[list[str]] = None
+        self.turn = 0
+        self.turn_tokens: list[int] = []
+        self.discarded_tokens = 0
+        _structured_output_stats["calls"] += 1
+
+    def tools(self) -> list[tuple[str, str, dict]]:
+        """(name, description, input schema) of the tools for the current turn"""
+        tools = [(self.name, self.description, self.input_schema)]
+        if self.fields:
+            properties = self.input_schema.get("properties", {})
+            corrections = {
+                "type": "object",
+                "properties": {field: properties[field] for field in self.fields},
+                "required": list(self.fields),
+            }
+            if "$defs" in self.input_schema:
+                corrections["$defs"] = self.input_schema["$defs"]
+            tools.append((CORRECTIONS_TOOL, "Resubmit corrected values for the listed fields only", corrections))
+        return tools
+
+    @property
+    def tool_choice(self) -> str:
+        """Tool the model must call this turn"""
+        return CORRECTIONS_TOOL if self.fields else self.name
+
+    def accept(self, submitted: Optional[dict], tokens: int) -> Optional[T]:
+        """
+        Merge a turn's tool input and validate.
+
+        Returns:
+            The validated model, or None if another (repair) turn is needed
+        """
+        self.turn_tokens.append(tokens)
+        submitted = submitted if isinstance(submitted, dict) else {}
+        if self.fields:
+            self.payload = {**self.payload, **submitted}
+        else:
+            # Full (re)submission replaces whatever an earlier turn produced
+            self.discarded_tokens = sum(self.turn_tokens[:-1])
+            self.payload = submitted
+
+        try:
+            result = _validate_output(self.schema, self.payload)
+        except ValidationError as e:
+            self.error = e
+            _structured_output_stats["validation_failures"] += 1
+            logger.warning(
+                f"{self.label} failed validation on turn {self.turn + 1} ({e.error_count()} errors)"
+            )
+            return None
+
+        if self.turn:
+            _structured_output_stats["repaired"] += 1
+            _structured_output_stats["repair_tokens"] += sum(self.turn_tokens[1:])
+            _structured_output_stats["wasted_tokens"] += self.discarded_tokens
+            logger.info(f"{self.label} repaired after {self.turn} repair turn(s)")
+        return result
+
+    def can_repair(self) -> bool:
+        return self.turn < MAX_REPAIR_TURNS
+
+    def feedback(self) -> str:
+        """Repair request for the next turn (also selects its tool)"""
+        self.turn += 1
+        _structured_output_stats["repair_turns"] += 1
+
+        properties = self.input_schema.get("properties", {})
+        fields = []
+        for detail in self.error.errors():
+            location = detail.get("loc") or ()
+            if not location or location[0] not in properties:
+                fields = None
+                break
+            if location[0] not in fields:
+                fields.append(location[0])
+        self.fields = fields
+
+        lines = [
+            f"- {'.'.join(str(part) for part in detail.get('loc', ())) or '(root)'}: {detail.get('msg')}"
+            for detail in self.error.errors()[:MAX_REPAIR_ERRORS]
+        ]
+        if self.error.error_count() > MAX_REPAIR_ERRORS:
+            lines.append(f"- ... and {self.error.error_count() - MAX_REPAIR_ERRORS} more")
+        errors = "\n".join(lines)
+
+        if fields:
+            return (
+                f"Validation failed:\n{errors}\n\n"
+                f"Call {CORRECTIONS_TOOL} with complete, corrected values for only these fields: "
+                f"{', '.join(fields)}. All other fields are kept as submitted."
+            )
+        return f"Validation failed:\n{errors}\n\nCall {self.name} again with the complete, corrected input."
+
+    def fail(self):
+        """Give up: count every turn as wasted and raise the last validation error"""
+        _structured_output_stats["failed"] += 1
+        _structured_output_stats["wasted_tokens"] += sum(self.turn_tokens)
+        logger.error(f"{self.label} still invalid after {self.turn} repair turn(s): {self.error}")
+        raise self.error
+
+
+class PreparedRequest:
+    """
+    A Claude structured output request built but not sent.
+
+    Used by the batch pre-generation job (services/batch_generation.py):
+    params go to the Message Batches API unchanged, and cache_key is the
+    key the interactive call for the same prompt would use, so a batch
+    result answers later interactive requests from the response cache.
+    """
+
+    __slots__ = ("params", "schema", "label", "cache_key")
+
+    def __init__(self, params: dict, schema: Type[BaseModel], label: str, cache_key: str):
+        self.params = params
+        self.schema = schema
+        self.label = label
+        self.cache_key = cache_key
+
+
 class LLMClient:
     """
     Unified LLM client with Claude + OpenAI support.
@@ -53,42 +306,257 @@ class LLMClient:
     - Automatic provider fallback on failure
     - Exponential backoff with jitter for retries
     - Prompt caching for Claude (90% cost reduction)
-    - Structured output validation with Pydantic
+    - Structured output via tool calling, validated with Pydantic and
+      repaired field by field on validation errors
     """
 
-    def __init__(self):
-        self.anthropic_client = None
-        self.openai_client = None
+    def __init__(self, anthropic_client: Optional[Any] = NEW_CLIENT, openai_client: Optional[Any] = NEW_CLIENT):
+        """
+        Args:
+            anthropic_client: Shared AsyncAnthropic or None (services.container); default: a new one
+            openai_client: Shared AsyncOpenAI or None (services.container); default: a new one
+        """
         self.primary_provider = os.getenv("LLM_PRIMARY_PROVIDER", "anthropic")
+        if anthropic_client is NEW_CLIENT:
+            anthropic_client = create_anthropic_client()
+        if openai_client is NEW_CLIENT:
+            openai_client = create_openai_client()
 
-        # Initialize Anthropic
-        if ANTHROPIC_AVAILABLE:
-            api_key = os.getenv("ANTHROPIC_API_KEY")
-            if api_key:
-                self.anthropic_client = anthropic.Anthropic(api_key=api_key)
-                logger.info("Anthropic client initialized")
-            else:
-                logger.warning("ANTHROPIC_API_KEY not set")
-
-        # Initialize OpenAI
-        if OPENAI_AVAILABLE:
-            api_key = os.getenv("OPENAI_API_KEY")
-            if api_key:
-                self.openai_client = OpenAI(api_key=api_key)
-                logger.info("OpenAI client initialized")
-            else:
-                logger.warning("OPENAI_API_KEY not set")
+        # Stand-in or recording clients for offline load tests (LLM_PROVIDER_MODE)
+        self.anthropic_client = provider_client("anthropic", anthropic_client)
+        self.openai_client = provider_client("openai", openai_client)
 
     def is_available(self) -> bool:
         """Check if at least one LLM provider is available"""
         return self.anthropic_client is not None or self.openai_client is not None
 
+    @staticmethod
+    def structured_output_stats() -> dict:
+        """Counters for structured output calls, retries, repairs and wasted tokens"""
+        return {
+            key: _structured_output_stats[key]
+            for key in (
+                "calls", "retries", "validation_failures", "repair_turns",
+                "repaired", "failed", "repair_tokens", "wasted_tokens"
+            )
+        }
+
+    async def _measured(self, provider: str, model: str, label: str, request: Awaitable[Any]) -> Any:
+        """
+        Await a provider request through its circuit breaker and concurrency
+        limit, recording latency, token usage and outcome.
+
+        Raises:
+            LLMCircuitOpenError: The provider's circuit is open (not called)
+        """
+        try:
+            async with get_provider_health(provider).guard(_classify_provider_error):
+                started = time.perf_counter()
+                try:
+                    response = await request
+                except Exception as e:
+                    get_llm_metrics().record_call(
+                        provider, model, label, time.perf_counter() - started, error=type(e).__name__
+                    )
+                    raise
+        except ProviderUnavailableError as e:
+            request.close()  # Never sent
+            raise LLMCircuitOpenError(str(e)) from None
+        get_llm_metrics().record_call(
+            provider, model, label, time.perf_counter() - started, usage=getattr(response, "usage", None)
+        )
+        return response
+
+    def _providers_in_order(self, provider: str) -> list[str]:
+        """Requested provider, then the fallback; providers with an open circuit go last"""
+        providers = [provider]
+        if provider == "anthropic" and self.openai_client:
+            providers.append("openai")
+        elif provider == "openai" and self.anthropic_client:
+            providers.append("anthropic")
+        return sorted(providers, key=lambda name: not get_provider_health(name).is_available())
+
+    def _note_retry(self, provider: str, reason: str):
+        _structured_output_stats["retries"] += 1
+        get_llm_metrics().record_retry(provider, reason)
+
+    async def _cached_output(self, cache_key: str, schema: Type[T], label: str) -> Optional[T]:
+        """Return a cached response for this exact request, if one is still valid"""
+        cache = get_llm_response_cache()
+        payload = await cache.get(cache_key) if cache else None
+        if payload is None:
+            return None
+        try:
+            result = schema.model_validate(payload)
+        except ValidationError:
+            logger.warning(f"Discarding cached {label} that no longer matches {schema.__name__}")
+            return None
+        logger.info(f"{label} served from response cache")
+        return result
+
+    async def _store_output(self, cache_key: str, result: BaseModel, label: str):
+        cache = get_llm_response_cache()
+        if cache:
+            await cache.put(cache_key, result.model_dump(mode="json"), label)
+
+    async def _claude_tool_output(
+        self,
+        system_content: list[dict],
+        user_content: str,
+        schema: Type[T],
+        max_tokens: int,
+        timeout: float,
+        label: str,
+        use_cache: bool = True
+    ) -> T:
+        """
+        Get a schema-valid object from Claude through a forced tool call.
+
+        Validation errors are answered with a tool_result carrying only the
+        errors, up to MAX_REPAIR_TURNS times. An identical earlier request
+        is answered from the response cache unless use_cache=False; fresh
+        results are always written back.
+        """
+        messages = [{"role": "user", "content": user_content}]
+        cache_key = _claude_cache_key(system_content, messages, schema, max_tokens)
+        cached = await self._cached_output(cache_key, schema, label) if use_cache else None
+        if cached is not None:
+            return cached
+
+        output = _ToolOutput(schema, label)
+        response = await self._measured(
+            "anthropic", CLAUDE_MODEL, label,
+            self.anthropic_client.messages.create(
+                timeout=timeout, **self._claude_tool_params(output, system_content, messages, max_tokens)
+            )
+        )
+        return await self._accept_claude_tool_output(
+            output, response, system_content, messages, max_tokens, timeout, cache_key
+        )
+
+    @staticmethod
+    def _claude_tool_params(output: _ToolOutput, system_content: list[dict], messages: list[dict], max_tokens: int) -> dict:
+        """Request params of the current turn of a Claude structured output"""
+        return {
+            "model": CLAUDE_MODEL,
+            "max_tokens": max_tokens,
+            "system": system_content,
+            "tools": [
+                {"name": name, "description": description, "input_schema": input_schema}
+                for name, description, input_schema in output.tools()
+            ],
+            "tool_choice": {"type": "tool", "name": output.tool_choice},
+            "messages": messages,
+        }
+
+    async def _accept_claude_tool_output(
+        self,
+        output: _ToolOutput,
+        response: Any,
+        system_content: list[dict],
+        messages: list[dict],
+        max_tokens: int,
+        timeout: float,
+        cache_key: str
+    ) -> T:
+        """Validate a turn's tool input, running repair turns until it validates, and cache the result"""
+        while True:
+            tool_use = next((block for block in response.content if block.type == "tool_use"), None)
+            result = output.accept(tool_use.input if tool_use else None, _usage_tokens(response))
+            if result is not None:
+                await self._store_output(cache_key, result, output.label)
+                return result
+            if tool_use is None or not output.can_repair():
+                output.fail()
+
+            messages.append({"role": "assistant", "content": response.content})
+            messages.append({
+                "role": "user",
+                "content": [{
+                    "type": "tool_result",
+                    "tool_use_id": tool_use.id,
+                    "is_error": True,
+                    "content": output.feedback()
+                }]
+            })
+            response = await self._measured(
+                "anthropic", CLAUDE_MODEL, output.label,
+                self.anthropic_client.messages.create(
+                    timeout=timeout, **self._claude_tool_params(output, system_content, messages, max_tokens)
+                )
+            )
+
+    async def _openai_tool_output(
+        self,
+        messages: list[dict],
+        schema: Type[T],
+        max_tokens: int,
+        timeout: float,
+        label: str,
+        use_cache: bool = True
+    ) -> T:
+        """Get a schema-valid object from OpenAI through a forced function call (same repair loop and cache)"""
+        messages = list(messages)
+        cache_key = prompt_fingerprint(
+            provider="openai", model=OPENAI_MODEL, max_tokens=max_tokens,
+            messages=messages, schema=schema.model_json_schema()
+        )
+        cached = await self._cached_output(cache_key, schema, label) if use_cache else None
+        if cached is not None:
+            return cached
+
+        output = _ToolOutput(schema, label)
+
+        while True:
+            response = await self._measured(
+                "openai", OPENAI_MODEL, label,
+                self.openai_client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=messages,
+                    tools=[
+                        {"type": "function", "function": {
+                            "name": name, "description": description, "parameters": input_schema
+                        }}
+                        for name, description, input_schema in output.tools()
+                    ],
+                    tool_choice={"type": "function", "function": {"name": output.tool_choice}},
+                    temperature=0.7,
+                    max_tokens=max_tokens,
+                    timeout=timeout
+                )
+            )
+
+            message = response.choices[0].message
+            call = message.tool_calls[0] if message.tool_calls else None
+            try:
+                submitted = json.loads(call.function.arguments) if call else None
+            except json.JSONDecodeError:
+                submitted = None  # Truncated arguments - validation reports the missing fields
+            result = output.accept(submitted, _usage_tokens(response))
+            if result is not None:
+                await self._store_output(cache_key, result, label)
+                return result
+            if call is None or not output.can_repair():
+                output.fail()
+
+            messages.append({
+                "role": "assistant",
+                "content": message.content,
+                "tool_calls": [{
+                    "id": call.id,
+                    "type": "function",
+                    "function": {"name": call.function.name, "arguments": call.function.arguments}
+                }]
+            })
+            messages.append({"role": "tool", "tool_call_id": call.id, "content": output.feedback()})
+
     async def generate_structured_output(
         self,
         analysis_context: str,
         brand_context: str,
         output_schema: Type[T],
-        provider: Optional[str] = None
+        provider: Optional[str] = None,
+        use_cache: bool = True
     ) -> T:
         """
         Generate structured output using LLM with automatic fallback.
@@ -98,6 +566,7 @@ class LLMClient:
             brand_context: Static brand context (cached for cost reduction)
             output_schema: Pydantic model class for validation
             provider: Force specific provider ('anthropic' or 'openai')
+            use_cache: Reuse an identical earlier response (False = force refresh)
 
         Returns:
             Validated Pydantic model instance
@@ -106,33 +575,28 @@ class LLMClient:
             LLMRateLimitError: If all providers and retries fail
         """
         provider = provider or self.primary_provider
-        providers_to_try = [provider]
-
-        # Add fallback provider
-        if provider == "anthropic" and self.openai_client:
-            providers_to_try.append("openai")
-        elif provider == "openai" and self.anthropic_client:
-            providers_to_try.append("anthropic")
+        # Fallback provider included; a provider whose circuit is open is tried last
+        providers_to_try = self._providers_in_order(provider)
 
         last_error = None
-        for current_provider in providers_to_try:
+        for index, current_provider in enumerate(providers_to_try):
             try:
                 if current_provider == "anthropic" and self.anthropic_client:
                     return await self._call_claude_with_retry(
-                        analysis_context, brand_context, output_schema
+                        analysis_context, brand_context, output_schema, use_cache
                     )
                 elif current_provider == "openai" and self.openai_client:
                     return await self._call_openai_with_retry(
-                        analysis_context, brand_context, output_schema
+                        analysis_context, brand_context, output_schema, use_cache
                     )
             except LLMRateLimitError as e:
                 logger.warning(f"{current_provider} failed: {e}, trying fallback...")
                 last_error = e
-                continue
             except Exception as e:
                 logger.error(f"Unexpected error with {current_provider}: {e}")
                 last_error = e
-                continue
+            if index + 1 < len(providers_to_try):
+                get_llm_metrics().record_fallback(current_provider, providers_to_try[index + 1])
 
         raise LLMRateLimitError(f"All providers failed. Last error: {last_error}")
 
@@ -140,58 +604,84 @@ class LLMClient:
         self,
         analysis_context: str,
         brand_context: str,
-        schema: Type[T]
+        schema: Type[T],
+        use_cache: bool = True
     ) -> T:
         """Call Claude with retry logic and prompt caching"""
         for attempt in range(1, MAX_RETRIES + 1):
             try:
-                return await self._call_claude(analysis_context, brand_context, schema)
+                return await self._call_claude(analysis_context, brand_context, schema, use_cache)
+            except anthropic.APITimeoutError as e:
+                raise LLMTimeoutError(f"Claude request timed out: {e}")
             except anthropic.RateLimitError as e:
                 if attempt == MAX_RETRIES:
                     raise LLMRateLimitError(f"Claude rate limit exceeded: {e}")
                 delay = self._calculate_delay(attempt)
+                self._note_retry("anthropic", "rate_limit")
                 logger.warning(f"Claude rate limited, retry {attempt}/{MAX_RETRIES} in {delay:.1f}s")
                 await asyncio.sleep(delay)
             except anthropic.APIConnectionError as e:
                 if attempt == MAX_RETRIES:
                     raise LLMRateLimitError(f"Claude connection error: {e}")
                 delay = self._calculate_delay(attempt)
+                self._note_retry("anthropic", "connection")
                 await asyncio.sleep(delay)
 
     async def _call_openai_with_retry(
         self,
         analysis_context: str,
         brand_context: str,
-        schema: Type[T]
+        schema: Type[T],
+        use_cache: bool = True
     ) -> T:
         """Call OpenAI with retry logic"""
         for attempt in range(1, MAX_RETRIES + 1):
             try:
-                return await self._call_openai(analysis_context, brand_context, schema)
-            except Exception as e:
-                if "rate" in str(e).lower() or "429" in str(e):
-                    if attempt == MAX_RETRIES:
-                        raise LLMRateLimitError(f"OpenAI rate limit exceeded: {e}")
-                    delay = self._calculate_delay(attempt)
-                    logger.warning(f"OpenAI rate limited, retry {attempt}/{MAX_RETRIES} in {delay:.1f}s")
-                    await asyncio.sleep(delay)
-                else:
-                    raise
+                return await self._call_openai(analysis_context, brand_context, schema, use_cache)
+            except openai.APITimeoutError as e:
+                raise LLMTimeoutError(f"OpenAI request timed out: {e}")
+            except openai.RateLimitError as e:
+                if attempt == MAX_RETRIES:
+                    raise LLMRateLimitError(f"OpenAI rate limit exceeded: {e}")
+                delay = self._calculate_delay(attempt)
+                self._note_retry("openai", "rate_limit")
+                logger.warning(f"OpenAI rate limited, retry {attempt}/{MAX_RETRIES} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            except openai.APIConnectionError as e:
+                if attempt == MAX_RETRIES:
+                    raise LLMRateLimitError(f"OpenAI connection error: {e}")
+                delay = self._calculate_delay(attempt)
+                self._note_retry("openai", "connection")
+                await asyncio.sleep(delay)
 
     async def _call_claude(
         self,
         analysis_context: str,
         brand_context: str,
-        schema: Type[T]
+        schema: Type[T],
+        use_cache: bool = True
     ) -> T:
         """
-        Call Claude with structured output and prompt caching.
+        Call Claude with structured output (tool use) and prompt caching.
 
         Uses cache_control for the brand_context to reduce costs by 90%
         when the same brand is analyzed multiple times.
         """
-        schema_json = json.dumps(schema.model_json_schema(), indent=2)
+        system_content, user_content = self._claude_prompt(analysis_context, brand_context, schema)
+
+        return await self._claude_tool_output(
+            system_content, user_content, schema,
+            max_tokens=MAX_TOKENS, timeout=TIMEOUT_SECONDS, label="Claude suggestions",
+            use_cache=use_cache
+        )
 
+    def _claude_prompt(
+        self,
+        analysis_context: str,
+        brand_context: str,
+        schema: Type[BaseModel]
+    ) -> tuple[list[dict], str]:
+        """Build the (system, user) content for a V1 suggestions request"""
         # Build system message with caching for static content
         system_content = [
             {
@@ -218,62 +708,31 @@ Provide specific, implementable actions with clear steps."""
 
         user_content = f"""Analyze the following data and generate SEO recommendations.
 
-Return your response as valid JSON matching this schema:
-{schema_json}
-
 Analysis Data:
 {analysis_context}
 
 Important:
 - Generate 3-7 keyword opportunities based on the data
 - Generate 3-10 on-page recommendations with implementation steps
-- Set generated_at to the current UTC timestamp
 - Set model_used to "{CLAUDE_MODEL}"
 - Be specific and data-driven, not generic
 
-Return ONLY valid JSON, no markdown code blocks or explanation."""
-
-        # Make the API call
-        response = self.anthropic_client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=4096,
-            system=system_content,
-            messages=[{"role": "user", "content": user_content}]
-        )
-
-        # Extract and validate response
-        raw_text = response.content[0].text
+Submit your response by calling the submit_{schema.__name__} tool."""
 
-        # Clean up response if it has markdown code blocks
-        if raw_text.startswith("```"):
-            raw_text = raw_text.split("```")[1]
-            if raw_text.startswith("json"):
-                raw_text = raw_text[4:]
-            raw_text = raw_text.strip()
-
-        try:
-            return schema.model_validate_json(raw_text)
-        except ValidationError as e:
-            logger.error(f"Claude response validation failed: {e}")
-            logger.debug(f"Raw response: {raw_text[:500]}...")
-            raise
+        return system_content, user_content
 
     async def _call_openai(
         self,
         analysis_context: str,
         brand_context: str,
-        schema: Type[T]
+        schema: Type[T],
+        use_cache: bool = True
     ) -> T:
-        """Call OpenAI with structured output (JSON mode)"""
-        schema_json = json.dumps(schema.model_json_schema(), indent=2)
-
+        """Call OpenAI with structured output (function calling)"""
         system_message = f"""{brand_context}
 
 You are an expert SEO and GEO analyst specializing in AI search visibility.
-Provide actionable, data-driven recommendations based on the analysis data.
-
-Your response must be valid JSON matching this schema:
-{schema_json}"""
+Provide actionable, data-driven recommendations based on the analysis data."""
 
         user_message = f"""Analyze the following data and generate SEO recommendations:
 
@@ -282,31 +741,19 @@ Your response must be valid JSON matching this schema:
 Important:
 - Generate 3-7 keyword opportunities
 - Generate 3-10 on-page recommendations with implementation steps
-- Set generated_at to "{datetime.utcnow().isoformat()}"
 - Set model_used to "{OPENAI_MODEL}"
 
-Return ONLY valid JSON."""
+Submit your response by calling the submit_{schema.__name__} function."""
 
-        response = self.openai_client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
+        return await self._openai_tool_output(
+            [
                 {"role": "system", "content": system_message},
                 {"role": "user", "content": user_message}
             ],
-            response_format={"type": "json_object"},
-            temperature=0.7,
-            max_tokens=4096
+            schema, max_tokens=4096, timeout=TIMEOUT_SECONDS, label="OpenAI suggestions",
+            use_cache=use_cache
         )
 
-        raw_text = response.choices[0].message.content
-
-        try:
-            return schema.model_validate_json(raw_text)
-        except ValidationError as e:
-            logger.error(f"OpenAI response validation failed: {e}")
-            logger.debug(f"Raw response: {raw_text[:500]}...")
-            raise
-
     def _calculate_delay(self, attempt: int) -> float:
         """Calculate delay with exponential backoff and jitter"""
         delay = BASE_DELAY * (2 ** (attempt - 1))
@@ -320,40 +767,38 @@ Return ONLY valid JSON."""
         analysis_context: str,
         brand_context: str,
         output_schema: Type[T],
-        provider: Optional[str] = None
+        provider: Optional[str] = None,
+        use_cache: bool = True
     ) -> T:
         """
         Generate V2 structured output (larger response, more detailed).
 
         Uses increased max_tokens for comprehensive recommendations.
+        Identical requests are answered from the response cache unless
+        use_cache=False.
         """
         provider = provider or self.primary_provider
-        providers_to_try = [provider]
-
-        if provider == "anthropic" and self.openai_client:
-            providers_to_try.append("openai")
-        elif provider == "openai" and self.anthropic_client:
-            providers_to_try.append("anthropic")
+        providers_to_try = self._providers_in_order(provider)
 
         last_error = None
-        for current_provider in providers_to_try:
+        for index, current_provider in enumerate(providers_to_try):
             try:
                 if current_provider == "anthropic" and self.anthropic_client:
                     return await self._call_claude_v2_with_retry(
-                        analysis_context, brand_context, output_schema
+                        analysis_context, brand_context, output_schema, use_cache
                     )
                 elif current_provider == "openai" and self.openai_client:
                     return await self._call_openai_v2_with_retry(
-                        analysis_context, brand_context, output_schema
+                        analysis_context, brand_context, output_schema, use_cache
                     )
             except LLMRateLimitError as e:
                 logger.warning(f"{current_provider} failed: {e}, trying fallback...")
                 last_error = e
-                continue
             except Exception as e:
                 logger.error(f"Unexpected error with {current_provider}: {e}")
                 last_error = e
-                continue
+            if index + 1 < len(providers_to_try):
+                get_llm_metrics().record_fallback(current_provider, providers_to_try[index + 1])
 
         raise LLMRateLimitError(f"All providers failed. Last error: {last_error}")
 
@@ -361,57 +806,90 @@ Return ONLY valid JSON."""
         self,
         analysis_context: str,
         brand_context: str,
-        schema: Type[T]
+        schema: Type[T],
+        use_cache: bool = True
     ) -> T:
         """Call Claude V2 with retry logic"""
         for attempt in range(1, MAX_RETRIES + 1):
             try:
-                return await self._call_claude_v2(analysis_context, brand_context, schema)
+                return await self._call_claude_v2(analysis_context, brand_context, schema, use_cache)
+            except anthropic.APITimeoutError as e:
+                raise LLMTimeoutError(f"Claude request timed out: {e}")
             except anthropic.RateLimitError as e:
                 if attempt == MAX_RETRIES:
                     raise LLMRateLimitError(f"Claude rate limit exceeded: {e}")
                 delay = self._calculate_delay(attempt)
+                self._note_retry("anthropic", "rate_limit")
                 logger.warning(f"Claude rate limited, retry {attempt}/{MAX_RETRIES} in {delay:.1f}s")
                 await asyncio.sleep(delay)
             except anthropic.APIConnectionError as e:
                 if attempt == MAX_RETRIES:
                     raise LLMRateLimitError(f"Claude connection error: {e}")
                 delay = self._calculate_delay(attempt)
+                self._note_retry("anthropic", "connection")
                 await asyncio.sleep(delay)
 
     async def _call_openai_v2_with_retry(
         self,
         analysis_context: str,
         brand_context: str,
-        schema: Type[T]
+        schema: Type[T],
+        use_cache: bool = True
     ) -> T:
         """Call OpenAI V2 with retry logic"""
         for attempt in range(1, MAX_RETRIES + 1):
             try:
-                return await self._call_openai_v2(analysis_context, brand_context, schema)
-            except Exception as e:
-                if "rate" in str(e).lower() or "429" in str(e):
-                    if attempt == MAX_RETRIES:
-                        raise LLMRateLimitError(f"OpenAI rate limit exceeded: {e}")
-                    delay = self._calculate_delay(attempt)
-                    logger.warning(f"OpenAI rate limited, retry {attempt}/{MAX_RETRIES} in {delay:.1f}s")
-                    await asyncio.sleep(delay)
-                else:
-                    raise
+                return await self._call_openai_v2(analysis_context, brand_context, schema, use_cache)
+            except openai.APITimeoutError as e:
+                raise LLMTimeoutError(f"OpenAI request timed out: {e}")
+            except openai.RateLimitError as e:
+                if attempt == MAX_RETRIES:
+                    raise LLMRateLimitError(f"OpenAI rate limit exceeded: {e}")
+                delay = self._calculate_delay(attempt)
+                self._note_retry("openai", "rate_limit")
+                logger.warning(f"OpenAI rate limited, retry {attempt}/{MAX_RETRIES} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            except openai.APIConnectionError as e:
+                if attempt == MAX_RETRIES:
+                    raise LLMRateLimitError(f"OpenAI connection error: {e}")
+                delay = self._calculate_delay(attempt)
+                self._note_retry("openai", "connection")
+                await asyncio.sleep(delay)
 
     async def _call_claude_v2(
         self,
         analysis_context: str,
         brand_context: str,
-        schema: Type[T]
+        schema: Type[T],
+        use_cache: bool = True
     ) -> T:
         """
         Call Claude for V2 (enhanced SEO professional dashboard).
 
         Uses larger max_tokens and improved prompt structure.
         """
-        schema_json = json.dumps(schema.model_json_schema(), indent=2)
+        system_content, user_content = self._claude_v2_prompt(analysis_context, brand_context, schema)
+
+        return await self._claude_tool_output(
+            system_content, user_content, schema,
+            max_tokens=MAX_TOKENS_V2,
+            timeout=TIMEOUT_SECONDS_V2,
+            label="Claude V2 strategy",
+            use_cache=use_cache
+        )
 
+    def _claude_v2_prompt(
+        self,
+        analysis_context: str,
+        brand_context: str,
+        schema: Type[BaseModel]
+    ) -> tuple[list[dict], str]:
+        """
+        Build the (system, user) content for a V2 strategy request.
+
+        The schema is carried by the output tool, so the prompt only asks
+        for the tool call.
+        """
         # Enhanced system prompt for V2
         system_content = [
             {
@@ -436,9 +914,6 @@ CRITICAL REQUIREMENTS:
 
         user_content = f"""Generate a comprehensive GEO strategy based on this data.
 
-Return your response as valid JSON matching this schema:
-{schema_json}
-
 Analysis Data:
 {analysis_context}
 
@@ -449,52 +924,26 @@ Requirements:
 - competitor_gaps: 3-6 gaps with evidence and urgency classification
 - technical_checklist: 5-10 checks with status and how_to_fix
 - outreach_targets: 5-10 targets with specific actions
-- Set generated_at to current UTC: {datetime.utcnow().isoformat()}Z
 - Set model_used to "{CLAUDE_MODEL}"
 
-Return ONLY valid JSON, no markdown or explanation."""
-
-        response = self.anthropic_client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=12000,  # Large response for comprehensive V2 recommendations
-            system=system_content,
-            messages=[{"role": "user", "content": user_content}]
-        )
+Submit your response by calling the submit_{schema.__name__} tool."""
 
-        raw_text = response.content[0].text
-
-        # Clean markdown code blocks
-        if raw_text.startswith("```"):
-            raw_text = raw_text.split("```")[1]
-            if raw_text.startswith("json"):
-                raw_text = raw_text[4:]
-            raw_text = raw_text.strip()
-
-        try:
-            return schema.model_validate_json(raw_text)
-        except ValidationError as e:
-            logger.error(f"Claude V2 response validation failed: {e}")
-            logger.error(f"Raw response (first 2000 chars): {raw_text[:2000]}")
-            raise
+        return system_content, user_content
 
     async def _call_openai_v2(
         self,
         analysis_context: str,
         brand_context: str,
-        schema: Type[T]
+        schema: Type[T],
+        use_cache: bool = True
     ) -> T:
         """Call OpenAI for V2 (enhanced SEO professional dashboard)"""
-        schema_json = json.dumps(schema.model_json_schema(), indent=2)
-
         system_message = f"""{brand_context}
 
 You are an expert GEO strategist providing ACTIONABLE recommendations.
 
 CRITICAL: NO generic advice. Every recommendation must reference actual data.
-NO percentage stats. Focus on specific actions with steps.
-
-Your response must be valid JSON matching this schema:
-{schema_json}"""
+NO percentage stats. Focus on specific actions with steps."""
 
         user_message = f"""Generate a comprehensive GEO strategy:
 
@@ -506,31 +955,22 @@ Requirements:
 - competitor_gaps: 3-6 gaps with evidence
 - technical_checklist: 5-10 checks with status
 - outreach_targets: 5-10 targets with actions
-- generated_at: "{datetime.utcnow().isoformat()}Z"
 - model_used: "{OPENAI_MODEL}"
 
-Return ONLY valid JSON."""
+Submit your response by calling the submit_{schema.__name__} function."""
 
-        response = self.openai_client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
+        return await self._openai_tool_output(
+            [
                 {"role": "system", "content": system_message},
                 {"role": "user", "content": user_message}
             ],
-            response_format={"type": "json_object"},
-            temperature=0.7,
-            max_tokens=6000  # Increased for V2
+            schema,
+            max_tokens=6000,  # Increased for V2
+            timeout=TIMEOUT_SECONDS_V2,
+            label="OpenAI V2 strategy",
+            use_cache=use_cache
         )
 
-        raw_text = response.choices[0].message.content
-
-        try:
-            return schema.model_validate_json(raw_text)
-        except ValidationError as e:
-            logger.error(f"OpenAI V2 response validation failed: {e}")
-            logger.debug(f"Raw response: {raw_text[:1000]}...")
-            raise
-
     # --- Section-Specific Generation Methods ---
 
     async def generate_section(
@@ -539,7 +979,8 @@ Return ONLY valid JSON."""
         section_prompt: str,
         analysis_context: str,
         brand_context: str,
-        schema: Type[T]
+        schema: Type[T],
+        use_cache: bool = True
     ) -> T:
         """
         Generate a single section of the GEO strategy.
@@ -550,16 +991,20 @@ Return ONLY valid JSON."""
             analysis_context: Brand analysis data
             brand_context: Static brand context (cached)
             schema: Pydantic model for the section
+            use_cache: Reuse an identical earlier response (False = force refresh)
         """
         for attempt in range(1, MAX_RETRIES + 1):
             try:
                 return await self._call_claude_section(
-                    section_name, section_prompt, analysis_context, brand_context, schema
+                    section_name, section_prompt, analysis_context, brand_context, schema, use_cache
                 )
+            except anthropic.APITimeoutError as e:
+                raise LLMTimeoutError(f"Claude timed out generating {section_name}: {e}")
             except anthropic.RateLimitError as e:
                 if attempt == MAX_RETRIES:
                     raise LLMRateLimitError(f"Claude rate limit for {section_name}: {e}")
                 delay = self._calculate_delay(attempt)
+                self._note_retry("anthropic", "rate_limit")
                 logger.warning(f"Claude rate limited on {section_name}, retry {attempt}/{MAX_RETRIES}")
                 await asyncio.sleep(delay)
             except Exception as e:
@@ -572,11 +1017,31 @@ Return ONLY valid JSON."""
         section_prompt: str,
         analysis_context: str,
         brand_context: str,
-        schema: Type[T]
+        schema: Type[T],
+        use_cache: bool = True
     ) -> T:
         """Call Claude for a single section with focused prompt."""
-        schema_json = json.dumps(schema.model_json_schema(), indent=2)
+        system_content, user_content = self._section_prompt(
+            section_name, section_prompt, analysis_context, brand_context, schema
+        )
+
+        return await self._claude_tool_output(
+            system_content, user_content, schema,
+            max_tokens=MAX_TOKENS_SECTION,
+            timeout=TIMEOUT_SECONDS,
+            label=f"Claude {section_name}",
+            use_cache=use_cache
+        )
 
+    def _section_prompt(
+        self,
+        section_name: str,
+        section_prompt: str,
+        analysis_context: str,
+        brand_context: str,
+        schema: Type[BaseModel]
+    ) -> tuple[list[dict], str]:
+        """Build the (system, user) content for a single-section request (see _claude_v2_prompt)"""
         system_content = [
             {
                 "type": "text",
@@ -597,30 +1062,227 @@ NO generic advice. Every recommendation must reference actual data from the anal
 Analysis Data:
 {analysis_context}
 
-Return your response as valid JSON matching this schema:
-{schema_json}
+Submit your response by calling the submit_{schema.__name__} tool."""
+
+        return system_content, user_content
 
-Return ONLY valid JSON, no markdown or explanation."""
+    # --- Batch pre-generation (Message Batches API) ---
 
-        response = self.anthropic_client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=2500,  # Smaller per-section
-            system=system_content,
-            messages=[{"role": "user", "content": user_content}]
+    def _prepare_claude(
+        self,
+        system_content: list[dict],
+        user_content: str,
+        schema: Type[BaseModel],
+        max_tokens: int,
+        label: str
+    ) -> PreparedRequest:
+        """First turn of _claude_tool_output as batch request params"""
+        messages = [{"role": "user", "content": user_content}]
+        name, description, input_schema = _output_tool(schema, label)
+        params = {
+            "model": CLAUDE_MODEL,
+            "max_tokens": max_tokens,
+            "system": system_content,
+            "tools": [{"name": name, "description": description, "input_schema": input_schema}],
+            "tool_choice": {"type": "tool", "name": name},
+            "messages": messages,
+        }
+        return PreparedRequest(params, schema, label, _claude_cache_key(system_content, messages, schema, max_tokens))
+
+    def prepare_structured_output(
+        self,
+        analysis_context: str,
+        brand_context: str,
+        output_schema: Type[BaseModel]
+    ) -> PreparedRequest:
+        """The Claude request generate_structured_output would send, unsent"""
+        system_content, user_content = self._claude_prompt(analysis_context, brand_context, output_schema)
+        return self._prepare_claude(system_content, user_content, output_schema, MAX_TOKENS, "Claude suggestions")
+
+    def prepare_structured_output_v2(
+        self,
+        analysis_context: str,
+        brand_context: str,
+        output_schema: Type[BaseModel]
+    ) -> PreparedRequest:
+        """The Claude request generate_structured_output_v2 would send, unsent"""
+        system_content, user_content = self._claude_v2_prompt(analysis_context, brand_context, output_schema)
+        return self._prepare_claude(system_content, user_content, output_schema, MAX_TOKENS_V2, "Claude V2 strategy")
+
+    def prepare_section(
+        self,
+        section_name: str,
+        section_prompt: str,
+        analysis_context: str,
+        brand_context: str,
+        schema: Type[BaseModel]
+    ) -> PreparedRequest:
+        """The Claude request generate_section would send, unsent"""
+        system_content, user_content = self._section_prompt(
+            section_name, section_prompt, analysis_context, brand_context, schema
+        )
+        return self._prepare_claude(
+            system_content, user_content, schema, MAX_TOKENS_SECTION, f"Claude {section_name}"
         )
 
-        raw_text = response.content[0].text
+    async def accept_batch_result(self, prepared: PreparedRequest, message: Any, latency: float) -> Optional[BaseModel]:
+        """
+        Validate a batch result and write it to the response cache.
 
-        # Clean markdown code blocks
-        if raw_text.startswith("```"):
-            raw_text = raw_text.split("```")[1]
-            if raw_text.startswith("json"):
-                raw_text = raw_text[4:]
-            raw_text = raw_text.strip()
+        Batch requests get no repair turn, so an invalid result returns None
+        and the caller regenerates it interactively (with repairs).
 
+        Args:
+            prepared: The request the result answers
+            message: Message from the batch results
+            latency: Seconds from batch submission to results
+        """
+        get_llm_metrics().record_call(
+            "anthropic", CLAUDE_MODEL, f"{prepared.label} (batch)", latency, usage=getattr(message, "usage", None)
+        )
+        tool_use = next((block for block in message.content if block.type == "tool_use"), None)
+        if tool_use is None:
+            logger.warning(f"Batch {prepared.label} returned no tool call")
+            return None
         try:
-            return schema.model_validate_json(raw_text)
+            result = _validate_output(prepared.schema, tool_use.input)
         except ValidationError as e:
-            logger.error(f"Claude {section_name} validation failed: {e}")
-            logger.error(f"Raw response: {raw_text[:1500]}")
-            raise
+            _structured_output_stats["validation_failures"] += 1
+            logger.warning(f"Batch {prepared.label} failed validation ({e.error_count()} errors)")
+            return None
+        await self._store_output(prepared.cache_key, result, prepared.label)
+        return result
+
+    # --- Streaming (server-sent events) ---
+
+    def stream_section(
+        self,
+        section_name: str,
+        section_prompt: str,
+        analysis_context: str,
+        brand_context: str,
+        schema: Type[T],
+        use_cache: bool = True
+    ) -> "StreamedOutput":
+        """Stream one section: the request (and response cache entry) of generate_section"""
+        system_content, user_content = self._section_prompt(
+            section_name, section_prompt, analysis_context, brand_context, schema
+        )
+        return StreamedOutput(lambda streamed: self._stream_claude_tool_output(
+            streamed, system_content, user_content, schema,
+            max_tokens=MAX_TOKENS_SECTION, timeout=TIMEOUT_SECONDS, label=f"Claude {section_name}",
+            use_cache=use_cache
+        ))
+
+    def stream_structured_output_v2(
+        self,
+        analysis_context: str,
+        brand_context: str,
+        output_schema: Type[T],
+        use_cache: bool = True
+    ) -> "StreamedOutput":
+        """Stream a full V2 strategy: the Claude request (and cache entry) of generate_structured_output_v2"""
+        system_content, user_content = self._claude_v2_prompt(analysis_context, brand_context, output_schema)
+        return StreamedOutput(lambda streamed: self._stream_claude_tool_output(
+            streamed, system_content, user_content, output_schema,
+            max_tokens=MAX_TOKENS_V2, timeout=TIMEOUT_SECONDS_V2, label="Claude V2 strategy",
+            use_cache=use_cache
+        ))
+
+    async def _stream_claude_tool_output(
+        self,
+        streamed: "StreamedOutput",
+        system_content: list[dict],
+        user_content: str,
+        schema: Type[T],
+        max_tokens: int,
+        timeout: float,
+        label: str,
+        use_cache: bool = True
+    ) -> AsyncIterator[str]:
+        """
+        _claude_tool_output with its first turn streamed.
+
+        Yields the input_json_delta chunks of the forced tool call, then
+        validates (and repairs) the complete input like the non-streamed
+        path and sets streamed.result. Rate limits and connection errors
+        are retried only until the first delta has been forwarded; after
+        that the stream cannot be replayed.
+        """
+        if not self.anthropic_client:
+            raise LLMRateLimitError("Streaming requires ANTHROPIC_API_KEY")
+
+        messages = [{"role": "user", "content": user_content}]
+        cache_key = _claude_cache_key(system_content, messages, schema, max_tokens)
+        cached = await self._cached_output(cache_key, schema, label) if use_cache else None
+        if cached is not None:
+            streamed.result = cached
+            yield cached.model_dump_json()
+            return
+
+        output = _ToolOutput(schema, label)
+        operation = f"{label} (stream)"
+        for attempt in range(1, MAX_RETRIES + 1):
+            started = False
+            request_started = time.perf_counter()
+            try:
+                async with get_provider_health("anthropic").guard(_classify_provider_error):
+                    async with self.anthropic_client.messages.stream(
+                        timeout=timeout, **self._claude_tool_params(output, system_content, messages, max_tokens)
+                    ) as stream:
+                        async for event in stream:
+                            if event.type == "content_block_delta" and event.delta.type == "input_json_delta":
+                                started = True
+                                yield event.delta.partial_json
+                        response = await stream.get_final_message()
+                get_llm_metrics().record_call(
+                    "anthropic", CLAUDE_MODEL, operation,
+                    time.perf_counter() - request_started, usage=response.usage
+                )
+                break
+            except ProviderUnavailableError as e:
+                raise LLMCircuitOpenError(str(e)) from None
+            except anthropic.APITimeoutError as e:
+                get_llm_metrics().record_call(
+                    "anthropic", CLAUDE_MODEL, operation, time.perf_counter() - request_started, error=type(e).__name__
+                )
+                raise LLMTimeoutError(f"Claude stream timed out for {label}: {e}")
+            except (anthropic.RateLimitError, anthropic.APIConnectionError) as e:
+                get_llm_metrics().record_call(
+                    "anthropic", CLAUDE_MODEL, operation, time.perf_counter() - request_started, error=type(e).__name__
+                )
+                if started or attempt == MAX_RETRIES:
+                    raise LLMRateLimitError(f"Claude stream failed for {label}: {e}")
+                reason = "rate_limit" if isinstance(e, anthropic.RateLimitError) else "connection"
+                self._note_retry("anthropic", reason)
+                delay = self._calculate_delay(attempt)
+                logger.warning(f"Claude stream for {label} failed, retry {attempt}/{MAX_RETRIES} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+        try:
+            streamed.result = await self._accept_claude_tool_output(
+                output, response, system_content, messages, max_tokens, timeout, cache_key
+            )
+        except anthropic.APITimeoutError as e:
+            raise LLMTimeoutError(f"Claude repair turn timed out for {label}: {e}")
+        except (anthropic.RateLimitError, anthropic.APIConnectionError) as e:
+            raise LLMRateLimitError(f"Claude repair turn failed for {label}: {e}")
+
+
+class StreamedOutput:
+    """
+    A structured output streamed as the partial JSON of its forced tool call.
+
+    Iterating yields the tool input's JSON text deltas, for incremental
+    parsing (services/json_stream.py). Once iteration ends, result holds
+    the validated object: repaired by non-streamed turns if the streamed
+    input failed validation, so it can differ from what was streamed. A
+    response cache hit is yielded as a single chunk.
+    """
+
+    def __init__(self, produce: Callable[["StreamedOutput"], AsyncIterator[str]]):
+        self._produce = produce
+        self.result: Optional[BaseModel] = None
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self._produce(self).__aiter__()
@@ -0,0 +1,242 @@
+"""
+Per-call instrumentation for LLM provider requests.
+
+Every provider call made by LLMClient is recorded with its provider, model,
+operation (e.g. "Claude quick_wins"), latency, outcome and the token counts
+from the response usage object - including prompt cache writes and reads,
+so the effect of cache_control on brand_context can be measured. Retries
+and provider fallbacks are counted separately.
+
+Counters are per worker process and reset on restart; /api/llm/stats
+serves them as JSON or in the Prometheus text format.
+"""
+import time
+import logging
+from collections import Counter, deque
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+RECENT_CALLS = 50  # Individual calls kept for inspection
+LATENCY_SAMPLES = 500  # Latencies kept per operation for percentiles
+TOKEN_KINDS = ("input", "output", "cache_write", "cache_read")
+
+
+def normalize_usage(usage: Any) -> dict[str, int]:
+    """
+    Map an Anthropic or OpenAI usage object to input/output/cache_write/cache_read.
+
+    Anthropic reports uncached input separately from cache writes and reads;
+    OpenAI's prompt_tokens include the cached part, which is split out here
+    so input always means "uncached input tokens".
+    """
+    tokens = dict.fromkeys(TOKEN_KINDS, 0)
+    if usage is None:
+        return tokens
+
+    def value(obj, field) -> int:
+        number = getattr(obj, field, None)
+        return number if isinstance(number, int) else 0
+
+    if hasattr(usage, "prompt_tokens"):
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = value(details, "cached_tokens") if details is not None else 0
+        tokens["input"] = value(usage, "prompt_tokens") - cached
+        tokens["output"] = value(usage, "completion_tokens")
+        tokens["cache_read"] = cached
+    else:
+        tokens["input"] = value(usage, "input_tokens")
+        tokens["output"] = value(usage, "output_tokens")
+        tokens["cache_write"] = value(usage, "cache_creation_input_tokens")
+        tokens["cache_read"] = value(usage, "cache_read_input_tokens")
+    return tokens
+
+
+def _label_value(value: Any) -> str:
+    """Escape a Prometheus label value"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _OperationStats:
+    """Aggregates for one (provider, model, operation)"""
+
+    __slots__ = ("calls", "errors", "tokens", "latency_total", "latencies")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors: Counter = Counter()
+        self.tokens: Counter = Counter()
+        self.latency_total = 0.0
+        self.latencies: deque = deque(maxlen=LATENCY_SAMPLES)
+
+    def snapshot(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3)
+
+        prompt_tokens = self.tokens["input"] + self.tokens["cache_write"] + self.tokens["cache_read"]
+        return {
+            "calls": self.calls,
+            "errors": dict(self.errors),
+            "tokens": {kind: self.tokens[kind] for kind in TOKEN_KINDS},
+            "cache_hit_ratio": round(self.tokens["cache_read"] / prompt_tokens, 3) if prompt_tokens else None,
+            "latency_seconds": {
+                "mean": round(self.latency_total / self.calls, 3) if self.calls else None,
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(latencies[-1], 3) if latencies else None,
+            },
+        }
+
+
+class LLMMetrics:
+    """Process-wide registry of LLM call, retry and fallback metrics"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._operations: dict[tuple[str, str, str], _OperationStats] = {}
+        self.retries: Counter = Counter()  # (provider, reason)
+        self.fallbacks: Counter = Counter()  # (from provider, to provider)
+        self.recent: deque = deque(maxlen=RECENT_CALLS)
+
+    def record_call(
+        self,
+        provider: str,
+        model: str,
+        operation: str,
+        latency: float,
+        usage: Any = None,
+        error: Optional[str] = None
+    ):
+        """
+        Record one provider request.
+
+        Args:
+            provider: 'anthropic' or 'openai'
+            model: Model name sent with the request
+            operation: What the call was for (LLMClient label)
+            latency: Seconds from request to complete response
+            usage: Response usage object (None for failed calls)
+            error: Exception class name if the call failed
+        """
+        key = (provider, model, operation)
+        stats = self._operations.get(key)
+        if stats is None:
+            stats = self._operations[key] = _OperationStats()
+
+        tokens = normalize_usage(usage)
+        stats.calls += 1
+        stats.latency_total += latency
+        stats.latencies.append(latency)
+        stats.tokens.update(tokens)
+        if error:
+            stats.errors[error] += 1
+
+        self.recent.append({
+            "at": round(time.time(), 3),
+            "provider": provider,
+            "model": model,
+            "operation": operation,
+            "latency_seconds": round(latency, 3),
+            "error": error,
+            **tokens,
+        })
+        logger.debug(
+            f"LLM call {provider}/{operation}: {latency:.2f}s, in={tokens['input']} out={tokens['output']} "
+            f"cache_write={tokens['cache_write']} cache_read={tokens['cache_read']}"
+            + (f", error={error}" if error else "")
+        )
+
+    def record_retry(self, provider: str, reason: str):
+        self.retries[(provider, reason)] += 1
+
+    def record_fallback(self, from_provider: str, to_provider: str):
+        self.fallbacks[(from_provider, to_provider)] += 1
+
+    def snapshot(self) -> dict:
+        """All metrics as a JSON-serializable dict"""
+        operations = [
+            {"provider": provider, "model": model, "operation": operation, **stats.snapshot()}
+            for (provider, model, operation), stats in sorted(self._operations.items())
+        ]
+        totals = Counter()
+        for stats in self._operations.values():
+            totals.update(stats.tokens)
+        prompt_tokens = totals["input"] + totals["cache_write"] + totals["cache_read"]
+
+        return {
+            "since": self.started_at,
+            "calls": sum(stats.calls for stats in self._operations.values()),
+            "errors": sum(sum(stats.errors.values()) for stats in self._operations.values()),
+            "tokens": {kind: totals[kind] for kind in TOKEN_KINDS},
+            "cache_hit_ratio": round(totals["cache_read"] / prompt_tokens, 3) if prompt_tokens else None,
+            "retries": [
+                {"provider": provider, "reason": reason, "count": count}
+                for (provider, reason), count in sorted(self.retries.items())
+            ],
+            "fallbacks": [
+                {"from": source, "to": target, "count": count}
+                for (source, target), count in sorted(self.fallbacks.items())
+            ],
+            "operations": operations,
+            "recent_calls": list(self.recent),
+        }
+
+    def prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+
+        def labels(**values) -> str:
+            return "{" + ",".join(f'{name}="{_label_value(value)}"' for name, value in values.items()) + "}"
+
+        lines = [
+            "# HELP llm_calls_total LLM provider requests",
+            "# TYPE llm_calls_total counter",
+        ]
+        for (provider, model, operation), stats in sorted(self._operations.items()):
+            failed = sum(stats.errors.values())
+            base = dict(provider=provider, model=model, operation=operation)
+            lines.append(f"llm_calls_total{labels(**base, outcome='ok')} {stats.calls - failed}")
+            for error, count in sorted(stats.errors.items()):
+                lines.append(f"llm_calls_total{labels(**base, outcome=error)} {count}")
+
+        lines += ["# HELP llm_tokens_total Tokens by kind (input excludes cache writes and reads)",
+                  "# TYPE llm_tokens_total counter"]
+        for (provider, model, operation), stats in sorted(self._operations.items()):
+            for kind in TOKEN_KINDS:
+                lines.append(
+                    f"llm_tokens_total{labels(provider=provider, model=model, operation=operation, kind=kind)} "
+                    f"{stats.tokens[kind]}"
+                )
+
+        lines += ["# HELP llm_latency_seconds Provider request latency",
+                  "# TYPE llm_latency_seconds summary"]
+        for (provider, model, operation), stats in sorted(self._operations.items()):
+            base = labels(provider=provider, model=model, operation=operation)
+            lines.append(f"llm_latency_seconds_sum{base} {stats.latency_total:.6f}")
+            lines.append(f"llm_latency_seconds_count{base} {stats.calls}")
+
+        lines += ["# HELP llm_retries_total Retried provider requests",
+                  "# TYPE llm_retries_total counter"]
+        for (provider, reason), count in sorted(self.retries.items()):
+            lines.append(f"llm_retries_total{labels(provider=provider, reason=reason)} {count}")
+
+        lines += ["# HELP llm_fallbacks_total Requests handed to the fallback provider",
+                  "# TYPE llm_fallbacks_total counter"]
+        for (source, target), count in sorted(self.fallbacks.items()):
+            lines.append(f"llm_fallbacks_total{labels(from_provider=source, to_provider=target)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+
+_llm_metrics: Optional[LLMMetrics] = None
+
+
+def get_llm_metrics() -> LLMMetrics:
+    """Return the process-wide LLM metrics registry (created lazily)"""
+    global _llm_metrics
+    if _llm_metrics is None:
+        _llm_metrics = LLMMetrics()
+    return _llm_metrics
@@ -0,0 +1,82 @@
+"""
+SDK clients for the LLM and embedding providers.
+
+Clients built with pool limits keep idle connections open for reuse, so
+callers sharing one client (see services.container) skip the TCP and TLS
+handshakes after the first request. LLM_PROVIDER_MODE is applied by the
+services wrapping these clients (LLMClient, EmbeddingService).
+"""
+import os
+import logging
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Keep-alive pool per provider client
+POOL_MAX_CONNECTIONS = int(os.getenv("PROVIDER_POOL_MAX_CONNECTIONS", "100"))
+POOL_MAX_KEEPALIVE = int(os.getenv("PROVIDER_POOL_MAX_KEEPALIVE", "20"))
+POOL_KEEPALIVE_SECONDS = float(os.getenv("PROVIDER_POOL_KEEPALIVE_SECONDS", "60"))
+
+# Default for service constructors' client arguments: build a client of their own
+# (None means the caller has no client, e.g. no API key)
+NEW_CLIENT: Any = object()
+
+
+def keepalive_limits():
+    """httpx pool limits for long-lived provider clients"""
+    import httpx
+    return httpx.Limits(
+        max_connections=POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=POOL_MAX_KEEPALIVE,
+        keepalive_expiry=POOL_KEEPALIVE_SECONDS
+    )
+
+
+def create_anthropic_client(pool_limits: Optional[Any] = None) -> Optional[Any]:
+    """
+    anthropic.AsyncAnthropic for ANTHROPIC_API_KEY.
+
+    Args:
+        pool_limits: httpx.Limits for the client's connection pool (default: SDK defaults)
+
+    Returns:
+        The client, or None without the anthropic package or an API key
+    """
+    try:
+        import anthropic
+    except ImportError:
+        return None
+
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        logger.warning("ANTHROPIC_API_KEY not set")
+        return None
+
+    kwargs = {"http_client": anthropic.DefaultAsyncHttpxClient(limits=pool_limits)} if pool_limits else {}
+    logger.info("Anthropic client initialized")
+    return anthropic.AsyncAnthropic(api_key=api_key, **kwargs)
+
+
+def create_openai_client(pool_limits: Optional[Any] = None) -> Optional[Any]:
+    """
+    openai.AsyncOpenAI for OPENAI_API_KEY (chat completions and embeddings).
+
+    Args:
+        pool_limits: httpx.Limits for the client's connection pool (default: SDK defaults)
+
+    Returns:
+        The client, or None without the openai package or an API key
+    """
+    try:
+        import openai
+    except ImportError:
+        return None
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        logger.warning("OPENAI_API_KEY not set")
+        return None
+
+    kwargs = {"http_client": openai.DefaultAsyncHttpxClient(limits=pool_limits)} if pool_limits else {}
+    logger.info("OpenAI client initialized")
+    return openai.AsyncOpenAI(api_key=api_key, **kwargs)
@@ -0,0 +1,257 @@
+"""
+Per-provider circuit breaker and adaptive (AIMD) concurrency limit.
+
+CircuitBreaker stops sending requests to a provider after consecutive
+failures: requests fail fast (and LLMClient goes straight to the fallback
+provider) until a cool-down passes, then a single probe request decides
+whether to close the circuit again.
+
+AIMDLimiter caps in-flight requests per provider. The cap grows by about
+one per window of successful requests and halves on a rate-limit response,
+so a worker backs off instead of hammering a provider that is returning 429s.
+"""
+import os
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_OPEN_SECONDS = float(os.getenv("LLM_BREAKER_OPEN_SECONDS", "30"))
+CONCURRENCY_INITIAL = float(os.getenv("LLM_CONCURRENCY_INITIAL", "8"))
+CONCURRENCY_MAX = float(os.getenv("LLM_CONCURRENCY_MAX", "32"))
+CONCURRENCY_MIN = 1.0
+DECREASE_FACTOR = 0.5
+
+# Outcome classes returned by a guard's classifier
+RATE_LIMITED = "rate_limited"
+FAILED = "failed"
+
+
+class ProviderUnavailableError(Exception):
+    """Raised without calling the provider while its circuit is open"""
+    pass
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open probe -> closed/open"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        open_seconds: float = BREAKER_OPEN_SECONDS
+    ):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+
+    def is_open(self) -> bool:
+        """True while requests would be rejected (read-only, does not claim the probe)"""
+        if self.state == self.OPEN:
+            return time.monotonic() - self.opened_at < self.open_seconds
+        return self.state == self.HALF_OPEN and self.probe_in_flight
+
+    def allow(self) -> bool:
+        """Admit a request; after the cool-down exactly one probe is let through"""
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+            self.state = self.HALF_OPEN
+            self.probe_in_flight = False
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info("Circuit closed after successful probe")
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self.probe_in_flight = False
+
+    def record_neutral(self):
+        """Outcome says nothing about provider health (e.g. cancelled, bad request)"""
+        self.probe_in_flight = False
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.HALF_OPEN if self.state == self.OPEN and not self.is_open() else self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_in_seconds": (
+                round(max(0.0, self.open_seconds - (time.monotonic() - self.opened_at)), 1)
+                if self.state == self.OPEN else None
+            ),
+        }
+
+
+class AIMDLimiter:
+    """Additive-increase / multiplicative-decrease cap on concurrent requests"""
+
+    def __init__(
+        self,
+        initial: float = CONCURRENCY_INITIAL,
+        minimum: float = CONCURRENCY_MIN,
+        maximum: float = CONCURRENCY_MAX
+    ):
+        self.limit = min(max(initial, minimum), maximum)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_flight = 0
+        self.waiting = 0
+        self.decreases = 0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of the int(limit) request slots; yields the time the request started"""
+        async with self._condition:
+            self.waiting += 1
+            try:
+                await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+        started = time.monotonic()
+        try:
+            yield started
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def on_success(self):
+        # +1 per limit successes, i.e. roughly one per window of requests
+        self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+    def on_rate_limit(self, started: float):
+        """Halve the limit, once per burst: requests sent before the last decrease don't count"""
+        if started < self._last_decrease or self.limit <= self.minimum:
+            return
+        self.limit = max(self.minimum, self.limit * DECREASE_FACTOR)
+        self._last_decrease = time.monotonic()
+        self.decreases += 1
+        logger.warning(f"Rate limited, concurrency limit lowered to {self.limit:.1f}")
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "decreases": self.decreases,
+        }
+
+
+class ProviderHealth:
+    """Circuit breaker and concurrency limiter for one provider"""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.breaker = CircuitBreaker()
+        self.limiter = AIMDLimiter()
+
+    def is_available(self) -> bool:
+        return not self.breaker.is_open()
+
+    @asynccontextmanager
+    async def guard(self, classify: Callable[[BaseException], Optional[str]]):
+        """
+        Wrap one provider request.
+
+        Fails fast with ProviderUnavailableError while the circuit is open,
+        otherwise waits for a concurrency slot and feeds the outcome back:
+        classify(error) returns RATE_LIMITED, FAILED or None (neutral).
+        """
+        if not self.breaker.allow():
+            raise ProviderUnavailableError(f"{self.provider} circuit open, skipping request")
+
+        try:
+            async with self.limiter.slot() as started:
+                try:
+                    yield
+                except BaseException as e:
+                    outcome = classify(e) if isinstance(e, Exception) else None
+                    if outcome == RATE_LIMITED:
+                        self.limiter.on_rate_limit(started)
+                    if outcome in (RATE_LIMITED, FAILED):
+                        was_open = self.breaker.state == CircuitBreaker.OPEN
+                        self.breaker.record_failure()
+                        if self.breaker.state == CircuitBreaker.OPEN and not was_open:
+                            logger.warning(
+                                f"{self.provider} circuit opened after {self.breaker.consecutive_failures} "
+                                f"consecutive failures, retrying in {self.breaker.open_seconds:.0f}s"
+                            )
+                    else:
+                        self.breaker.record_neutral()
+                    raise
+                self.breaker.record_success()
+                self.limiter.on_success()
+        except asyncio.CancelledError:
+            # Cancelled while waiting for a slot: release a half-open probe claim
+            self.breaker.record_neutral()
+            raise
+
+    def snapshot(self) -> dict:
+        return {"circuit": self.breaker.snapshot(), "concurrency": self.limiter.snapshot()}
+
+
+_providers: dict[str, ProviderHealth] = {}
+
+
+def get_provider_health(provider: str) -> ProviderHealth:
+    """Return the process-wide health tracker for a provider (created lazily)"""
+    health = _providers.get(provider)
+    if health is None:
+        health = _providers[provider] = ProviderHealth(provider)
+    return health
+
+
+def provider_health_snapshot() -> dict:
+    """State of every provider used so far"""
+    return {provider: health.snapshot() for provider, health in sorted(_providers.items())}
+
+
+def provider_health_prometheus() -> str:
+    """Circuit state and concurrency gauges in the Prometheus text format"""
+    states = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+    lines = [
+        "# HELP llm_circuit_state Provider circuit (0=closed, 1=half-open, 2=open)",
+        "# TYPE llm_circuit_state gauge",
+    ]
+    snapshots = provider_health_snapshot()
+    for provider, snapshot in snapshots.items():
+        lines.append(f'llm_circuit_state{{provider="{provider}"}} {states[snapshot["circuit"]["state"]]}')
+    lines += ["# HELP llm_concurrency_limit Adaptive in-flight request limit",
+              "# TYPE llm_concurrency_limit gauge"]
+    for provider, snapshot in snapshots.items():
+        lines.append(f'llm_concurrency_limit{{provider="{provider}"}} {snapshot["concurrency"]["limit"]}')
+    lines += ["# HELP llm_in_flight_requests Provider requests in flight",
+              "# TYPE llm_in_flight_requests gauge"]
+    for provider, snapshot in snapshots.items():
+        lines.append(f'llm_in_flight_requests{{provider="{provider}"}} {snapshot["concurrency"]["in_flight"]}')
+    return "\n".join(lines) + "\n"
@@ -1,19 +1,121 @@
 """
 RAG (Retrieval-Augmented Generation) Service for AI Suggestions.
-Uses pgvector for semantic similarity search over prompt embeddings.
+Uses pgvector for semantic similarity search over prompt embeddings,
+or the in-process vector index when pgvector is unavailable.
 """
+import os
+import re
 import logging
 from collections import Counter
-from datetime import datetime
 from typing import Optional
-from sqlmodel import Session, select, text
+from sqlalchemy import case
+from sqlmodel import Session, select, text, func
 
 from models import Brand, Prompt, PromptBrandMention, Source, PromptSource
 from database import IS_POSTGRES, is_vector_search_available
+from .container import get_service_container
 from .embeddings import EmbeddingService
+from .vector_index import get_local_vector_index
+from .context_packing import TOKEN_BUDGET as EXCERPT_TOKEN_BUDGET, pack_prompt_excerpts, prompt_header_tokens
 
 logger = logging.getLogger(__name__)
 
+# Similarity search statements (pgvector). Parameters: query_embedding, limit[, brand_id]
+VECTOR_SEARCH_SQL = text("""
+    SELECT p.id, p.query, p.run_number, p.response_text, p.scraped_at,
+           pe.embedding <=> :query_embedding AS distance
+    FROM promptembedding pe
+    JOIN prompt p ON p.id = pe.prompt_id
+    WHERE pe.embedding IS NOT NULL
+    ORDER BY distance ASC
+    LIMIT :limit
+""")
+
+VECTOR_SEARCH_BY_BRAND_SQL = text("""
+    SELECT p.id, p.query, p.run_number, p.response_text, p.scraped_at,
+           pe.embedding <=> :query_embedding AS distance
+    FROM (
+        SELECT DISTINCT prompt_id FROM promptbrandmention WHERE brand_id = :brand_id
+    ) bm
+    JOIN promptembedding pe ON pe.prompt_id = bm.prompt_id
+    JOIN prompt p ON p.id = pe.prompt_id
+    WHERE pe.embedding IS NOT NULL
+    ORDER BY distance ASC
+    LIMIT :limit
+""")
+
+# Full-text search statements. PostgreSQL: GIN index over to_tsvector (see database.py).
+LEXICAL_SEARCH_PG_SQL = text("""
+    SELECT p.id
+    FROM prompt p, to_tsquery('english', :tsquery) q
+    WHERE to_tsvector('english', coalesce(p.query, '') || ' ' || coalesce(p.response_text, '')) @@ q
+    ORDER BY ts_rank_cd(
+        to_tsvector('english', coalesce(p.query, '') || ' ' || coalesce(p.response_text, '')), q
+    ) DESC
+    LIMIT :limit
+""")
+
+LEXICAL_SEARCH_PG_BY_BRAND_SQL = text("""
+    SELECT p.id
+    FROM (
+        SELECT DISTINCT prompt_id FROM promptbrandmention WHERE brand_id = :brand_id
+    ) bm
+    JOIN prompt p ON p.id = bm.prompt_id, to_tsquery('english', :tsquery) q
+    WHERE to_tsvector('english', coalesce(p.query, '') || ' ' || coalesce(p.response_text, '')) @@ q
+    ORDER BY ts_rank_cd(
+        to_tsvector('english', coalesce(p.query, '') || ' ' || coalesce(p.response_text, '')), q
+    ) DESC
+    LIMIT :limit
+""")
+
+# SQLite: FTS5 external-content table prompt_fts (see database.py); bm25() is lower-is-better
+LEXICAL_SEARCH_FTS5_SQL = text("""
+    SELECT rowid FROM prompt_fts
+    WHERE prompt_fts MATCH :match
+    ORDER BY bm25(prompt_fts)
+    LIMIT :limit
+""")
+
+LEXICAL_SEARCH_FTS5_BY_BRAND_SQL = text("""
+    SELECT prompt_fts.rowid FROM prompt_fts
+    WHERE prompt_fts MATCH :match
+    AND prompt_fts.rowid IN (
+        SELECT prompt_id FROM promptbrandmention WHERE brand_id = :brand_id
+    )
+    ORDER BY bm25(prompt_fts)
+    LIMIT :limit
+""")
+
+# Retrieval configuration
+SEARCH_MODE = os.getenv("RAG_SEARCH_MODE", "hybrid")  # hybrid | vector | lexical
+RRF_K = 60  # Reciprocal rank fusion damping constant
+RRF_MIN_DEPTH = 20  # Minimum candidates per ranking in hybrid mode
+MAX_SEARCH_TERMS = 16
+SAMPLE_QUERIES = 5  # Queries always listed in the V2 context, with or without excerpts
+
+
+def _search_terms(query: str) -> list[str]:
+    """Split a query into safe full-text terms (alphanumeric tokens only)"""
+    terms = []
+    for token in re.findall(r"[^\W_]+", query.lower()):
+        if len(token) > 1 and token not in terms:
+            terms.append(token)
+    return terms[:MAX_SEARCH_TERMS]
+
+
+def reciprocal_rank_fusion(rankings: list[list[int]], k: int = RRF_K) -> list[int]:
+    """
+    Fuse ranked ID lists: score(id) = sum(1 / (k + rank)) over the lists it appears in.
+
+    Returns:
+        IDs ordered by fused score (ties keep first-seen order)
+    """
+    scores: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, 1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda item_id: scores[item_id], reverse=True)
+
 
 class RAGService:
     """
@@ -21,14 +123,18 @@ class RAGService:
 
     Features:
     - Vector similarity search using pgvector
-    - Fallback to recent prompts when vector search unavailable
+    - Local memory-mapped vector index when pgvector is unavailable (e.g. SQLite)
+    - Full-text (BM25) search fused with vector rankings in hybrid mode
+    - Fallback to recent prompts when no search returns results
     - Context building for LLM prompts (with caching support)
     """
 
     def __init__(self, session: Session, embedding_service: Optional[EmbeddingService] = None):
         self.session = session
-        self.embedding_service = embedding_service or EmbeddingService()
+        self.embedding_service = embedding_service or get_service_container().embedding_service
         self._vector_search_available = None
+        self._local_search_available = None
+        self._aggregates = None  # Corpus-wide metrics, loaded once per service instance
 
     @property
     def vector_search_available(self) -> bool:
@@ -41,69 +147,125 @@ class RAGService:
             )
         return self._vector_search_available
 
+    @property
+    def local_search_available(self) -> bool:
+        """Check if the local vector index can serve searches (cached)"""
+        if self._local_search_available is None:
+            local_index = get_local_vector_index()
+            self._local_search_available = (
+                self.embedding_service.is_available() and
+                local_index.is_available() and
+                len(local_index) > 0
+            )
+        return self._local_search_available
+
     async def find_similar_prompts(
         self,
         query: str,
         brand_id: Optional[str] = None,
-        limit: int = 10
+        limit: int = 10,
+        mode: Optional[str] = None
     ) -> list[Prompt]:
         """
-        Find prompts similar to the query using vector search.
+        Find prompts relevant to the query.
 
-        Falls back to recent prompts if vector search is unavailable.
+        Vector search uses pgvector when available, then the local vector index.
+        Lexical search uses the full-text index (tsvector/GIN on PostgreSQL,
+        FTS5 on SQLite). Hybrid mode fuses both rankings with reciprocal rank
+        fusion, so exact product names and phrasings surface alongside
+        semantically similar responses. Falls back to recent prompts when
+        neither ranking returns anything.
 
         Args:
             query: Search query for similarity
             brand_id: Optional brand to filter by
             limit: Maximum number of results
+            mode: 'hybrid', 'vector' or 'lexical' (default: RAG_SEARCH_MODE)
 
         Returns:
             List of similar Prompt objects
         """
+        mode = mode or SEARCH_MODE
+
+        if mode == "hybrid":
+            # Over-fetch each ranking so fusion has overlap to work with
+            depth = max(limit * 2, RRF_MIN_DEPTH)
+            vector_prompts = await self._vector_candidates(query, brand_id, depth)
+            lexical_ids = self._lexical_search(query, brand_id, depth)
+
+            rankings = [ids for ids in (
+                [p.id for p in vector_prompts] if vector_prompts else None,
+                lexical_ids or None,
+            ) if ids]
+            if rankings:
+                fused_ids = reciprocal_rank_fusion(rankings)[:limit]
+                known = {p.id: p for p in vector_prompts or []}
+                prompts = self._load_prompts(fused_ids, known)
+                logger.info(
+                    f"Hybrid search fused {len(rankings)} rankings into {len(prompts)} prompts"
+                )
+                return prompts
+
+        elif mode == "lexical":
+            lexical_ids = self._lexical_search(query, brand_id, limit)
+            if lexical_ids:
+                return self._load_prompts(lexical_ids)
+
+        else:
+            vector_prompts = await self._vector_candidates(query, brand_id, limit)
+            if vector_prompts:
+                return vector_prompts
+
+        logger.info("No search results, falling back to recent prompts")
+        return self._fallback_recent_prompts(brand_id, limit)
+
+    async def _vector_candidates(
+        self,
+        query: str,
+        brand_id: Optional[str],
+        limit: int
+    ) -> Optional[list[Prompt]]:
+        """Run the best available vector search (None if unavailable or failed)"""
         if self.vector_search_available:
             return await self._vector_search(query, brand_id, limit)
-        else:
-            logger.info("Vector search unavailable, falling back to recent prompts")
-            return self._fallback_recent_prompts(brand_id, limit)
+        if self.local_search_available:
+            return await self._local_vector_search(query, brand_id, limit)
+        return None
 
     async def _vector_search(
         self,
         query: str,
         brand_id: Optional[str],
         limit: int
-    ) -> list[Prompt]:
+    ) -> Optional[list[Prompt]]:
         """Perform vector similarity search using pgvector"""
         # Generate embedding for the query
         query_embedding = await self.embedding_service.embed_text(query)
         if query_embedding is None:
-            logger.warning("Failed to generate query embedding, using fallback")
-            return self._fallback_recent_prompts(brand_id, limit)
-
-        # Build the similarity search query
-        # pgvector uses <=> for cosine distance (lower = more similar)
-        embedding_str = "[" + ",".join(str(x) for x in query_embedding) + "]"
-
-        sql = f"""
-            SELECT p.id, p.query, p.run_number, p.response_text, p.scraped_at,
-                   pe.embedding <=> '{embedding_str}'::vector AS distance
-            FROM prompt p
-            JOIN promptembedding pe ON p.id = pe.prompt_id
-            WHERE pe.embedding IS NOT NULL
-        """
+            logger.warning("Failed to generate query embedding")
+            return None
+
+        import numpy as np  # Installed with pgvector
+
+        # pgvector uses <=> for cosine distance (lower = more similar).
+        # The query vector is a bound parameter sent in pgvector's binary format
+        # (adapter registered in database.py), so the statement text stays small
+        # and constant and the planner doesn't re-parse 3072 literals per call.
+        params = {
+            "query_embedding": np.asarray(query_embedding, dtype=np.float32),
+            "limit": limit,
+        }
 
         if brand_id:
-            sql += f"""
-                AND EXISTS (
-                    SELECT 1 FROM promptbrandmention m
-                    WHERE m.prompt_id = p.id
-                    AND m.brand_id = '{brand_id}'
-                )
-            """
-
-        sql += f" ORDER BY distance ASC LIMIT {limit}"
+            # Pre-filter the brand's prompts once (served by ix_promptbrandmention_brand_prompt)
+            # instead of a correlated EXISTS per candidate row
+            sql = VECTOR_SEARCH_BY_BRAND_SQL
+            params["brand_id"] = brand_id
+        else:
+            sql = VECTOR_SEARCH_SQL
 
         try:
-            result = self.session.exec(text(sql))
+            result = self.session.exec(sql, params=params)
             rows = result.fetchall()
 
             # Convert to Prompt objects
@@ -123,7 +285,79 @@ class RAGService:
 
         except Exception as e:
             logger.error(f"Vector search failed: {e}")
-            return self._fallback_recent_prompts(brand_id, limit)
+            # Clear the aborted transaction so the fallback queries can run
+            self.session.rollback()
+            return None
+
+    async def _local_vector_search(
+        self,
+        query: str,
+        brand_id: Optional[str],
+        limit: int
+    ) -> Optional[list[Prompt]]:
+        """Perform vector similarity search using the in-process index"""
+        query_embedding = await self.embedding_service.embed_text(query)
+        if query_embedding is None:
+            logger.warning("Failed to generate query embedding")
+            return None
+
+        candidate_ids = None
+        if brand_id:
+            candidate_ids = set(self.session.exec(
+                select(PromptBrandMention.prompt_id)
+                .where(PromptBrandMention.brand_id == brand_id)
+            ).all())
+
+        matches = get_local_vector_index().search(query_embedding, limit, candidate_ids)
+        prompts = self._load_prompts([prompt_id for prompt_id, _ in matches])
+
+        logger.info(f"Local vector search found {len(prompts)} similar prompts")
+        return prompts
+
+    def _lexical_search(
+        self,
+        query: str,
+        brand_id: Optional[str],
+        limit: int
+    ) -> list[int]:
+        """
+        Rank prompts by full-text relevance over query + response text.
+
+        Uses BM25 via FTS5 on SQLite and ts_rank_cd over the GIN-indexed
+        tsvector on PostgreSQL. Terms are OR-ed so partial matches still rank.
+
+        Returns:
+            Prompt IDs, most relevant first (empty if no index or no match)
+        """
+        terms = _search_terms(query)
+        if not terms:
+            return []
+
+        if IS_POSTGRES:
+            sql = LEXICAL_SEARCH_PG_BY_BRAND_SQL if brand_id else LEXICAL_SEARCH_PG_SQL
+            params = {"tsquery": " | ".join(terms), "limit": limit}
+        else:
+            sql = LEXICAL_SEARCH_FTS5_BY_BRAND_SQL if brand_id else LEXICAL_SEARCH_FTS5_SQL
+            params = {"match": " OR ".join(f'"{t}"' for t in terms), "limit": limit}
+        if brand_id:
+            params["brand_id"] = brand_id
+
+        try:
+            return [row[0] for row in self.session.exec(sql, params=params).fetchall()]
+        except Exception as e:
+            # Index missing (e.g. SQLite build without FTS5) - lexical ranking just drops out
+            logger.warning(f"Lexical search failed: {e}")
+            self.session.rollback()
+            return []
+
+    def _load_prompts(self, ids: list[int], known: Optional[dict[int, Prompt]] = None) -> list[Prompt]:
+        """Load prompts by ID in one query, preserving the given order"""
+        known = dict(known or {})
+        missing = [i for i in ids if i not in known]
+        if missing:
+            for prompt in self.session.exec(select(Prompt).where(Prompt.id.in_(missing))).all():
+                known[prompt.id] = prompt
+        return [known[i] for i in ids if i in known]
 
     def _fallback_recent_prompts(
         self,
@@ -203,7 +437,8 @@ Focus on these key ranking factors for AI search visibility:
         self,
         brand: Brand,
         similar_prompts: list[Prompt],
-        metrics: dict
+        metrics: dict,
+        query: Optional[str] = None
     ) -> str:
         """
         Build DYNAMIC analysis context (changes per request).
@@ -212,17 +447,18 @@ Focus on these key ranking factors for AI search visibility:
             brand: The brand being analyzed
             similar_prompts: Similar prompts from RAG retrieval
             metrics: Current performance metrics
+            query: Retrieval query, used to rank response excerpts (default: brand name)
 
         Returns:
             Dynamic context string with current data
         """
-        now = datetime.utcnow().isoformat()
+        now = self._data_as_of()
 
         # Format competitor comparison
         competitors_text = self._format_competitors(metrics.get('competitors', []))
 
         # Format similar prompts
-        prompts_text = self._format_prompts(similar_prompts)
+        prompts_text = self._format_prompts(similar_prompts, query or brand.name)
 
         return f"""# Current Analysis Data
 
@@ -283,27 +519,108 @@ Consider:
 
         return "\n".join(lines)
 
-    def _format_prompts(self, prompts: list[Prompt]) -> str:
-        """Format similar prompts for the context"""
+    def _format_prompts(self, prompts: list[Prompt], query: str) -> str:
+        """Format the most relevant, non-redundant response excerpts within the token budget"""
         if not prompts:
             return "No similar prompts found."
 
         lines = []
-        for i, prompt in enumerate(prompts[:5], 1):  # Limit to 5 for context size
-            response_preview = ""
-            if prompt.response_text:
-                # Truncate long responses
-                response_preview = prompt.response_text[:300]
-                if len(prompt.response_text) > 300:
-                    response_preview += "..."
-
+        for i, (prompt, excerpts) in enumerate(pack_prompt_excerpts(query, prompts), 1):
             lines.append(f"""
 ### Prompt {i}: "{prompt.query}"
 **Scraped:** {prompt.scraped_at.strftime('%Y-%m-%d') if prompt.scraped_at else 'Unknown'}
-**Response Preview:** {response_preview}
+**Response Excerpts:** {" ... ".join(excerpts)}
 """)
 
-        return "\n".join(lines)
+        return "\n".join(lines) if lines else "No similar prompts found."
+
+    def _get_aggregates(self) -> dict:
+        """
+        Load corpus-wide metrics for ALL brands with grouped SQL (cached per instance).
+
+        A fixed handful of queries regardless of corpus size: distinct query
+        count, per-brand mention aggregates, per-brand sentiment counts,
+        the brand list and the source (domain, url) pairs.
+        """
+        if self._aggregates is not None:
+            return self._aggregates
+
+        total_queries = self.session.exec(
+            select(func.count(func.distinct(Prompt.query)))
+        ).one()
+
+        # Per-brand mention stats (only mentioned rows count)
+        brand_stats = {}
+        rows = self.session.exec(
+            select(
+                PromptBrandMention.brand_id,
+                func.count(func.distinct(Prompt.query)),
+                func.count(PromptBrandMention.id),
+                func.avg(case((PromptBrandMention.position > 0, PromptBrandMention.position))),
+            )
+            .join(Prompt, Prompt.id == PromptBrandMention.prompt_id)
+            .where(PromptBrandMention.mentioned == True)
+            .group_by(PromptBrandMention.brand_id)
+        ).all()
+        for brand_id, mentioned_queries, total_mentions, avg_position in rows:
+            brand_stats[brand_id] = {
+                "mentioned_queries": mentioned_queries,
+                "total_mentions": total_mentions,
+                "avg_position": float(avg_position or 0),
+                "sentiments": Counter(),
+            }
+
+        sentiment_rows = self.session.exec(
+            select(
+                PromptBrandMention.brand_id,
+                PromptBrandMention.sentiment,
+                func.count(PromptBrandMention.id),
+            )
+            .where(PromptBrandMention.mentioned == True)
+            .where(PromptBrandMention.sentiment != None)
+            .group_by(PromptBrandMention.brand_id, PromptBrandMention.sentiment)
+        ).all()
+        for brand_id, sentiment, count in sentiment_rows:
+            if brand_id in brand_stats and sentiment:
+                brand_stats[brand_id]["sentiments"][sentiment] = count
+
+        brands = list(self.session.exec(select(Brand)).all())
+
+        # Source types depend only on the domain and a /blog/ URL, so one row
+        # per (domain, blog flag) replaces loading every source
+        is_blog_url = case((func.lower(Source.url).like("%/blog/%"), True), else_=False)
+        source_groups = self.session.exec(
+            select(Source.domain, is_blog_url, func.count(Source.id))
+            .group_by(Source.domain, is_blog_url)
+        ).all()
+
+        self._aggregates = {
+            "total_queries": total_queries,
+            "brand_stats": brand_stats,
+            "brands": brands,
+            "source_groups": [(domain, bool(is_blog), count) for domain, is_blog, count in source_groups],
+        }
+        return self._aggregates
+
+    def _brand_metrics_from_aggregates(self, brand_id: str) -> dict:
+        """Visibility, position, mention and sentiment stats for one brand"""
+        aggregates = self._get_aggregates()
+        total_queries = aggregates["total_queries"]
+        stats = aggregates["brand_stats"].get(brand_id)
+
+        if not stats:
+            return {"visibility": 0, "avg_position": 0, "total_mentions": 0, "sentiment": "neutral"}
+
+        # Visibility = % of unique queries with at least one mention of this brand
+        visibility = (stats["mentioned_queries"] / total_queries * 100) if total_queries > 0 else 0
+        sentiments = stats["sentiments"]
+
+        return {
+            "visibility": visibility,
+            "avg_position": stats["avg_position"],
+            "total_mentions": stats["total_mentions"],
+            "sentiment": sentiments.most_common(1)[0][0] if sentiments else "neutral",
+        }
 
     def calculate_brand_metrics(self, brand_id: str) -> dict:
         """
@@ -315,50 +632,23 @@ Consider:
         Returns:
             Dictionary with all relevant metrics
         """
-        from collections import Counter
-
-        # Get all prompts
-        all_prompts = list(self.session.exec(select(Prompt)).all())
-
-        # Get brand mentions
-        mentions = list(self.session.exec(
-            select(PromptBrandMention)
-            .where(PromptBrandMention.brand_id == brand_id)
-        ).all())
-
-        # Calculate visibility (% of prompts mentioning this brand)
-        mentioned_prompt_ids = {m.prompt_id for m in mentions if m.mentioned}
-        total_unique_queries = len(set(p.query for p in all_prompts))
-        mentioned_queries = len(set(
-            p.query for p in all_prompts if p.id in mentioned_prompt_ids
-        ))
-        visibility = (mentioned_queries / total_unique_queries * 100) if total_unique_queries > 0 else 0
-
-        # Calculate average position
-        positions = [m.position for m in mentions if m.mentioned and m.position]
-        avg_position = sum(positions) / len(positions) if positions else 0
-
-        # Calculate sentiment distribution
-        sentiments = [m.sentiment for m in mentions if m.mentioned and m.sentiment]
-        sentiment_counts = Counter(sentiments)
-        primary_sentiment = sentiment_counts.most_common(1)[0][0] if sentiment_counts else "neutral"
+        brand_metrics = self._brand_metrics_from_aggregates(brand_id)
 
         # Calculate trend (simplified - compare recent vs older)
         # In production, this would use proper time-series analysis
         trend = "stable"
 
         # Get source type distribution
-        sources = list(self.session.exec(select(Source)).all())
-        source_types = self._classify_sources(sources)
+        source_types = self._classify_sources(self._get_aggregates()["source_groups"])
 
         # Get competitor metrics
         competitors = self._get_competitor_metrics(brand_id)
 
         return {
-            "visibility": visibility,
-            "avg_position": avg_position,
-            "total_mentions": len([m for m in mentions if m.mentioned]),
-            "sentiment": primary_sentiment,
+            "visibility": brand_metrics["visibility"],
+            "avg_position": brand_metrics["avg_position"],
+            "total_mentions": brand_metrics["total_mentions"],
+            "sentiment": brand_metrics["sentiment"],
             "trend": trend,
             "blog_pct": source_types.get("blog", 0),
             "community_pct": source_types.get("community", 0),
@@ -367,17 +657,16 @@ Consider:
             "competitors": competitors
         }
 
-    def _classify_sources(self, sources: list[Source]) -> dict[str, float]:
-        """Classify sources by type and return percentages"""
-        if not sources:
-            return {}
-
+    def _classify_sources(self, source_groups: list[tuple[str, bool, int]]) -> dict[str, float]:
+        """Classify (domain, blog URL, count) source groups by type and return percentages"""
         type_counts = Counter()
-        for source in sources:
-            source_type = self._get_source_type(source.domain, source.url)
-            type_counts[source_type] += 1
+        for domain, is_blog_url, count in source_groups:
+            source_type = self._get_source_type(domain, "/blog/" if is_blog_url else "")
+            type_counts[source_type] += count
 
-        total = len(sources)
+        total = sum(type_counts.values())
+        if not total:
+            return {}
         return {
             source_type: round(count / total * 100, 1)
             for source_type, count in type_counts.items()
@@ -399,33 +688,18 @@ Consider:
         return 'other'
 
     def _get_competitor_metrics(self, exclude_brand_id: str) -> list[dict]:
-        """Get metrics for competitor brands"""
-        brands = list(self.session.exec(
-            select(Brand).where(Brand.id != exclude_brand_id)
-        ).all())
+        """Get metrics for competitor brands (from the shared aggregates, no extra queries)"""
+        brands = [b for b in self._get_aggregates()["brands"] if b.id != exclude_brand_id]
 
         competitors = []
         for brand in brands[:5]:  # Limit to top 5 competitors
-            # Simplified metrics calculation
-            mentions = list(self.session.exec(
-                select(PromptBrandMention)
-                .where(PromptBrandMention.brand_id == brand.id)
-                .where(PromptBrandMention.mentioned == True)
-            ).all())
-
-            all_prompts = list(self.session.exec(select(Prompt)).all())
-            total_queries = len(set(p.query for p in all_prompts))
-            mentioned_queries = len(set(m.prompt_id for m in mentions))
-
-            visibility = (mentioned_queries / total_queries * 100) if total_queries > 0 else 0
-            positions = [m.position for m in mentions if m.position]
-            avg_position = sum(positions) / len(positions) if positions else 0
-
+            brand_metrics = self._brand_metrics_from_aggregates(brand.id)
             competitors.append({
                 "id": brand.id,
                 "name": brand.name,
-                "visibility": visibility,
-                "avg_position": avg_position,
+                "visibility": brand_metrics["visibility"],
+                "avg_position": brand_metrics["avg_position"],
+                "total_mentions": brand_metrics["total_mentions"],
                 "trend": "stable"
             })
 
@@ -489,14 +763,16 @@ You are an expert GEO (Generative Engine Optimization) strategist. Your analysis
         self,
         brand: Brand,
         similar_prompts: list[Prompt],
-        metrics: dict
+        metrics: dict,
+        query: Optional[str] = None
     ) -> str:
         """
         Build enhanced DYNAMIC analysis context for V2.
 
-        Focuses on actionable data without percentage stats.
+        Focuses on actionable data without percentage stats. Response excerpts
+        are ranked against query (default: brand name).
         """
-        now = datetime.utcnow().isoformat()
+        now = self._data_as_of()
 
         # Format competitor data
         competitors_text = self._format_competitors_v2(metrics.get('competitors', []))
@@ -510,7 +786,7 @@ You are an expert GEO (Generative Engine Optimization) strategist. Your analysis
         domains_text = self._format_top_domains(top_domains)
 
         # Format sample prompts
-        prompts_text = self._format_prompts_v2(similar_prompts)
+        prompts_text = self._format_prompts_v2(similar_prompts, query or brand.name)
 
         return f"""# Analysis Data for {brand.name}
 
@@ -602,33 +878,28 @@ IMPORTANT: Base all recommendations on the actual data above. No generic advice.
 
     def _get_absent_queries(self, brand_id: str, limit: int = 10) -> list[str]:
         """Get queries where this brand is NOT mentioned but competitors are"""
-        # Get all prompts
-        all_prompts = list(self.session.exec(select(Prompt)).all())
-
-        # Get prompts where this brand is mentioned
-        brand_mentions = self.session.exec(
-            select(PromptBrandMention.prompt_id)
+        brand_mentioned = (
+            select(PromptBrandMention.id)
+            .where(PromptBrandMention.prompt_id == Prompt.id)
             .where(PromptBrandMention.brand_id == brand_id)
             .where(PromptBrandMention.mentioned == True)
-        ).all()
-        mentioned_prompt_ids = set(brand_mentions)
-
-        # Get prompts where competitors ARE mentioned (but not this brand)
-        absent_queries = []
-        for prompt in all_prompts:
-            if prompt.id not in mentioned_prompt_ids:
-                # Check if any competitor is mentioned in this prompt
-                competitor_mentions = self.session.exec(
-                    select(PromptBrandMention)
-                    .where(PromptBrandMention.prompt_id == prompt.id)
-                    .where(PromptBrandMention.mentioned == True)
-                    .where(PromptBrandMention.brand_id != brand_id)
-                ).first()
-                if competitor_mentions:
-                    absent_queries.append(prompt.query)
-
-        # Return unique queries
-        return list(set(absent_queries))[:limit]
+        )
+        competitor_mentioned = (
+            select(PromptBrandMention.id)
+            .where(PromptBrandMention.prompt_id == Prompt.id)
+            .where(PromptBrandMention.brand_id != brand_id)
+            .where(PromptBrandMention.mentioned == True)
+        )
+
+        # Single query; ordered so the generated context is stable between calls
+        return list(self.session.exec(
+            select(Prompt.query)
+            .where(~brand_mentioned.exists())
+            .where(competitor_mentioned.exists())
+            .distinct()
+            .order_by(Prompt.query)
+            .limit(limit)
+        ).all())
 
     def _format_absent_queries(self, queries: list[str]) -> str:
         """Format absent queries for the prompt"""
@@ -640,14 +911,30 @@ IMPORTANT: Base all recommendations on the actual data above. No generic advice.
             lines.append(f'- "{q}"')
         return "\n".join(lines)
 
+    def _data_as_of(self) -> str:
+        """
+        Timestamp of the newest scraped response.
+
+        Used instead of the wall clock so identical data gives an identical
+        prompt (and hits the LLM response cache).
+        """
+        latest = self.session.exec(select(func.max(Prompt.scraped_at))).one()
+        return latest.isoformat() if latest else "no data"
+
     def _get_top_citing_domains(self, limit: int = 10) -> list[dict]:
         """Get the most frequently cited domains in AI responses"""
-        sources = list(self.session.exec(select(Source)).all())
-
-        domain_counts = Counter(s.domain for s in sources if s.domain)
+        citations = func.count(Source.id)
+        domain_counts = self.session.exec(
+            select(Source.domain, citations)
+            .where(Source.domain != None)
+            .where(Source.domain != "")
+            .group_by(Source.domain)
+            .order_by(citations.desc(), Source.domain)
+            .limit(limit)
+        ).all()
         top_domains = []
 
-        for domain, count in domain_counts.most_common(limit):
+        for domain, count in domain_counts:
             # Classify the domain
             source_type = self._get_source_type(domain, "")
             top_domains.append({
@@ -668,14 +955,37 @@ IMPORTANT: Base all recommendations on the actual data above. No generic advice.
             lines.append(f"- {d['domain']} ({d['type']}, cited {d['citations']}x)")
         return "\n".join(lines)
 
-    def _format_prompts_v2(self, prompts: list[Prompt]) -> str:
-        """Format prompts for V2 context (more concise)"""
+    def _format_prompts_v2(self, prompts: list[Prompt], query: str) -> str:
+        """
+        Format prompts for V2 context (budgeted, diversified excerpts).
+
+        The first SAMPLE_QUERIES distinct queries are always listed, with
+        or without excerpts (empty or near-duplicate responses have none);
+        their query lines come out of the same token budget.
+        """
         if not prompts:
             return "No sample prompts available."
 
+        first_of_query = {}
+        for index, prompt in enumerate(prompts):
+            first_of_query.setdefault(prompt.query, index)
+        listed = set(list(first_of_query.values())[:SAMPLE_QUERIES])
+
+        reserved = sum(prompt_header_tokens(prompts[index]) for index in listed)
+        packed = pack_prompt_excerpts(
+            query, prompts, token_budget=max(0, EXCERPT_TOKEN_BUDGET - reserved), listed=listed
+        )
+        excerpts_by_prompt = {id(prompt): excerpts for prompt, excerpts in packed}
+
         lines = []
-        for i, prompt in enumerate(prompts[:5], 1):
-            lines.append(f'{i}. "{prompt.query}"')
+        number = 0
+        for index, prompt in enumerate(prompts):
+            excerpts = excerpts_by_prompt.get(id(prompt))
+            if excerpts is None and index not in listed:
+                continue
+            number += 1
+            lines.append(f'{number}. "{prompt.query}"')
+            lines.extend(f"   > {excerpt}" for excerpt in excerpts or [])
         return "\n".join(lines)
 
     def calculate_brand_metrics_v2(self, brand_id: str) -> dict:
@@ -684,8 +994,7 @@ IMPORTANT: Base all recommendations on the actual data above. No generic advice.
         """
         metrics = self.calculate_brand_metrics(brand_id)
 
-        # Add total prompts count
-        all_prompts = list(self.session.exec(select(Prompt)).all())
-        metrics['total_prompts'] = len(set(p.query for p in all_prompts))
+        # Add total unique query count (already loaded with the aggregates)
+        metrics['total_prompts'] = self._get_aggregates()["total_queries"]
 
         return metrics
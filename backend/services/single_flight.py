@@ -0,0 +1,175 @@
+"""
+Request coalescing for expensive, idempotent work.
+
+SingleFlight runs one task per key inside a worker process; concurrent
+callers with the same key await the same result. cross_worker_lock extends
+this across gunicorn workers with a lease row per key, so the second
+worker waits for the first and can then reuse what it cached.
+"""
+import os
+import time
+import uuid
+import asyncio
+import logging
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Hashable, Optional
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from database import engine
+from models import GenerationLease
+
+logger = logging.getLogger(__name__)
+
+# How long a worker waits for another worker's generation before running its own
+LOCK_TIMEOUT_SECONDS = float(os.getenv("GENERATION_LOCK_TIMEOUT_SECONDS", "300"))
+LOCK_POLL_SECONDS = 0.5
+
+
+class SingleFlight:
+    """
+    In-process registry of in-flight calls.
+
+    The work runs as its own task and callers await it through asyncio.shield,
+    so one caller going away does not fail the others. When the last caller
+    is cancelled the work is cancelled too (unless cancel_when_abandoned=False).
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self._waiters: Counter = Counter()
+        self.started = 0
+        self.shared = 0
+
+    async def run(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        cancel_when_abandoned: bool = True
+    ) -> Any:
+        """
+        Await fn() once for all concurrent callers with the same key.
+
+        Args:
+            key: Identity of the work (e.g. endpoint, brand and data version)
+            fn: Coroutine factory, only called by the first caller
+            cancel_when_abandoned: Cancel the work once no caller is waiting
+
+        Returns:
+            fn()'s result (exceptions are raised to every caller)
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda finished: self._forget(key, finished))
+            self.started += 1
+        else:
+            self.shared += 1
+            logger.info(f"Joining in-flight call for {key}")
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if cancel_when_abandoned and self._waiters[key] == 1 and not task.done():
+                logger.info(f"Last caller left, cancelling in-flight call for {key}")
+                task.cancel()
+            raise
+        finally:
+            self._waiters[key] -= 1
+            if self._waiters[key] <= 0:
+                del self._waiters[key]
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        """Drop a finished call (and mark its exception as retrieved)"""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "started": self.started,
+            "shared": self.shared,
+        }
+
+
+def _try_lease(key: str, holder: str, lease_seconds: float) -> bool:
+    """Take the lease on key if it is free or expired"""
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=lease_seconds)
+    with Session(engine) as session:
+        taken_over = session.exec(
+            update(GenerationLease)
+            .where(GenerationLease.key == key)
+            .where(GenerationLease.expires_at < now)
+            .values(holder=holder, expires_at=expires_at)
+        ).rowcount
+        if taken_over:
+            session.commit()
+            return True
+
+        session.add(GenerationLease(key=key, holder=holder, expires_at=expires_at))
+        try:
+            session.commit()
+            return True
+        except IntegrityError:
+            # Held by another worker
+            session.rollback()
+            return False
+
+
+def _release_lease(key: str, holder: str):
+    with Session(engine) as session:
+        session.exec(
+            delete(GenerationLease)
+            .where(GenerationLease.key == key)
+            .where(GenerationLease.holder == holder)
+        )
+        session.commit()
+
+
+@asynccontextmanager
+async def cross_worker_lock(key: str, timeout: float = LOCK_TIMEOUT_SECONDS):
+    """
+    Hold the generation lease for key across worker processes.
+
+    The lease is a GenerationLease row: taking and releasing it are short
+    transactions run in a thread, so neither the event loop nor a pooled
+    connection is held while the generation runs. A waiter polls until the
+    row is gone; after timeout (which is also the lease duration, covering
+    a holder that died) the caller proceeds without the lock rather than
+    failing.
+    """
+    holder = uuid.uuid4().hex
+    acquired = False
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            acquired = await asyncio.to_thread(_try_lease, key, holder, timeout)
+            if acquired:
+                break
+            if time.monotonic() > deadline:
+                logger.warning(f"Timed out waiting for generation lock {key}, continuing without it")
+                break
+            await asyncio.sleep(LOCK_POLL_SECONDS)
+        yield
+    finally:
+        if acquired:
+            await asyncio.to_thread(_release_lease, key, holder)
+
+
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Return the process-wide single-flight registry (created lazily)"""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
@@ -0,0 +1,250 @@
+"""
+Bounded storage for CachedSuggestion rows: compression, a sweeper and a memory tier.
+
+Every V1/V2 regeneration inserts a new cache row and nothing else deletes
+them. The sweeper runs periodically in each worker process and keeps the
+newest SUGGESTIONS_CACHE_KEEP rows per brand and kind, dropping rows of
+retired schema versions and expired rows a newer row supersedes. The newest
+row of a brand and kind survives even when expired: the GET endpoints and
+the kanban board read it.
+
+New payloads are stored compressed in the payload column (zstd when the
+zstandard package is installed, zlib otherwise); rows written as JSON text
+before that are compacted by the sweeper a batch at a time.
+
+Decoded payloads are kept in a per-worker LRU keyed by row identity (ID,
+schema version, generation time). A cache row is never updated in place,
+only replaced by a newer one, so an entry can't go stale and the database
+stays the shared source of truth across workers: a hot brand costs one
+indexed lookup of the key columns and no payload transfer or decoding.
+"""
+import os
+import json
+import zlib
+import asyncio
+import logging
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime
+from itertools import groupby
+from typing import Any, Optional
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from models import CachedSuggestion, CACHE_SCHEMA_VERSIONS
+from database import engine
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEEP_PER_KIND = int(os.getenv("SUGGESTIONS_CACHE_KEEP", "3"))
+SWEEP_INTERVAL_SECONDS = float(os.getenv("SUGGESTIONS_CACHE_SWEEP_SECONDS", "3600"))  # 0 = no background sweeps
+COMPACT_BATCH_SIZE = int(os.getenv("SUGGESTIONS_CACHE_COMPACT_BATCH", "200"))
+MEMORY_CACHE_SIZE = int(os.getenv("SUGGESTIONS_MEMORY_CACHE_SIZE", "64"))  # Decoded payloads per worker (0 = off)
+
+# zstd | zlib | none; zstd falls back to zlib without the zstandard package
+COMPRESSION = os.getenv("SUGGESTIONS_CACHE_COMPRESSION", "zstd").lower()
+if COMPRESSION == "zstd" and zstandard is None:
+    COMPRESSION = "zlib"
+
+_counters: Counter = Counter()
+_last_sweep_at: Optional[datetime] = None
+
+# In-process background task (one per worker process)
+_sweeper_task: Optional[asyncio.Task] = None
+
+
+class DecodedPayloadLRU:
+    """
+    Least-recently-used map of cache row identity -> decoded payload.
+
+    Payloads are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = MEMORY_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.counters: Counter = Counter()
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()  # Sync endpoints run in the threadpool
+
+    def get(self, key: tuple) -> Optional[Any]:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return payload
+
+    def put(self, key: tuple, payload: Any):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evicted"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                **{key: self.counters[key] for key in ("hits", "misses", "evicted")}
+            }
+
+
+_decoded_payloads = DecodedPayloadLRU()
+
+
+def encode_payload(payload_json: str) -> dict:
+    """
+    CachedSuggestion fields storing a JSON payload with the configured compression.
+
+    Returns:
+        suggestions_json, payload_encoding and payload values
+    """
+    if COMPRESSION == "zstd":
+        blob = zstandard.ZstdCompressor(level=10).compress(payload_json.encode())
+    elif COMPRESSION == "zlib":
+        blob = zlib.compress(payload_json.encode(), 9)
+    else:
+        return {"suggestions_json": payload_json, "payload_encoding": "json", "payload": None}
+    return {"suggestions_json": "", "payload_encoding": COMPRESSION, "payload": blob}
+
+
+def load_payload(cached: CachedSuggestion) -> Any:
+    """
+    Decoded payload of a cache row, from the worker's memory tier when possible.
+
+    Rows loaded through main._cache_rows have their payload columns deferred,
+    so a memory hit never transfers the payload from the database.
+    """
+    key = (cached.id, cached.schema_version, cached.generated_at)
+    payload = _decoded_payloads.get(key)
+    if payload is None:
+        payload = _decode_payload(cached)
+        _decoded_payloads.put(key, payload)
+    return payload
+
+
+def _decode_payload(cached: CachedSuggestion) -> Any:
+    if cached.payload_encoding == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Cache row is zstd-compressed but the zstandard package is not installed")
+        text = zstandard.ZstdDecompressor().decompress(cached.payload).decode()
+    elif cached.payload_encoding == "zlib":
+        text = zlib.decompress(cached.payload).decode()
+    else:
+        text = cached.suggestions_json
+    return json.loads(text)
+
+
+def sweep_suggestion_cache(keep: int = CACHE_KEEP_PER_KIND, compact_limit: int = COMPACT_BATCH_SIZE) -> dict:
+    """
+    Delete superseded cache rows and compress uncompressed ones.
+
+    Per brand and kind the newest `keep` rows of the current schema version
+    stay, minus expired ones other than the newest.
+
+    Returns:
+        Rows deleted and compacted by this sweep
+    """
+    global _last_sweep_at
+
+    now = datetime.utcnow()
+    with Session(engine) as session:
+        # Key columns only; payloads are never loaded for the retention pass
+        rows = session.exec(
+            select(
+                CachedSuggestion.id, CachedSuggestion.brand_id, CachedSuggestion.kind,
+                CachedSuggestion.schema_version, CachedSuggestion.expires_at
+            )
+            .order_by(CachedSuggestion.brand_id, CachedSuggestion.kind, CachedSuggestion.expires_at.desc())
+        ).all()
+
+        doomed = []
+        for (_, kind), group in groupby(rows, key=lambda row: (row.brand_id, row.kind)):
+            current = []
+            for row in group:
+                if row.schema_version != CACHE_SCHEMA_VERSIONS.get(kind):
+                    doomed.append(row.id)
+                elif current and (len(current) >= keep or row.expires_at <= now):
+                    doomed.append(row.id)
+                else:
+                    current.append(row.id)
+
+        for start in range(0, len(doomed), 500):
+            session.exec(delete(CachedSuggestion).where(CachedSuggestion.id.in_(doomed[start:start + 500])))
+
+        compacted = 0
+        if COMPRESSION != "none":
+            uncompressed = session.exec(
+                select(CachedSuggestion)
+                .where(CachedSuggestion.payload_encoding == "json")
+                .limit(compact_limit)
+            ).all()
+            for cached in uncompressed:
+                for name, value in encode_payload(cached.suggestions_json).items():
+                    setattr(cached, name, value)
+                session.add(cached)
+            compacted = len(uncompressed)
+
+        session.commit()
+
+    _counters["sweeps"] += 1
+    _counters["deleted"] += len(doomed)
+    _counters["compacted"] += compacted
+    _last_sweep_at = now
+    if doomed or compacted:
+        logger.info(f"Suggestion cache sweep: {len(doomed)} rows deleted, {compacted} compacted")
+    return {"deleted": len(doomed), "compacted": compacted}
+
+
+def sweeper_stats() -> dict:
+    """Retention settings, sweep counters and memory tier stats for this process"""
+    return {
+        "running": is_background_sweeper_running(),
+        "interval_seconds": SWEEP_INTERVAL_SECONDS,
+        "keep_per_kind": CACHE_KEEP_PER_KIND,
+        "compression": COMPRESSION,
+        "last_sweep_at": _last_sweep_at.isoformat() if _last_sweep_at else None,
+        **{key: _counters[key] for key in ("sweeps", "deleted", "compacted", "errors")},
+        "memory": _decoded_payloads.stats()
+    }
+
+
+def is_background_sweeper_running() -> bool:
+    """Check if this process has a sweeper task in flight"""
+    return _sweeper_task is not None and not _sweeper_task.done()
+
+
+def start_background_sweeper(interval_seconds: float = SWEEP_INTERVAL_SECONDS) -> bool:
+    """
+    Sweep the suggestion cache every interval_seconds as an in-process asyncio task.
+
+    Returns:
+        True if a new task was started, False if one is already running or sweeps are disabled
+    """
+    global _sweeper_task
+
+    if interval_seconds <= 0 or is_background_sweeper_running():
+        return False
+
+    async def _run():
+        while True:
+            try:
+                await asyncio.to_thread(sweep_suggestion_cache)
+            except Exception as e:
+                _counters["errors"] += 1
+                logger.error(f"Suggestion cache sweep failed: {e}")
+            await asyncio.sleep(interval_seconds)
+
+    _sweeper_task = asyncio.create_task(_run())
+    return True
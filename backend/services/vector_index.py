@@ -0,0 +1,279 @@
+"""
+In-process vector index for deployments without pgvector (e.g. SQLite).
+
+Stores L2-normalized prompt embeddings as a float32 matrix in a flat file that
+is memory-mapped on first use. Search is a single matrix-vector product plus
+an argpartition top-k, and new embeddings are appended to the file in place.
+
+Several processes (gunicorn workers, job workers) share the files: appends
+hold an exclusive flock on <path>.lock and loads a shared one, so a reader
+never pairs vectors with the IDs of another append.
+"""
+import os
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Iterable
+
+from .embeddings import EMBEDDING_DIMENSIONS
+
+logger = logging.getLogger(__name__)
+
+# numpy is optional - without it the local index is simply unavailable
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+# fcntl is POSIX-only; without it the index is safe within a single process only
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Files: <path>.f32 holds the (n x dim) float32 matrix, <path>.ids the int64 prompt IDs,
+# <path>.lock is the flock target
+INDEX_PATH = Path(os.getenv(
+    "VECTOR_INDEX_PATH",
+    str(Path(__file__).resolve().parent.parent / "vector_index")
+))
+
+
+class LocalVectorIndex:
+    """
+    Memory-mapped cosine-similarity index over prompt embeddings.
+
+    Loaded lazily on first search, and re-mapped whenever the files on disk
+    grew (e.g. another worker process appended new vectors). Row i of the
+    matrix belongs to ID i, so the two files must hold the same number of
+    rows; an append torn by a crash is cut off, and files that disagree
+    otherwise are discarded (the embedding sync then re-embeds them).
+    """
+
+    def __init__(self, path: Path = INDEX_PATH, dimensions: int = EMBEDDING_DIMENSIONS):
+        self.path = Path(path)
+        self.dimensions = dimensions
+        self.vectors_path = self.path.with_suffix(".f32")
+        self.ids_path = self.path.with_suffix(".ids")
+        self.lock_path = self.path.with_suffix(".lock")
+        self._matrix = None
+        self._ids = None
+        self._id_set: set[int] = set()
+        self._loaded_size = -1
+        self._lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        """Check if the index can be used (numpy installed)"""
+        return NUMPY_AVAILABLE
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return 0 if self._ids is None else len(self._ids)
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        """flock the index against other processes (shared for loads, exclusive for writes)"""
+        if fcntl is None:
+            yield
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "ab") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _file_sizes(self) -> tuple[int, int]:
+        return (
+            self.vectors_path.stat().st_size if self.vectors_path.exists() else 0,
+            self.ids_path.stat().st_size if self.ids_path.exists() else 0,
+        )
+
+    def _ensure_loaded(self):
+        """Map the index files, re-mapping if they changed on disk"""
+        if not NUMPY_AVAILABLE:
+            return
+
+        size, _ = self._file_sizes()
+        if size == self._loaded_size:
+            return
+
+        with self._lock:
+            with self._file_lock(exclusive=False):
+                loaded = self._load()
+            if not loaded:
+                with self._file_lock(exclusive=True):
+                    self._repair()
+                    self._load()
+
+    def _load(self) -> bool:
+        """
+        Map the files (callers hold both locks).
+
+        Returns:
+            False, without loading, if the files disagree on the row count
+        """
+        size, ids_size = self._file_sizes()
+        row_bytes = self.dimensions * 4
+        if ids_size % 8 or size != ids_size // 8 * row_bytes:
+            return False
+
+        rows = ids_size // 8
+        if rows == 0:
+            self._matrix = np.empty((0, self.dimensions), dtype=np.float32)
+            self._ids = np.empty(0, dtype=np.int64)
+        else:
+            self._matrix = np.memmap(
+                self.vectors_path, dtype=np.float32, mode="r",
+                shape=(rows, self.dimensions)
+            )
+            self._ids = np.fromfile(self.ids_path, dtype=np.int64)
+
+        self._id_set = set(self._ids.tolist())
+        self._loaded_size = size
+        logger.info(f"Loaded local vector index with {rows} vectors")
+        return True
+
+    def _repair(self):
+        """
+        Make the files agree again (caller holds the exclusive file lock).
+
+        An append writes its vectors before its IDs, so a crash mid-append
+        leaves extra vector bytes (and maybe part of the IDs): cut both back
+        to the rows that have an ID. More IDs than vectors can't come from a
+        torn append, so nothing pairs reliably: start over with an empty index.
+        """
+        size, ids_size = self._file_sizes()
+        row_bytes = self.dimensions * 4
+        ids_count = ids_size // 8
+        if ids_count * row_bytes <= size:
+            # Never shorter than a consistent state, so other processes' mappings stay valid
+            logger.warning(f"Local vector index: cutting a torn append back to {ids_count} vectors")
+            for path, length in ((self.vectors_path, ids_count * row_bytes), (self.ids_path, ids_count * 8)):
+                if path.exists():
+                    os.truncate(path, length)
+        else:
+            logger.error(
+                f"Local vector index files disagree ({size // row_bytes} vectors, {ids_count} IDs); "
+                "discarding the index, the next embedding sync rebuilds it"
+            )
+            # Unlink rather than truncate: existing mappings keep the old file
+            self.vectors_path.unlink(missing_ok=True)
+            self.ids_path.unlink(missing_ok=True)
+
+    def contains(self, prompt_id: int) -> bool:
+        """Check if a prompt already has a vector in the index"""
+        self._ensure_loaded()
+        return prompt_id in self._id_set
+
+    def add(self, items: Iterable[tuple[int, list[float]]]) -> int:
+        """
+        Append normalized vectors for new prompts.
+
+        Args:
+            items: (prompt_id, embedding) pairs; prompts already indexed are skipped
+
+        Returns:
+            Number of vectors appended
+        """
+        if not NUMPY_AVAILABLE:
+            return 0
+
+        self._ensure_loaded()
+        new_ids = []
+        new_vectors = []
+        seen = set(self._id_set)
+        for prompt_id, vector in items:
+            if prompt_id in seen:
+                continue
+            if len(vector) != self.dimensions:
+                logger.warning(f"Skipping prompt {prompt_id}: expected {self.dimensions} dims, got {len(vector)}")
+                continue
+            seen.add(prompt_id)
+            new_ids.append(prompt_id)
+            new_vectors.append(vector)
+
+        if not new_ids:
+            return 0
+
+        matrix = np.asarray(new_vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1, norms)
+
+        with self._lock, self._file_lock(exclusive=True):
+            # Another process may have appended since the load above: pick up its rows first
+            if not self._load():
+                self._repair()
+                self._load()
+            keep = [i for i, prompt_id in enumerate(new_ids) if prompt_id not in self._id_set]
+            if not keep:
+                return 0
+            new_ids = [new_ids[i] for i in keep]
+            matrix = matrix[keep]
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Vectors first: a torn write leaves extra vector rows that _repair cuts off
+            with open(self.vectors_path, "ab") as f:
+                f.write(matrix.tobytes())
+            with open(self.ids_path, "ab") as f:
+                f.write(np.asarray(new_ids, dtype=np.int64).tobytes())
+            self._load()
+
+        return len(new_ids)
+
+    def search(
+        self,
+        query_vector: list[float],
+        limit: int = 10,
+        candidate_ids: Optional[Iterable[int]] = None
+    ) -> list[tuple[int, float]]:
+        """
+        Find the nearest prompts by cosine distance.
+
+        Args:
+            query_vector: Query embedding (normalized here)
+            limit: Maximum number of results
+            candidate_ids: Optional set of prompt IDs to restrict the search to
+
+        Returns:
+            (prompt_id, cosine distance) pairs, most similar first
+        """
+        self._ensure_loaded()
+        if self._ids is None or len(self._ids) == 0:
+            return []
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        scores = self._matrix @ query
+        ids = self._ids
+        if candidate_ids is not None:
+            # Mask the scores rather than the matrix to avoid copying mapped rows
+            mask = np.isin(ids, np.fromiter(candidate_ids, dtype=np.int64))
+            scores = scores[mask]
+            ids = ids[mask]
+            if len(ids) == 0:
+                return []
+
+        k = min(limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [(int(ids[i]), float(1.0 - scores[i])) for i in top]
+
+
+_local_index: Optional[LocalVectorIndex] = None
+
+
+def get_local_vector_index() -> LocalVectorIndex:
+    """Return the process-wide local vector index (created lazily)"""
+    global _local_index
+    if _local_index is None:
+        _local_index = LocalVectorIndex()
+    return _local_index
@@ -243,7 +243,10 @@ export async function createBrand(brand: BrandCreateRequest): Promise<BrandDetai
     const error = await response.json();
     throw new Error(error.detail || `API error: ${response.status}`);
   }
-  return response.json();
+  // 202 Accepted: the mention sync runs as a job; the brand counts as added once it finished
+  const body = await response.json();
+  await waitForJob(body.job);
+  return body.brand;
 }
 
 export async function deleteBrand(brandId: string): Promise<{ success: boolean; message: string }> {
@@ -317,22 +320,59 @@ export async function generateAISuggestions(
       force_refresh: forceRefresh,
     }),
   });
-  if (!response.ok) {
-    const error = await response.json().catch(() => ({ detail: `API error: ${response.status}` }));
-    throw new Error(error.detail || `API error: ${response.status}`);
-  }
-  return response.json();
+  return generationResult<AISuggestionsResponse>(response);
 }
 
 export async function fetchSuggestionsStatus(): Promise<SuggestionsStatusResponse> {
   return fetchJson<SuggestionsStatusResponse>('/suggestions/status');
 }
 
+export interface BackgroundJob {
+  id: string;
+  kind: string;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  attempts: number;
+  max_attempts: number;
+  result: unknown;
+  last_error: string | null;
+  created_at: string;
+  finished_at: string | null;
+}
+
+export async function fetchJob(jobId: string): Promise<BackgroundJob> {
+  return fetchJson<BackgroundJob>(`/jobs/${jobId}`);
+}
+
+const JOB_POLL_INTERVAL_MS = 2000;
+
+// Polls a queued job until it finishes; resolves to its result, rejects with its last error
+export async function waitForJob<T>(job: BackgroundJob): Promise<T> {
+  while (job.status === 'queued' || job.status === 'running') {
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    job = await fetchJob(job.id);
+  }
+  if (job.status === 'failed') {
+    throw new Error(job.last_error || `Job ${job.kind} failed`);
+  }
+  return job.result as T;
+}
+
+// Generation endpoints answer a cache hit directly (200) and queue a generation (202 Accepted + job)
+async function generationResult<T>(response: Response): Promise<T> {
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({ detail: `API error: ${response.status}` }));
+    throw new Error(error.detail || `API error: ${response.status}`);
+  }
+  const body = await response.json();
+  return response.status === 202 ? waitForJob<T>(body.job) : body;
+}
+
+// Queues the backfill (202 Accepted); poll the returned job with fetchJob
 export async function syncEmbeddings(limit: number = 100): Promise<{
   status: string;
   message: string;
-  created: number;
-  remaining?: number;
+  started: boolean; // false: a sync was already queued or running and job is that one
+  job: BackgroundJob;
 }> {
   const response = await fetch(`${API_BASE}/embeddings/sync?limit=${limit}`, {
     method: 'POST',
@@ -423,11 +463,7 @@ export async function generateAISuggestionsV2(
       force_refresh: forceRefresh,
     }),
   });
-  if (!response.ok) {
-    const error = await response.json().catch(() => ({ detail: `API error: ${response.status}` }));
-    throw new Error(error.detail || `API error: ${response.status}`);
-  }
-  return response.json();
+  return generationResult<AISuggestionsResponseV2>(response);
 }
 
 // ============================================================================
@@ -541,11 +577,7 @@ export async function generateRecommendations(
       headers: { 'Content-Type': 'application/json' },
     }
   );
-  if (!response.ok) {
-    const error = await response.json().catch(() => ({ detail: `API error: ${response.status}` }));
-    throw new Error(error.detail || `API error: ${response.status}`);
-  }
-  return response.json();
+  return generationResult<RecommendationsResponse>(response);
 }
 
 export async function getRecommendations(brandId: string = 'wix'): Promise<RecommendationsResponse> {
@@ -559,9 +591,11 @@ export async function getRecommendations(brandId: string = 'wix'): Promise<Recom
 
 export async function updateRecommendationStatus(
   recommendationId: string,
-  status: 'todo' | 'in_progress' | 'done'
+  status: 'todo' | 'in_progress' | 'done',
+  brandId?: string
 ): Promise<{ id: string; status: string; updated_at: string }> {
-  const response = await fetch(`${API_BASE}/geo/recommendations/${recommendationId}/status`, {
+  const query = brandId ? `?brand_id=${encodeURIComponent(brandId)}` : '';
+  const response = await fetch(`${API_BASE}/geo/recommendations/${recommendationId}/status${query}`, {
     method: 'PATCH',
     headers: { 'Content-Type': 'application/json' },
     body: JSON.stringify({ status }),
@@ -572,3 +606,23 @@ export async function updateRecommendationStatus(
   }
   return response.json();
 }
+
+export async function updateRecommendationStatuses(
+  updates: { id: string; status: 'todo' | 'in_progress' | 'done' }[],
+  brandId?: string
+): Promise<{
+  updated: { id: string; status: string; updated_at: string }[];
+  not_found: string[];
+}> {
+  const query = brandId ? `?brand_id=${encodeURIComponent(brandId)}` : '';
+  const response = await fetch(`${API_BASE}/geo/recommendations/status${query}`, {
+    method: 'PATCH',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ updates }),
+  });
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({ detail: `API error: ${response.status}` }));
+    throw new Error(error.detail || `API error: ${response.status}`);
+  }
+  return response.json();
+}
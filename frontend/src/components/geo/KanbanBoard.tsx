@@ -218,11 +218,11 @@ export function KanbanBoard({ brandId = 'wix' }: KanbanBoardProps) {
 
     // Persist to backend (silently fail if API unavailable - local state is already updated)
     try {
-      await updateRecommendationStatus(draggableId, newStatus);
+      await updateRecommendationStatus(draggableId, newStatus, brandId);
     } catch {
       // API unavailable - keep local state (don't revert for demo mode)
     }
-  }, [recommendations, progress]);
+  }, [recommendations, progress, brandId]);
 
   // Group recommendations by status
   const todoRecs = recommendations.filter(r => r.status === 'todo');
@@ -2,88 +2,137 @@
 """
 CLI script to scrape Google AI Mode.
 
+Several queries (or runs) are scraped by a pool of parallel browsers, each
+with its own Chrome profile and paced by SCRAPER_MIN/MAX_DELAY_SECONDS.
+
 Usage:
     python scripts/scrape_google_ai.py "what is the best crm"
     python scripts/scrape_google_ai.py "best project management software" --headless
+    python scripts/scrape_google_ai.py "best crm" "best helpdesk" --runs 3 --workers 3
+    python scripts/scrape_google_ai.py --queries-file queries.txt --runs 3 --headless
 """
 
+import argparse
 import sys
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+from config.settings import settings
+from scrapers.browser_pool import ScraperPool, ScrapeTask
 from scrapers.google_ai_scraper import GoogleAIScraper
 
 
-def main():
-    # Parse arguments
-    if len(sys.argv) < 2:
-        print("Usage: python scripts/scrape_google_ai.py <query> [--headless] [--screenshot]")
-        print('Example: python scripts/scrape_google_ai.py "what is the best crm"')
-        sys.exit(1)
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape Google AI Mode responses")
+    parser.add_argument("queries", nargs="*", help="Queries to scrape")
+    parser.add_argument("--queries-file", type=Path,
+                        help="File with one query per line (blank lines and # comments skipped)")
+    parser.add_argument("--runs", type=int, default=1,
+                        help="Scrape every query this many times (default: 1)")
+    parser.add_argument("--workers", type=int,
+                        help=f"Parallel browsers (default: SCRAPER_WORKERS={settings.scraper.workers})")
+    parser.add_argument("--headless", action="store_true", default=None,
+                        help="Run browsers without a window")
+    parser.add_argument("--screenshot", action="store_true", default=None,
+                        help="Save debug screenshots")
+    args = parser.parse_args()
+
+    if args.queries_file:
+        lines = args.queries_file.read_text(encoding="utf-8").splitlines()
+        args.queries += [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+    if not args.queries:
+        parser.error("no queries given")
+    return args
+
+
+def print_summary(result, filepath):
+    """Detailed summary of a single scrape."""
+    print()
+    print("=" * 60)
+    print("RESULT SUMMARY")
+    print("=" * 60)
+    print(f"Query: {result.query}")
+    print(f"Sources found: {result.source_count}")
+    print()
+
+    # Show first 500 chars of response
+    if result.response_text:
+        print("Response preview:")
+        print("-" * 40)
+        print(result.response_text[:500])
+        if len(result.response_text) > 500:
+            print(f"... ({len(result.response_text)} total chars)")
+        print()
+
+    # Show first 5 sources
+    if result.sources:
+        print("Top sources:")
+        print("-" * 40)
+        for i, source in enumerate(result.sources[:5], 1):
+            print(f"{i}. {source['title'][:60]}")
+            print(f"   {source['url'][:70]}")
+            if source.get('publisher'):
+                print(f"   Publisher: {source['publisher']}")
+            print()
+
+    print("=" * 60)
+    print(f"SUCCESS! Full results saved to: {filepath}")
+    print("=" * 60)
 
-    query = sys.argv[1]
-    headless = "--headless" in sys.argv
-    screenshot = "--screenshot" in sys.argv
+
+def main():
+    args = parse_args()
 
     # Output directory
     output_dir = Path(__file__).parent.parent / "data" / "results" / "google"
 
+    # Run 1 of every query first, so repeated runs of a query are spread over the job
+    tasks = [
+        ScrapeTask(query, run_number=run if args.runs > 1 else None)
+        for run in range(1, args.runs + 1)
+        for query in args.queries
+    ]
+    pool = ScraperPool.from_settings(
+        settings, workers=args.workers, headless=args.headless, take_screenshots=args.screenshot
+    )
+
     print("=" * 60)
     print("Google AI Mode Scraper (undetected-chromedriver)")
     print("=" * 60)
-    print(f"Query: {query}")
-    print(f"Headless: {headless}")
-    print(f"Screenshot: {screenshot}")
+    print(f"Queries: {len(args.queries)} x {args.runs} run(s)")
+    print(f"Workers: {min(pool.workers, len(tasks))}")
+    print(f"Delay per worker: {pool.min_delay_seconds}-{pool.max_delay_seconds}s")
+    print(f"Headless: {pool.headless}")
+    print(f"Screenshot: {pool.take_screenshots}")
     print()
 
-    # Run scraper
-    with GoogleAIScraper(headless=headless) as scraper:
-        result = scraper.scrape(query, take_screenshot=screenshot)
+    saved = []
 
+    def save(result):
         if result.success:
-            # Save result
-            filepath = scraper.save_result(result, output_dir)
+            saved.append(GoogleAIScraper.save_result(result, output_dir))
 
-            print()
-            print("=" * 60)
-            print("RESULT SUMMARY")
-            print("=" * 60)
-            print(f"Query: {result.query}")
-            print(f"Sources found: {result.source_count}")
-            print()
+    pool.on_result = save
+    results = pool.run(tasks)
+    failed = [result for result in results if not result.success]
 
-            # Show first 500 chars of response
-            if result.response_text:
-                print("Response preview:")
-                print("-" * 40)
-                print(result.response_text[:500])
-                if len(result.response_text) > 500:
-                    print(f"... ({len(result.response_text)} total chars)")
-                print()
-
-            # Show first 5 sources
-            if result.sources:
-                print("Top sources:")
-                print("-" * 40)
-                for i, source in enumerate(result.sources[:5], 1):
-                    print(f"{i}. {source['title'][:60]}")
-                    print(f"   {source['url'][:70]}")
-                    if source.get('publisher'):
-                        print(f"   Publisher: {source['publisher']}")
-                    print()
-
-            print("=" * 60)
-            print(f"SUCCESS! Full results saved to: {filepath}")
-            print("=" * 60)
-        else:
-            print()
-            print("=" * 60)
-            print("SCRAPING FAILED")
-            print("=" * 60)
-            print(f"Error: {result.error}")
-            sys.exit(1)
+    if len(results) == 1 and not failed:
+        print_summary(results[0], saved[0])
+        return
+
+    print()
+    print("=" * 60)
+    print("SCRAPING FAILED" if len(results) == 1 else "RESULTS")
+    print("=" * 60)
+    for result in failed:
+        run = f" (run {result.run_number})" if result.run_number else ""
+        print(f"Error: {result.query}{run}: {result.error}")
+    if len(results) > 1:
+        print(f"Succeeded: {len(results) - len(failed)}/{len(results)}, saved to: {output_dir}")
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
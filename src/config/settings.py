@@ -24,9 +24,10 @@ class ScraperSettings(BaseSettings):
 
     model_config = SettingsConfigDict(env_prefix="SCRAPER_")
 
-    min_delay_seconds: int = 30
+    min_delay_seconds: int = 30  # Pause between two queries of one browser worker
     max_delay_seconds: int = 60
     take_screenshots: bool = False
+    workers: int = 3  # Parallel browsers in a ScraperPool
 
 
 class Settings(BaseSettings):
@@ -51,12 +52,14 @@ class Settings(BaseSettings):
     data_dir: Path = BASE_DIR / "data"
     results_dir: Path = BASE_DIR / "data" / "results"
     screenshots_dir: Path = BASE_DIR / "data" / "screenshots"
+    profiles_dir: Path = BASE_DIR / "data" / "profiles"  # One Chrome profile per pool worker
 
     def ensure_directories(self) -> None:
         """Create required directories if they don't exist."""
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.results_dir.mkdir(parents=True, exist_ok=True)
         self.screenshots_dir.mkdir(parents=True, exist_ok=True)
+        self.profiles_dir.mkdir(parents=True, exist_ok=True)
 
 
 # Global settings instance
@@ -0,0 +1,169 @@
+"""
+Pool of isolated browser workers scraping a shared query queue.
+
+A single GoogleAIScraper spends most of a long job in the pause between
+searches. The pool starts N browsers, each with its own Chrome profile
+(cookies and consent state stay per worker and persist across jobs), and
+each worker thread takes the next query from a shared queue. Pacing is per
+worker: after each query a worker pauses a random min_delay..max_delay
+seconds, so every browser searches at the rate of a single scraper while N
+of them finish the job in roughly 1/N of the wall time.
+"""
+
+import queue
+import random
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from .google_ai_scraper import GoogleAIScraper, ScrapeResult
+
+
+@dataclass
+class ScrapeTask:
+    """One query to scrape; run_number tells repeated runs of a query apart."""
+    query: str
+    run_number: Optional[int] = None
+
+
+class ScraperPool:
+    """Runs ScrapeTasks on parallel GoogleAIScraper browsers."""
+
+    def __init__(
+        self,
+        workers: int,
+        profiles_dir: Path,
+        min_delay_seconds: float,
+        max_delay_seconds: float,
+        headless: bool = False,
+        take_screenshots: bool = False,
+        on_result: Optional[Callable[[ScrapeResult], None]] = None,
+    ):
+        self.workers = workers
+        self.profiles_dir = Path(profiles_dir)
+        self.min_delay_seconds = min_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.headless = headless
+        self.take_screenshots = take_screenshots
+        self.on_result = on_result
+
+        # undetected-chromedriver patches one shared driver binary when a browser launches
+        self._launch_lock = threading.Lock()
+        self._results_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_settings(cls, settings, **overrides) -> "ScraperPool":
+        """Pool configured from the application Settings (SCRAPER_*, BROWSER_*)."""
+        options = {
+            "workers": settings.scraper.workers,
+            "profiles_dir": settings.profiles_dir,
+            "min_delay_seconds": settings.scraper.min_delay_seconds,
+            "max_delay_seconds": settings.scraper.max_delay_seconds,
+            "headless": settings.browser.headless,
+            "take_screenshots": settings.scraper.take_screenshots,
+        }
+        options.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(**options)
+
+    def run(self, tasks: Iterable[ScrapeTask]) -> list[ScrapeResult]:
+        """
+        Scrape all tasks and return their results in completion order.
+
+        Tasks no worker could take (every browser failed to start, or the
+        run was interrupted) are returned as failed results.
+        """
+        self._stop.clear()
+        pending: queue.Queue = queue.Queue()
+        for task in tasks:
+            pending.put(task)
+
+        results: list[ScrapeResult] = []
+        worker_count = max(1, min(self.workers, pending.qsize()))
+        threads = [
+            threading.Thread(
+                target=self._worker, args=(index, worker_count, pending, results),
+                name=f"scraper-{index}", daemon=True,
+            )
+            for index in range(worker_count)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            print("\nInterrupted - finishing the queries in progress...")
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+        reason = "run interrupted" if self._stop.is_set() else "no browser worker started"
+        while not pending.empty():
+            task = pending.get_nowait()
+            self._record(results, self._failed(task, f"Not scraped: {reason}"))
+
+        return results
+
+    def _worker(self, index: int, worker_count: int, pending: queue.Queue, results: list):
+        """Scrape tasks from the queue on one browser until the queue is empty."""
+        prefix = f"[worker {index + 1}]"
+
+        # Spread the workers' first searches over one pacing interval
+        if self._stop.wait(index * self.min_delay_seconds / worker_count):
+            return
+
+        scraper = GoogleAIScraper(headless=self.headless, user_data_dir=self.profiles_dir / f"worker_{index + 1}")
+        try:
+            with self._launch_lock:
+                scraper._start_browser()
+        except Exception as e:
+            print(f"{prefix} Browser failed to start: {e}")
+            scraper._close_browser()
+            return
+
+        try:
+            first = True
+            while not self._stop.is_set():
+                try:
+                    task = pending.get_nowait()
+                except queue.Empty:
+                    return
+
+                if not first:
+                    delay = random.uniform(self.min_delay_seconds, self.max_delay_seconds)
+                    print(f"{prefix} Waiting {delay:.0f}s before the next query")
+                    if self._stop.wait(delay):
+                        pending.put(task)
+                        return
+                first = False
+
+                print(f"{prefix} Scraping: {task.query}" + (f" (run {task.run_number})" if task.run_number else ""))
+                result = scraper.scrape(task.query, take_screenshot=self.take_screenshots)
+                result.run_number = task.run_number
+                self._record(results, result)
+        finally:
+            scraper._close_browser()
+
+    def _record(self, results: list, result: ScrapeResult):
+        with self._results_lock:
+            results.append(result)
+            if self.on_result:
+                self.on_result(result)
+
+    @staticmethod
+    def _failed(task: ScrapeTask, error: str) -> ScrapeResult:
+        return ScrapeResult(
+            query=task.query,
+            timestamp=datetime.now(timezone.utc).isoformat(),
+            response_text="",
+            sources=[],
+            source_count=0,
+            success=False,
+            error=error,
+            run_number=task.run_number,
+        )
@@ -40,6 +40,7 @@ class ScrapeResult:
     source_count: int
     success: bool
     error: Optional[str] = None
+    run_number: Optional[int] = None
 
 
 class GoogleAIScraper:
@@ -47,8 +48,10 @@ class GoogleAIScraper:
 
     BASE_URL = "https://www.google.com/search"
 
-    def __init__(self, headless: bool = False):
+    def __init__(self, headless: bool = False, user_data_dir: Optional[Path] = None):
         self.headless = headless
+        # Persistent Chrome profile (cookies, consent); None = throwaway profile
+        self.user_data_dir = user_data_dir
         self._driver = None
 
     def __enter__(self):
@@ -69,8 +72,13 @@ class GoogleAIScraper:
         if self.headless:
             options.add_argument("--headless=new")
 
+        user_data_dir = None
+        if self.user_data_dir:
+            Path(self.user_data_dir).mkdir(parents=True, exist_ok=True)
+            user_data_dir = str(self.user_data_dir)
+
         # Use version_main to avoid version mismatch
-        self._driver = uc.Chrome(options=options, use_subprocess=True)
+        self._driver = uc.Chrome(options=options, use_subprocess=True, user_data_dir=user_data_dir)
         print("Browser started!")
         time.sleep(2)  # Give browser time to stabilize
 
@@ -455,13 +463,16 @@ class GoogleAIScraper:
                 error=str(e),
             )
 
-    def save_result(self, result: ScrapeResult, output_dir: Path):
+    @staticmethod
+    def save_result(result: ScrapeResult, output_dir: Path):
         """Save result to JSON file."""
         output_dir.mkdir(parents=True, exist_ok=True)
 
         # Create filename from query
         filename = re.sub(r'[^\w\s-]', '', result.query.lower())
         filename = re.sub(r'[-\s]+', '_', filename)[:50]
+        if result.run_number is not None:
+            filename = f"{filename}_run{result.run_number}"
         filename = f"{filename}.json"
 
         filepath = output_dir / filename
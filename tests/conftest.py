@@ -0,0 +1,41 @@
+"""
+Shared test setup.
+
+Backend modules read their settings from the environment when first
+imported, so the suite's configuration is set here, before any test module
+imports them: the fake LLM provider with a fixed response latency and no
+LLM response cache.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ["LLM_PROVIDER_MODE"] = "fake"
+os.environ["FAKE_PROVIDER_LATENCY_MS"] = "2000"
+os.environ["FAKE_PROVIDER_LATENCY_JITTER_MS"] = "0"
+os.environ["FAKE_PROVIDER_FAILURE_RATE"] = "0"
+os.environ["LLM_CACHE_ENABLED"] = "false"  # A response cache hit would skip the slow call
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+
+@pytest.fixture
+def db_engine(tmp_path, monkeypatch):
+    """
+    Empty SQLite database with every table, in place of backend/aiseo.db.
+
+    Patched into database.engine; tests patch it into the service modules
+    they exercise (e.g. services.job_queue.engine) themselves.
+    """
+    from sqlmodel import SQLModel, create_engine
+
+    import database
+    import models  # noqa: F401 - registers the tables
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(database, "engine", engine)
+    return engine
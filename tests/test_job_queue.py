@@ -0,0 +1,148 @@
+"""
+JobQueue against a throwaway database: idempotency keys, singleton kinds,
+leases and retries. Jobs are claimed and executed directly rather than by
+the worker coroutines.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from models import BackgroundJob
+from services import job_queue
+from services.job_queue import JobQueue, PermanentJobError, RetryPolicy
+
+
+async def _succeed(payload: dict):
+    return {"echo": payload}
+
+
+async def _fail(payload: dict):
+    raise RuntimeError("provider down")
+
+
+async def _reject(payload: dict):
+    raise PermanentJobError("unknown brand")
+
+
+@pytest.fixture
+def queue(db_engine, monkeypatch):
+    monkeypatch.setattr(job_queue, "engine", db_engine)
+    return JobQueue(lease_seconds=60)
+
+
+def _set(engine, job_id: str, **values):
+    with Session(engine) as session:
+        session.exec(update(BackgroundJob).where(BackgroundJob.id == job_id).values(**values))
+        session.commit()
+
+
+def _run_next(queue: JobQueue, worker_id: str = "worker") -> BackgroundJob:
+    """Claim the next due job and execute it; returns the job as stored afterwards"""
+    job = queue._claim(worker_id)
+    assert job is not None
+    asyncio.run(queue._execute(job, worker_id))
+    return queue.get(job.id)
+
+
+def test_idempotency_key_returns_the_existing_job(queue):
+    queue.register("report", _succeed)
+    queue.register("export", _succeed)
+
+    first, created = queue.enqueue("report", {"n": 1}, idempotency_key="abc")
+    again, created_again = queue.enqueue("report", {"n": 2}, idempotency_key="abc")
+    other_kind, created_other_kind = queue.enqueue("export", idempotency_key="abc")
+
+    assert created and not created_again
+    assert again.id == first.id
+    # Keys are scoped to the job kind
+    assert created_other_kind and other_kind.id != first.id
+
+
+def test_singleton_kind_has_one_active_job(queue):
+    queue.register("sync", _succeed, singleton=True)
+
+    first, created = queue.enqueue("sync")
+    again, created_again = queue.enqueue("sync")
+    assert created and not created_again
+    assert again.id == first.id
+
+    assert _run_next(queue).status == "succeeded"
+    # Finished jobs don't count: the next enqueue starts a new run
+    second, created_second = queue.enqueue("sync")
+    assert created_second and second.id != first.id
+
+
+def test_unique_index_rejects_a_second_active_singleton(db_engine):
+    # What two processes racing past the existence check would insert
+    with Session(db_engine) as session:
+        session.add(BackgroundJob(id="a", kind="sync", payload_json="{}", singleton=True))
+        session.commit()
+        session.add(BackgroundJob(id="b", kind="sync", payload_json="{}", singleton=True))
+        with pytest.raises(IntegrityError):
+            session.commit()
+
+
+def test_claim_holds_a_lease_until_it_expires(queue, db_engine):
+    queue.register("report", _succeed)
+    job, _ = queue.enqueue("report")
+
+    claimed = queue._claim("worker-a")
+    assert claimed.id == job.id
+    assert claimed.status == "running" and claimed.locked_by == "worker-a" and claimed.attempts == 1
+    assert queue._claim("worker-b") is None
+
+    # worker-a died and stopped renewing the lease
+    _set(db_engine, job.id, locked_until=datetime.utcnow() - timedelta(seconds=1))
+    reclaimed = queue._claim("worker-b")
+    assert reclaimed.locked_by == "worker-b" and reclaimed.attempts == 2
+    # The previous holder can no longer record an outcome
+    assert not queue._update_owned(job.id, "worker-a", status="succeeded")
+
+
+def test_success_stores_the_result(queue):
+    queue.register("report", _succeed)
+    queue.enqueue("report", {"brand_id": "wix"})
+
+    job = _run_next(queue)
+
+    assert job.status == "succeeded"
+    assert job.locked_by is None and job.finished_at is not None
+    assert job.result_json == '{"echo": {"brand_id": "wix"}}'
+
+
+def test_failed_attempt_is_retried_with_backoff_until_max_attempts(queue, db_engine):
+    queue.register("flaky", _fail, RetryPolicy(max_attempts=2, base_delay=60))
+    queue.enqueue("flaky")
+
+    job = _run_next(queue)
+    assert job.status == "queued" and job.attempts == 1
+    assert "provider down" in job.last_error
+    # Full jitter: anywhere up to base_delay from now
+    assert job.run_after <= datetime.utcnow() + timedelta(seconds=60)
+
+    # Due again once the backoff has passed
+    _set(db_engine, job.id, run_after=datetime.utcnow() - timedelta(seconds=1))
+    job = _run_next(queue)
+    assert job.status == "failed" and job.attempts == 2
+    assert job.finished_at is not None
+
+
+def test_permanent_error_fails_without_retrying(queue):
+    queue.register("brand", _reject, RetryPolicy(max_attempts=5))
+    queue.enqueue("brand")
+
+    job = _run_next(queue)
+
+    assert job.status == "failed" and job.attempts == 1
+    assert job.last_error == "PermanentJobError: unknown brand"
+
+
+def test_retry_delay_is_capped_exponential_backoff():
+    policy = RetryPolicy(base_delay=5, max_delay=30)
+    for attempt, ceiling in ((1, 5), (2, 10), (3, 20), (4, 30), (10, 30)):
+        assert all(0 <= policy.delay(attempt) <= ceiling for _ in range(50))
@@ -0,0 +1,97 @@
+"""Incremental JSON parsing of streamed structured output."""
+
+import asyncio
+import json
+
+from pydantic import BaseModel
+
+from services.json_stream import JSONItemStream, stream_validated
+
+
+class Win(BaseModel):
+    title: str
+    effort_hours: float
+
+
+class Plan(BaseModel):
+    summary: str
+    quick_wins: list[Win]
+    tags: list[str]
+
+
+DOCUMENT = {
+    "summary": 'Braces {like [these]} and "quotes" inside strings are text',
+    "quick_wins": [{"title": "Add FAQ schema", "effort_hours": 2}, {"title": "Fix titles", "effort_hours": 0.5}],
+    "tags": ["faq", "schema"],
+}
+
+
+def _feed_in_chunks(text: str, size: int) -> list[tuple[int, tuple]]:
+    """Feed text size characters at a time; returns (characters fed, event) pairs"""
+    parser = JSONItemStream()
+    events = []
+    for end in range(size, len(text) + size, size):
+        for event in parser.feed(text[end - size:end]):
+            events.append((min(end, len(text)), event))
+    assert parser.closed
+    return events
+
+
+def test_items_are_reported_as_soon_as_they_close():
+    text = json.dumps(DOCUMENT)
+
+    events = _feed_in_chunks(text, 1)
+
+    assert [event for _, event in events] == [
+        ("member", "summary", DOCUMENT["summary"]),
+        ("item", "quick_wins", DOCUMENT["quick_wins"][0]),
+        ("item", "quick_wins", DOCUMENT["quick_wins"][1]),
+        ("member", "quick_wins", DOCUMENT["quick_wins"]),
+        ("item", "tags", "faq"),
+        ("item", "tags", "schema"),
+        ("member", "tags", DOCUMENT["tags"]),
+    ]
+    # The first quick win arrives right after its closing brace, long before the object ends
+    first_item_at = events[1][0]
+    assert text[first_item_at - 1] == "}" and first_item_at < text.index("Fix titles")
+
+
+def test_chunk_boundaries_do_not_change_the_events():
+    text = json.dumps(DOCUMENT, indent=2)
+    expected = [event for _, event in _feed_in_chunks(text, 1)]
+
+    for size in (2, 7, 64, len(text)):
+        assert [event for _, event in _feed_in_chunks(text, size)] == expected
+
+
+def test_text_before_the_object_is_ignored():
+    parser = JSONItemStream()
+
+    events = parser.feed('```json\n{"tags": ["a"]}\n```')
+
+    assert events == [("item", "tags", "a"), ("member", "tags", ["a"])]
+    assert parser.closed
+
+
+def test_stream_validated_yields_models_and_skips_invalid_parts():
+    document = {
+        "summary": "ok",
+        "quick_wins": [{"title": "Valid", "effort_hours": 1}, {"title": "No effort"}],
+        "tags": ["faq"],
+    }
+    text = json.dumps(document)
+
+    async def chunks():
+        for start in range(0, len(text), 5):
+            yield text[start:start + 5]
+
+    async def collect():
+        return [event async for event in stream_validated(Plan, chunks())]
+
+    events = asyncio.run(collect())
+
+    assert events == [
+        ("member", "summary", "ok"),
+        ("item", "quick_wins", Win(title="Valid", effort_hours=1)),
+        ("item", "tags", "faq"),
+    ]
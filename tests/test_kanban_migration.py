@@ -0,0 +1,78 @@
+"""Migration of kanban recommendations out of cache row JSON into rows."""
+
+import json
+from datetime import datetime, timedelta
+
+from sqlmodel import Session, select
+
+from database import ensure_kanban_rows
+from models import CachedSuggestion, CACHE_SCHEMA_VERSIONS, KanbanRecommendation, RecommendationProgress
+
+
+def _card(card_id: str, rank: int, status: str = "todo") -> dict:
+    return {
+        "id": card_id,
+        "rank": rank,
+        "title": f"Recommendation {rank}",
+        "description": "Do the thing",
+        "category": "content",
+        "priority": "high",
+        "effort": "2h",
+        "steps": ["First", "Second"],
+        "status": status,
+    }
+
+
+def _legacy_row(brand_id: str, cards: list[dict], expires_in_hours: float) -> CachedSuggestion:
+    """A recommendations cache row in the version 1 layout (cards inside the JSON)"""
+    return CachedSuggestion(
+        brand_id=brand_id,
+        kind="recommendations",
+        schema_version=1,
+        suggestions_json=json.dumps({"type": "kanban_recommendations", "recommendations": cards}),
+        expires_at=datetime.utcnow() + timedelta(hours=expires_in_hours),
+        model_used="test",
+    )
+
+
+def test_newest_run_moves_into_rows_keeping_statuses(db_engine):
+    with Session(db_engine) as session:
+        session.add(_legacy_row("wix", [_card("old-1", 1)], expires_in_hours=1))
+        newest = _legacy_row("wix", [_card("rec-1", 1, "done"), _card("rec-2", 2)], expires_in_hours=5)
+        session.add(newest)
+        # Progress recorded before the migration wins over the status in the JSON
+        session.add(RecommendationProgress(id="rec-2", brand_id="wix", status="in_progress"))
+        session.commit()
+        newest_id = newest.id
+
+    ensure_kanban_rows()
+
+    with Session(db_engine) as session:
+        rows = session.exec(select(CachedSuggestion)).all()
+        assert [row.id for row in rows] == [newest_id]  # Older runs were never served
+        assert rows[0].schema_version == CACHE_SCHEMA_VERSIONS["recommendations"]
+        assert json.loads(rows[0].suggestions_json) == {
+            "type": "kanban_recommendations",
+            "recommendation_ids": ["rec-1", "rec-2"],
+        }
+
+        cards = session.exec(select(KanbanRecommendation).order_by(KanbanRecommendation.rank)).all()
+        assert [card.id for card in cards] == ["rec-1", "rec-2"]
+        assert json.loads(cards[0].steps_json) == ["First", "Second"]
+        assert cards[0].generated_at == rows[0].generated_at
+
+        statuses = {progress.id: progress.status for progress in session.exec(select(RecommendationProgress))}
+        assert statuses == {"rec-1": "done", "rec-2": "in_progress"}
+
+
+def test_migration_is_a_no_op_once_done(db_engine):
+    with Session(db_engine) as session:
+        session.add(_legacy_row("wix", [_card("rec-1", 1)], expires_in_hours=5))
+        session.commit()
+
+    ensure_kanban_rows()
+    ensure_kanban_rows()
+
+    with Session(db_engine) as session:
+        assert len(session.exec(select(KanbanRecommendation)).all()) == 1
+        assert len(session.exec(select(RecommendationProgress)).all()) == 1
@@ -0,0 +1,69 @@
+"""LLMResponseCache: TTL expiry and LRU eviction, on a fake clock."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services import llm_cache
+from services.llm_cache import LLMResponseCache, prompt_fingerprint
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """llm_cache's time.time, advanced by hand"""
+    clock = SimpleNamespace(now=1_000_000.0)
+    monkeypatch.setattr(llm_cache, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+def test_round_trip_and_counters(tmp_path, clock):
+    cache = LLMResponseCache(path=tmp_path / "cache.sqlite3", ttl_seconds=60, max_entries=10)
+
+    async def scenario():
+        await cache.put("key", {"items": [1, 2]}, "Claude quick_wins")
+        return await cache.get("key"), await cache.get("other")
+
+    assert asyncio.run(scenario()) == ({"items": [1, 2]}, None)
+    assert cache.stats()["entries"] == 1
+    assert (cache.counters["hits"], cache.counters["misses"], cache.counters["writes"]) == (1, 1, 1)
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = LLMResponseCache(path=tmp_path / "cache.sqlite3", ttl_seconds=60, max_entries=10)
+
+    async def scenario():
+        await cache.put("key", {"value": 1})
+        clock.now += 59
+        fresh = await cache.get("key")
+        clock.now += 2
+        return fresh, await cache.get("key")
+
+    assert asyncio.run(scenario()) == ({"value": 1}, None)
+    assert cache.counters["expired"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = LLMResponseCache(path=tmp_path / "cache.sqlite3", ttl_seconds=3600, max_entries=2)
+
+    async def scenario():
+        await cache.put("a", 1)
+        clock.now += 1
+        await cache.put("b", 2)
+        clock.now += 1
+        await cache.get("a")  # a is now more recent than b
+        clock.now += 1
+        await cache.put("c", 3)
+        return [await cache.get(key) for key in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == [1, None, 3]
+    assert cache.counters["evicted"] == 1
+
+
+def test_fingerprint_ignores_key_order():
+    first = prompt_fingerprint(model="m", messages=[{"role": "user", "content": "hi"}], max_tokens=10)
+    second = prompt_fingerprint(max_tokens=10, messages=[{"content": "hi", "role": "user"}], model="m")
+
+    assert first == second
+    assert first != prompt_fingerprint(model="m", messages=[{"role": "user", "content": "hi"}], max_tokens=11)
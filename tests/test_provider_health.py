@@ -0,0 +1,139 @@
+"""CircuitBreaker and AIMDLimiter state transitions, on a fake clock."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services import provider_health
+from services.provider_health import (
+    AIMDLimiter,
+    CircuitBreaker,
+    FAILED,
+    ProviderHealth,
+    ProviderUnavailableError,
+    RATE_LIMITED,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """provider_health's time.monotonic, advanced by hand"""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(provider_health, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, open_seconds=30)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # Resets the streak
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and breaker.is_open()
+    assert not breaker.allow()
+    assert breaker.rejected == 1 and breaker.times_opened == 1
+
+
+def test_breaker_lets_one_probe_through_after_the_cool_down(clock):
+    breaker = CircuitBreaker(failure_threshold=1, open_seconds=30)
+    breaker.record_failure()
+
+    clock.now += 29
+    assert not breaker.allow()
+
+    clock.now += 1
+    assert not breaker.is_open()
+    assert breaker.allow()  # The probe
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # Everyone else waits for its outcome
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+
+def test_failed_probe_reopens_and_neutral_probe_frees_the_slot(clock):
+    breaker = CircuitBreaker(failure_threshold=5, open_seconds=30)
+    for _ in range(5):
+        breaker.record_failure()
+
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_neutral()  # e.g. the probe was cancelled
+    assert breaker.allow()  # Another request may probe
+
+    breaker.record_failure()  # A single failure while half-open reopens
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+    assert breaker.snapshot()["retry_in_seconds"] == 30.0
+
+
+def test_limiter_grows_additively_and_halves_on_rate_limits(clock):
+    limiter = AIMDLimiter(initial=4, minimum=1, maximum=5)
+
+    for _ in range(4):
+        limiter.on_success()
+    assert limiter.limit == pytest.approx(4.9, abs=0.05)  # About +1 per window of 4
+    for _ in range(10):
+        limiter.on_success()
+    assert limiter.limit == 5  # Capped
+
+    started = clock.now
+    clock.now += 1
+    limiter.on_rate_limit(started)
+    assert limiter.limit == 2.5
+    # Other requests of the same burst (sent before the decrease) don't halve again
+    limiter.on_rate_limit(started)
+    assert limiter.limit == 2.5 and limiter.decreases == 1
+
+    for _ in range(3):
+        clock.now += 1
+        limiter.on_rate_limit(clock.now)
+    assert limiter.limit == 1  # Floor
+
+
+def test_limiter_caps_requests_in_flight():
+    async def scenario():
+        limiter = AIMDLimiter(initial=2, minimum=1, maximum=2)
+        peak = 0
+
+        async def request():
+            nonlocal peak
+            async with limiter.slot():
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(request() for _ in range(6)))
+        return peak, limiter.in_flight
+
+    assert asyncio.run(scenario()) == (2, 0)
+
+
+def test_guard_feeds_outcomes_back(clock):
+    async def scenario():
+        health = ProviderHealth("test")
+        health.breaker = CircuitBreaker(failure_threshold=2, open_seconds=30)
+        health.limiter = AIMDLimiter(initial=8, minimum=1, maximum=8)
+
+        def classify(error):
+            return RATE_LIMITED if isinstance(error, ConnectionRefusedError) else FAILED
+
+        for _ in range(2):
+            with pytest.raises(ConnectionRefusedError):
+                async with health.guard(classify):
+                    clock.now += 1
+                    raise ConnectionRefusedError()
+
+        with pytest.raises(ProviderUnavailableError):
+            async with health.guard(classify):
+                pass
+        return health
+
+    health = asyncio.run(scenario())
+
+    assert not health.is_available()
+    assert health.limiter.limit == 2  # Halved once per rate limit
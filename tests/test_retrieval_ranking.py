@@ -0,0 +1,77 @@
+"""Hybrid retrieval ranking: reciprocal rank fusion and MMR excerpt packing."""
+
+import numpy as np
+
+from models import Prompt
+from services.context_packing import estimate_tokens, mmr_select, pack_prompt_excerpts
+from services.rag_service import reciprocal_rank_fusion
+
+
+def test_rrf_favours_ids_ranked_by_both_searches():
+    vector = [1, 2, 3]
+    lexical = [3, 4]
+
+    # 3 is in both lists; 2 and 4 tie on rank 2 and keep first-seen order
+    assert reciprocal_rank_fusion([vector, lexical], k=60) == [3, 1, 2, 4]
+
+
+def test_rrf_with_a_single_ranking_keeps_its_order():
+    assert reciprocal_rank_fusion([[5, 9, 7]]) == [5, 9, 7]
+    assert reciprocal_rank_fusion([]) == []
+
+
+def test_mmr_skips_near_duplicates_for_a_diverse_pick():
+    relevance = np.array([1.0, 0.95, 0.5])
+    vectors = np.array([[1.0, 0.0], [1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+
+    selected = mmr_select(relevance, vectors, costs=[1, 1, 1], budget=10)
+
+    assert selected == [0, 2]
+
+
+def test_mmr_stays_within_the_token_budget():
+    relevance = np.array([0.9, 0.8, 0.7])
+    vectors = np.eye(3, dtype=np.float32)
+
+    assert mmr_select(relevance, vectors, costs=[5, 5, 5], budget=11) == [0, 1]
+    assert mmr_select(relevance, vectors, costs=[20, 5, 5], budget=11) == [1, 2]
+
+
+def test_mmr_pays_a_group_header_once():
+    relevance = np.array([0.9, 0.8])
+    vectors = np.eye(2, dtype=np.float32)
+    groups = np.array([0, 0])
+
+    # Each costs 2 + a 3-token header: both fit in 7 only if the header is paid once
+    selected = mmr_select(
+        relevance, vectors, costs=[2, 2], budget=7,
+        group_ids=groups, group_costs=np.array([3, 3], dtype=np.float32)
+    )
+
+    assert selected == [0, 1]
+
+
+def test_packing_drops_repeated_answers_and_respects_the_budget():
+    answer = (
+        "Shopify is the most recommended platform for small stores thanks to its app ecosystem.\n"
+        "Wix offers an easy drag-and-drop editor that suits first-time store owners well.\n"
+        "WooCommerce gives developers full control as an open source WordPress plugin."
+    )
+    prompts = [
+        Prompt(id=1, query="best ecommerce platform", run_number=1, response_text=answer),
+        Prompt(id=2, query="best ecommerce platform", run_number=2, response_text=answer),
+        Prompt(id=3, query="cheap online store builder", run_number=1,
+               response_text="Square Online has a free plan that covers basic online selling for small shops."),
+    ]
+    budget = 150
+
+    packed = pack_prompt_excerpts("ecommerce platform for small stores", prompts, token_budget=budget)
+
+    packed_ids = [prompt.id for prompt, _ in packed]
+    # Retrieval order, without run 2 (the same answer as run 1)
+    assert packed_ids == [1, 3]
+    used = sum(
+        estimate_tokens(prompt.query) + 16 + sum(estimate_tokens(excerpt) for excerpt in excerpts)
+        for prompt, excerpts in packed
+    )
+    assert used <= budget
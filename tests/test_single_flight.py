@@ -0,0 +1,109 @@
+"""SingleFlight: concurrent callers share one call, and cancellation follows the callers."""
+
+import asyncio
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "result"
+
+        results = await asyncio.gather(*(flight.run("key", work) for _ in range(5)))
+        return flight, calls, results
+
+    flight, calls, results = asyncio.run(scenario())
+
+    assert calls == 1
+    assert results == ["result"] * 5
+    assert flight.stats() == {"in_flight": 0, "started": 1, "shared": 4}
+
+
+def test_different_keys_and_later_calls_run_separately():
+    async def scenario():
+        flight = SingleFlight()
+        calls = []
+
+        def work(key):
+            async def run():
+                calls.append(key)
+                await asyncio.sleep(0.01)
+            return run
+
+        await asyncio.gather(flight.run("a", work("a")), flight.run("b", work("b")))
+        # A finished call is forgotten, so the same key runs again
+        await flight.run("a", work("a"))
+        return calls
+
+    assert sorted(asyncio.run(scenario())) == ["a", "a", "b"]
+
+
+def test_exception_reaches_every_caller():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("generation failed")
+
+        return await asyncio.gather(*(flight.run("key", work) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_one_caller_leaving_does_not_cancel_the_others():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.1)
+            return "result"
+
+        leaving = asyncio.create_task(flight.run("key", work))
+        staying = asyncio.create_task(flight.run("key", work))
+        await asyncio.sleep(0.02)
+        leaving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        return await staying
+
+    assert asyncio.run(scenario()) == "result"
+
+
+def test_last_caller_leaving_cancels_the_work():
+    async def scenario(cancel_when_abandoned: bool):
+        flight = SingleFlight()
+        finished = asyncio.Event()
+        cancelled = False
+
+        async def work():
+            nonlocal cancelled
+            try:
+                await asyncio.sleep(0.05)
+                finished.set()
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+
+        caller = asyncio.create_task(flight.run("key", work, cancel_when_abandoned=cancel_when_abandoned))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0.1)
+        return cancelled, finished.is_set()
+
+    assert asyncio.run(scenario(cancel_when_abandoned=True)) == (True, False)
+    # Results other requests will reuse (e.g. cached builds) run to completion
+    assert asyncio.run(scenario(cancel_when_abandoned=False)) == (False, True)
@@ -0,0 +1,85 @@
+"""Suggestion cache sweeper retention rules and payload compaction."""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session, select
+
+from models import CachedSuggestion, CACHE_SCHEMA_VERSIONS
+from services import suggestion_cache
+from services.suggestion_cache import load_payload, sweep_suggestion_cache
+
+
+@pytest.fixture
+def engine(db_engine, monkeypatch):
+    monkeypatch.setattr(suggestion_cache, "engine", db_engine)
+    return db_engine
+
+
+def _add(session: Session, brand_id: str, kind: str, expires_in_hours: float, schema_version=None) -> int:
+    row = CachedSuggestion(
+        brand_id=brand_id,
+        kind=kind,
+        schema_version=schema_version or CACHE_SCHEMA_VERSIONS[kind],
+        suggestions_json=json.dumps({"brand": brand_id, "expires_in_hours": expires_in_hours}),
+        expires_at=datetime.utcnow() + timedelta(hours=expires_in_hours),
+        model_used="test",
+    )
+    session.add(row)
+    session.commit()
+    return row.id
+
+
+def _remaining(engine) -> set[int]:
+    with Session(engine) as session:
+        return set(session.exec(select(CachedSuggestion.id)).all())
+
+
+def test_keeps_the_newest_rows_per_brand_and_kind(engine):
+    with Session(engine) as session:
+        wix = [_add(session, "wix", "suggestions", hours) for hours in (1, 2, 3, 4, 5)]
+        shopify = _add(session, "shopify", "suggestions", 1)
+        v2 = _add(session, "wix", "suggestions_v2", 1)
+
+    result = sweep_suggestion_cache(keep=3)
+
+    assert result["deleted"] == 2
+    # Newest = latest expiry; other brands and kinds are counted separately
+    assert _remaining(engine) == {*wix[2:], shopify, v2}
+
+
+def test_expired_rows_go_unless_they_are_the_newest(engine):
+    with Session(engine) as session:
+        fresh = _add(session, "wix", "suggestions", 2)
+        _add(session, "wix", "suggestions", -1)  # Superseded by the fresh row
+        only_expired = _add(session, "shopify", "suggestions", -5)
+        _add(session, "shopify", "suggestions", -10)
+
+    sweep_suggestion_cache(keep=3)
+
+    # The newest row survives expired: the GET endpoints and the kanban board read it
+    assert _remaining(engine) == {fresh, only_expired}
+
+
+def test_retired_schema_versions_are_dropped(engine):
+    with Session(engine) as session:
+        current = _add(session, "wix", "recommendations", 1)
+        _add(session, "wix", "recommendations", 2, schema_version=1)
+
+    sweep_suggestion_cache(keep=3)
+
+    assert _remaining(engine) == {current}
+
+
+def test_uncompressed_rows_are_compacted(engine, monkeypatch):
+    monkeypatch.setattr(suggestion_cache, "COMPRESSION", "zlib")
+    with Session(engine) as session:
+        row_id = _add(session, "wix", "suggestions", 1)
+
+    assert sweep_suggestion_cache()["compacted"] == 1
+
+    with Session(engine) as session:
+        row = session.get(CachedSuggestion, row_id)
+        assert row.payload_encoding == "zlib" and row.suggestions_json == ""
+        assert load_payload(row) == {"brand": "wix", "expires_in_hours": 1}
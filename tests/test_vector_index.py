@@ -0,0 +1,79 @@
+"""LocalVectorIndex: appends, search, sharing between instances and torn-append repair."""
+
+import numpy as np
+
+from services.vector_index import LocalVectorIndex
+
+DIMENSIONS = 4
+
+
+def _index(tmp_path) -> LocalVectorIndex:
+    return LocalVectorIndex(path=tmp_path / "vector_index", dimensions=DIMENSIONS)
+
+
+def test_search_returns_nearest_prompts_first(tmp_path):
+    index = _index(tmp_path)
+    added = index.add([
+        (1, [1.0, 0.0, 0.0, 0.0]),
+        (2, [0.0, 1.0, 0.0, 0.0]),
+        (3, [0.9, 0.1, 0.0, 0.0]),
+    ])
+
+    results = index.search([2.0, 0.0, 0.0, 0.0], limit=2)
+
+    assert added == 3 and len(index) == 3
+    assert [prompt_id for prompt_id, _ in results] == [1, 3]
+    assert abs(results[0][1]) < 1e-6  # Same direction: cosine distance 0
+
+
+def test_search_can_be_restricted_to_candidates(tmp_path):
+    index = _index(tmp_path)
+    index.add([(1, [1.0, 0.0, 0.0, 0.0]), (2, [0.0, 1.0, 0.0, 0.0]), (3, [0.9, 0.1, 0.0, 0.0])])
+
+    assert [prompt_id for prompt_id, _ in index.search([1.0, 0.0, 0.0, 0.0], candidate_ids=[2, 3])] == [3, 2]
+    assert index.search([1.0, 0.0, 0.0, 0.0], candidate_ids=[99]) == []
+
+
+def test_indexed_prompts_and_wrong_dimensions_are_skipped(tmp_path):
+    index = _index(tmp_path)
+    index.add([(1, [1.0, 0.0, 0.0, 0.0])])
+
+    assert index.add([(1, [0.0, 1.0, 0.0, 0.0]), (2, [1.0, 2.0])]) == 0
+    assert len(index) == 1 and index.contains(1) and not index.contains(2)
+
+
+def test_other_instances_see_appended_vectors(tmp_path):
+    writer = _index(tmp_path)
+    reader = _index(tmp_path)
+    writer.add([(1, [1.0, 0.0, 0.0, 0.0])])
+    assert len(reader) == 1
+
+    # The reader re-maps once the files grew, and never re-appends the writer's rows
+    writer.add([(2, [0.0, 1.0, 0.0, 0.0])])
+    assert reader.add([(2, [0.0, 1.0, 0.0, 0.0]), (3, [0.0, 0.0, 1.0, 0.0])]) == 1
+    assert len(_index(tmp_path)) == 3
+
+
+def test_torn_append_is_cut_back(tmp_path):
+    index = _index(tmp_path)
+    index.add([(1, [1.0, 0.0, 0.0, 0.0]), (2, [0.0, 1.0, 0.0, 0.0])])
+
+    # A crash after writing a vector row but before its ID
+    with open(index.vectors_path, "ab") as f:
+        f.write(np.ones(DIMENSIONS, dtype=np.float32).tobytes())
+
+    reopened = _index(tmp_path)
+    assert len(reopened) == 2
+    assert index.vectors_path.stat().st_size == 2 * DIMENSIONS * 4
+
+
+def test_more_ids_than_vectors_discards_the_index(tmp_path):
+    index = _index(tmp_path)
+    index.add([(1, [1.0, 0.0, 0.0, 0.0])])
+    with open(index.ids_path, "ab") as f:
+        f.write(np.asarray([2], dtype=np.int64).tobytes())
+
+    reopened = _index(tmp_path)
+
+    assert len(reopened) == 0
+    assert reopened.add([(1, [1.0, 0.0, 0.0, 0.0])]) == 1